@@ -0,0 +1,54 @@
+"""
+Measure memory per phone for Phone vs CompactPhone.
+
+Usage:
+    python benchmarks/bench_memory.py [--phones 20000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'function'))
+
+from models.phone import Phone
+from models.compact_phone import CompactPhone
+
+from bench_serialization import make_phone
+
+
+def measure(label: str, build, templates) -> float:
+    """Build one object per JSON template and report traced bytes per object."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Decoded per phone so every phone owns its strings, as after a real scrape or DB load
+    # (copy.deepcopy would share the template's str objects and hide their cost)
+    objects = [build(json.loads(template)) for template in templates]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    per_phone = used / len(objects)
+    print(f"  {label:<16} {per_phone / 1024:8.1f} KB/phone  ({used / 1024 / 1024:.1f} MB total)")
+    del objects
+    return per_phone
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phones', type=int, default=20000, help='Number of phones to hold in memory')
+    args = parser.parse_args()
+    
+    templates = [json.dumps(make_phone(i).to_dict()) for i in range(args.phones)]
+    print(f"Holding {len(templates)} GSMArena-shaped phones\n")
+    
+    phone = measure("Phone", Phone.from_dict, templates)
+    compact = measure("CompactPhone", CompactPhone.from_dict, templates)
+    
+    print(f"\nCompactPhone uses {compact / phone:.0%} of Phone's memory")
+
+
+if __name__ == "__main__":
+    main()
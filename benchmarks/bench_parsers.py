@@ -0,0 +1,301 @@
+"""
+Benchmark the scrapers' page parsing offline, on recorded pages.
+
+Replays the pages listed in benchmarks/fixtures/manifest.json through each
+scraper's real scrape_phone() path (the fetch is answered from the fixture)
+and reports pages/sec, p50/p99 parse time and peak RSS per scraper and
+parser backend. Every scraper/backend pair runs in a fresh process, so its
+peak RSS is its own.
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat 20] [--sites gsmarena,kimovil] [--backends lxml,html.parser]
+    python benchmarks/bench_parsers.py --save-baseline parsers_baseline.json
+    python benchmarks/bench_parsers.py --baseline parsers_baseline.json [--tolerance 0.15]
+    python benchmarks/bench_parsers.py --record gsmarena https://www.gsmarena.com/samsung_galaxy_s24-12773.php
+"""
+import argparse
+import gzip
+import importlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', 'function'))
+
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+MANIFEST = os.path.join(FIXTURES_DIR, 'manifest.json')
+
+# Site -> (module, scraper class)
+SCRAPERS = {
+    'gsmarena': ('scrapers.gsmarena', 'GSMArenaScraper'),
+    '91mobiles': ('scrapers.mobiles91', 'Mobiles91Scraper'),
+    'kimovil': ('scrapers.kimovil', 'KimovilScraper'),
+}
+
+BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+# Metric -> whether higher is better
+METRICS = {
+    'pages_per_sec': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_rss_mb': False,
+}
+
+
+class FixtureClient:
+    """Stands in for the scrapers' HTTP/browser clients, answering from recorded pages."""
+    
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = pages
+    
+    def get(self, url: str, **kwargs):
+        text = self.pages.get(url)
+        if text is None:
+            return None
+        return SimpleNamespace(text=text, content=text.encode('utf-8'), status_code=200, url=url)
+
+
+def load_manifest() -> Dict:
+    """Read the fixture manifest ({'pages': [{'site', 'url', 'file'}]})."""
+    if not os.path.exists(MANIFEST):
+        return {'pages': []}
+    with open(MANIFEST, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_pages(site: str) -> Dict[str, str]:
+    """Return {url: html} for the recorded pages of one site."""
+    pages = {}
+    for entry in load_manifest()['pages']:
+        if entry['site'] == site:
+            with gzip.open(os.path.join(FIXTURES_DIR, entry['file']), 'rt', encoding='utf-8') as f:
+                pages[entry['url']] = f.read()
+    return pages
+
+
+def available_backends() -> List[str]:
+    """Parser backends BeautifulSoup can use in this environment."""
+    from bs4.builder import builder_registry
+    return [backend for backend in BACKENDS if builder_registry.lookup(backend)]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if it cannot be measured)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def scraper_for(site: str, client):
+    """Create the site's scraper around the given client."""
+    module, class_name = SCRAPERS[site]
+    return getattr(importlib.import_module(module), class_name)(client=client)
+
+
+def run_benchmark(site: str, backend: str, repeat: int) -> Dict:
+    """
+    Parse every recorded page of a site `repeat` times (runs in a worker process).
+    
+    Returns:
+        Result dictionary (site, backend, pages, failed, pages_per_sec, p50_ms, p99_ms, peak_rss_mb)
+    """
+    pages = load_pages(site)
+    scraper = scraper_for(site, FixtureClient(pages))
+    scraper.PARSER = backend
+    
+    times = []
+    with redirect_stdout(io.StringIO()):
+        # Warm-up pass (imports, regex caches) doubles as the correctness check
+        failed = sum(1 for url in pages if scraper.scrape_phone(url) is None)
+        for _ in range(repeat):
+            for url in pages:
+                started = time.perf_counter()
+                scraper.scrape_phone(url)
+                times.append(time.perf_counter() - started)
+    
+    rss = peak_rss_mb()
+    return {
+        'site': site,
+        'backend': backend,
+        'pages': len(times),
+        'failed': failed,
+        'pages_per_sec': round(len(times) / sum(times), 1),
+        'p50_ms': round(percentile(times, 50) * 1000, 3),
+        'p99_ms': round(percentile(times, 99) * 1000, 3),
+        'peak_rss_mb': round(rss, 1) if rss is not None else None,
+    }
+
+
+def run_isolated(site: str, backend: str, repeat: int) -> Dict:
+    """Run one benchmark in a fresh process so peak RSS is not shared between runs."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_benchmark, site, backend, repeat).result()
+
+
+def print_results(results: List[Dict]):
+    """Print one row per scraper/backend pair."""
+    print(f"  {'site':<10} {'backend':<12} {'pages':>6} {'failed':>6} {'pages/s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'peak RSS':>9}")
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.1f} MB" if r['peak_rss_mb'] is not None else 'n/a'
+        print(f"  {r['site']:<10} {r['backend']:<12} {r['pages']:>6} {r['failed']:>6} {r['pages_per_sec']:>9.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {rss:>9}")
+
+
+def compare_baseline(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare results against a saved baseline run.
+    
+    Args:
+        results: Results of this run
+        baseline: Contents of a --save-baseline file
+        tolerance: Allowed relative change before a metric counts as a regression
+    
+    Returns:
+        Descriptions of the regressions found
+    """
+    previous = {(r['site'], r['backend']): r for r in baseline.get('results', [])}
+    regressions = []
+    
+    print(f"\nAgainst baseline from {baseline.get('created', '?')} (tolerance {tolerance:.0%}):")
+    for r in results:
+        key = (r['site'], r['backend'])
+        before = previous.get(key)
+        if before is None:
+            print(f"  {r['site']:<10} {r['backend']:<12} not in baseline")
+            continue
+        
+        changes = []
+        for metric, higher_is_better in METRICS.items():
+            if not before.get(metric) or r.get(metric) is None:
+                continue
+            change = r[metric] / before[metric] - 1
+            worse = change < -tolerance if higher_is_better else change > tolerance
+            changes.append(f"{metric} {change:+.0%}{' !' if worse else ''}")
+            if worse:
+                regressions.append(f"{r['site']}/{r['backend']} {metric}: {before[metric]} -> {r[metric]}")
+        if r['failed'] > before.get('failed', 0):
+            regressions.append(f"{r['site']}/{r['backend']} failed pages: {before.get('failed', 0)} -> {r['failed']}")
+        print(f"  {r['site']:<10} {r['backend']:<12} {', '.join(changes)}")
+    
+    return regressions
+
+
+def record(site: str, urls: List[str]):
+    """Fetch pages with the site's real client and add them to the fixtures."""
+    manifest = load_manifest()
+    scraper = scraper_for(site, None)
+    os.makedirs(os.path.join(FIXTURES_DIR, site), exist_ok=True)
+    
+    for url in urls:
+        response = scraper.client.get(url)
+        if not response:
+            print(f"[FAILED] Could not fetch {url}")
+            continue
+        
+        name = re.sub(r'[^a-z0-9]+', '_', urlparse(url).path.lower()).strip('_') or 'index'
+        path = f"{site}/{name}.html.gz"
+        with gzip.open(os.path.join(FIXTURES_DIR, path), 'wt', encoding='utf-8') as f:
+            f.write(response.text)
+        
+        manifest['pages'] = [entry for entry in manifest['pages'] if entry['url'] != url]
+        manifest['pages'].append({'site': site, 'url': url, 'file': path})
+        print(f"[RECORDED] {url} -> {path}")
+    
+    with open(MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the recorded pages per run')
+    parser.add_argument('--sites', default=','.join(SCRAPERS), help='Comma-separated sites to benchmark')
+    parser.add_argument('--backends', default=None, help='Comma-separated parser backends (default: all installed)')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Save the results as a baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved baseline (exit 1 on regression)')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed relative slowdown vs. the baseline')
+    parser.add_argument('--record', nargs='+', metavar=('SITE', 'URL'), help='Record pages of a site as fixtures')
+    args = parser.parse_args()
+    
+    if args.record:
+        site, urls = args.record[0], args.record[1:]
+        if site not in SCRAPERS or not urls:
+            parser.error(f"--record needs a site ({', '.join(SCRAPERS)}) and at least one URL")
+        record(site, urls)
+        return
+    
+    sites = [site for site in args.sites.split(',') if site]
+    unknown = set(sites) - set(SCRAPERS)
+    if unknown:
+        parser.error(f"Unknown sites: {', '.join(sorted(unknown))}")
+    backends = args.backends.split(',') if args.backends else available_backends()
+    
+    recorded = {entry['site'] for entry in load_manifest()['pages']}
+    results = []
+    for site in sites:
+        if site not in recorded:
+            print(f"  (no recorded pages for {site}, skipping)")
+            continue
+        for backend in backends:
+            results.append(run_isolated(site, backend, args.repeat))
+    
+    print(f"\nParsing recorded pages x{args.repeat} ({platform.python_implementation()} {platform.python_version()})\n")
+    print_results(results)
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'repeat': args.repeat,
+                'results': results
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\n[SAVED] Baseline saved to: {args.save_baseline}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark Phone serialization: dataclasses.asdict + indented JSON (the old
+path) against the shallow to_dict() / to_bytes() / from_dict() path.
+
+Usage:
+    python benchmarks/bench_serialization.py [--phones 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'function'))
+
+from models.phone import Phone
+
+
+def make_phone(i: int) -> Phone:
+    """Build a phone shaped like a GSMArena scrape (13 spec categories, ~90 specs)."""
+    detailed_specs = []
+    specs = {}
+    for c in range(13):
+        details = []
+        for p in range(7):
+            name, value = f"Property {c}-{p}", f"Value {i}-{c}-{p}, 6.8 inches, 5000 mAh, Snapdragon 8 Gen 3"
+            details.append({'property': name, 'value': value})
+            specs[name] = value
+        detailed_specs.append({'title': f"Category {c}", 'details': details})
+    
+    return Phone(
+        brand="Samsung",
+        model=f"Galaxy S{i}",
+        url=f"https://www.gsmarena.com/samsung_galaxy_s{i}-{i}.php",
+        price="$ 1,299.99",
+        specs=specs,
+        detailed_specs=detailed_specs,
+        images=[f"https://fdn2.gsmarena.com/vv/bigpic/s{i}-{n}.jpg" for n in range(4)],
+        highlights=["6.8\"", "200MP", "5000mAh", "12GB RAM"],
+        rating=8.7,
+        source="gsmarena"
+    )
+
+
+def timed(label: str, fn, phones) -> float:
+    """Run fn over all phones and print the per-phone cost."""
+    started = time.perf_counter()
+    for phone in phones:
+        fn(phone)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<42} {elapsed / len(phones) * 1e6:9.1f} µs/phone")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phones', type=int, default=2000, help='Number of phones to serialize')
+    args = parser.parse_args()
+    
+    phones = [make_phone(i) for i in range(args.phones)]
+    print(f"Serializing {len(phones)} phones\n")
+    
+    print("to dict:")
+    old_dict = timed("dataclasses.asdict (old to_dict)", asdict, phones)
+    new_dict = timed("Phone.to_dict()", lambda p: p.to_dict(), phones)
+    
+    print("\nto JSON:")
+    old_json = timed("json.dumps(asdict, indent=2) (old to_json)",
+                     lambda p: json.dumps(asdict(p), indent=2, ensure_ascii=False), phones)
+    new_json = timed("Phone.to_bytes('json')", lambda p: p.to_bytes(), phones)
+    
+    try:
+        import msgpack  # noqa: F401
+        timed("Phone.to_bytes('msgpack')", lambda p: p.to_bytes('msgpack'), phones)
+    except ImportError:
+        print("  (msgpack not installed, skipping)")
+    
+    print("\nfrom dict:")
+    dicts = [phone.to_dict() for phone in phones]
+    payloads = [phone.to_bytes() for phone in phones]
+    timed("Phone(**dict)", lambda d: Phone(**d), dicts)
+    timed("Phone.from_dict()", Phone.from_dict, dicts)
+    timed("Phone.from_bytes('json')", Phone.from_bytes, payloads)
+    
+    print(f"\nSpeedup: to_dict {old_dict / new_dict:.0f}x, JSON {old_json / new_json:.1f}x")
+    
+    print("\nStored document size (SPEC_STORAGE):")
+    both = sum(len(json.dumps(phone.to_dict(), ensure_ascii=False)) for phone in phones)
+    detailed = sum(len(json.dumps(phone.to_dict(flat_specs=False), ensure_ascii=False)) for phone in phones)
+    print(f"  {'both (flat + detailed specs)':<42} {both / len(phones) / 1024:9.1f} KB/phone")
+    print(f"  {'detailed only':<42} {detailed / len(phones) / 1024:9.1f} KB/phone  ({detailed / both:.0%})")
+
+
+if __name__ == "__main__":
+    main()
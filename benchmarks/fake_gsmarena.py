@@ -0,0 +1,369 @@
+"""
+Local stand-in for GSMArena, for throughput and backpressure tests of the crawlers.
+
+Serves makers.php3, paginated brand listings (iPage / a.pages-next),
+results.php3 search and category listings, and phone detail pages, built
+from a synthetic catalog (or from a fetch archive recorded with
+FETCH_MODE=record). It can enforce a per-client rate limit (429), cap the
+number of requests in flight (503), inject bot-challenge pages and add
+latency, so crawl engines can be stress-tested at 10k+ pages without
+touching the real site.
+
+Usage:
+    python benchmarks/fake_gsmarena.py [--port 8800] [--brands 20] [--phones-per-brand 500]
+        [--rate 5 --burst 10] [--max-inflight 8] [--challenge-rate 0.01] [--latency-ms 20-80]
+        [--archive data/fetch_archive.jsonl.gz]
+    
+    GSMARENA_BASE_URL=http://localhost:8800 python scrape_all_makers.py
+
+GET /__stats returns the request counters as JSON.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', 'function'))
+
+from utils.fetch_replay import CHALLENGE_PAGE
+
+TEMPLATE_LISTING = os.path.join(BENCHMARKS_DIR, '..', 'test_page.html')
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+
+BRAND_NAMES = [
+    'Samsung', 'Apple', 'Xiaomi', 'OnePlus', 'Google', 'Motorola', 'Nokia', 'Sony', 'Oppo', 'vivo',
+    'Realme', 'Honor', 'Huawei', 'Asus', 'Nothing', 'Infinix', 'Tecno', 'ZTE', 'Lenovo', 'LG',
+]
+SERIES = ['Alpha', 'Nova', 'Max', 'Lite', 'Pro', 'Edge', 'Note', 'Zoom', 'Play', 'Ultra']
+
+BRAND_PATH_RE = re.compile(r'^/([a-z0-9_]+)-phones-(?:f-)?(\d+)(?:-0-p(\d+))?\.php$')
+PHONE_PATH_RE = re.compile(r'^/([a-z0-9_+]+)-(\d+)\.php$')
+LISTING_RE = re.compile(r'(<div class="makers">\s*<ul>).*?(</ul>.*?</div>)', re.S)
+RESULT_COUNT_RE = re.compile(r'Your search returned <b>\d+</b> results')
+PHONE_NAME_RE = re.compile(r'(<h1 class="specs-phone-name-title"[^>]*>).*?(</h1>)', re.S)
+
+
+class Catalog:
+    """Deterministic synthetic phone catalog: brands x phones per brand."""
+    
+    def __init__(self, brands: int, phones_per_brand: int):
+        self.brands = []
+        for index in range(brands):
+            name = BRAND_NAMES[index] if index < len(BRAND_NAMES) else f'Brand{index + 1}'
+            self.brands.append({'id': index + 1, 'name': name, 'slug': name.lower(), 'count': phones_per_brand})
+        
+        self.phones: Dict[int, Dict] = {}
+        self.by_brand: Dict[int, List[Dict]] = {}
+        for brand in self.brands:
+            phones = []
+            for number in range(phones_per_brand):
+                model = f'{SERIES[number % len(SERIES)]} {number // len(SERIES) + 1}'
+                phone_id = brand['id'] * 100000 + number
+                slug = f"{brand['slug']}_{model.lower().replace(' ', '_')}"
+                phone = {'id': phone_id, 'brand': brand['name'], 'model': model, 'href': f'{slug}-{phone_id}.php'}
+                self.phones[phone_id] = phone
+                phones.append(phone)
+            self.by_brand[brand['id']] = phones
+    
+    def search(self, query: str) -> List[Dict]:
+        """Phones whose "brand model" contains every query word."""
+        words = query.lower().split()
+        return [
+            phone for phone in self.phones.values()
+            if all(word in f"{phone['brand']} {phone['model']}".lower() for word in words)
+        ]
+
+
+class TokenBucket:
+    """Per-client token bucket (rate requests/second, up to burst at once)."""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def take(self, client: str) -> float:
+        """Take a token; returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                return 0.0
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class FakeGSMArena:
+    """Page rendering, rate limiting and fault injection behind the HTTP handler."""
+    
+    def __init__(self, catalog: Catalog, page_size: int = 40, rate: float = 0, burst: int = 10,
+                 max_inflight: int = 0, challenge_rate: float = 0, latency: Tuple[float, float] = (0, 0),
+                 archive: Optional[str] = None, seed: int = 0):
+        self.catalog = catalog
+        self.page_size = page_size
+        self.limiter = TokenBucket(rate, burst) if rate > 0 else None
+        self.max_inflight = max_inflight
+        self.challenge_rate = challenge_rate
+        self.latency = latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.started = time.time()
+        self.stats: Dict[str, int] = {'requests': 0, '200': 0, '404': 0, '429': 0, '503': 0, 'challenge': 0}
+        self.routes: Dict[str, int] = {}
+        
+        with open(TEMPLATE_LISTING, encoding='utf-8') as f:
+            self.listing_template = f.read()
+        self.phone_template = self._load_phone_template()
+        self.recorded = self._load_archive(archive) if archive else {}
+    
+    @staticmethod
+    def _load_phone_template() -> str:
+        """Use the first recorded GSMArena phone page from the benchmark fixtures."""
+        with open(os.path.join(FIXTURES_DIR, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        entry = next(entry for entry in manifest['pages'] if entry['site'] == 'gsmarena')
+        with gzip.open(os.path.join(FIXTURES_DIR, entry['file']), 'rt', encoding='utf-8') as f:
+            return f.read()
+    
+    @staticmethod
+    def _load_archive(path: str) -> Dict[str, Tuple[int, str]]:
+        """Map path?query -> (status, body) from a FETCH_MODE=record archive."""
+        recorded = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    parsed = urlparse(entry['url'])
+                    key = parsed.path + (f'?{parsed.query}' if parsed.query else '')
+                    recorded[key] = (entry['status'] or 200, entry.get('body') or '')
+        print(f"[FAKE] Loaded {len(recorded)} recorded pages from {path}")
+        return recorded
+    
+    # Request handling
+    
+    def handle(self, client: str, raw_path: str) -> Tuple[int, Dict[str, str], str]:
+        """
+        Answer one GET.
+        
+        Returns:
+            (status, headers, body)
+        """
+        if raw_path == '/__stats':
+            return 200, {'Content-Type': 'application/json'}, json.dumps(self.snapshot())
+        
+        with self._lock:
+            self.stats['requests'] += 1
+            self._inflight += 1
+            inflight = self._inflight
+            delay = self._random.uniform(*self.latency)
+            challenged = self._random.random() < self.challenge_rate
+        try:
+            if self.max_inflight and inflight > self.max_inflight:
+                return self._count(503, {'Retry-After': '1'}, 'Service Unavailable')
+            if self.limiter:
+                wait = self.limiter.take(client)
+                if wait:
+                    return self._count(429, {'Retry-After': str(math.ceil(wait))}, 'Too Many Requests')
+            if delay:
+                time.sleep(delay)
+            if challenged:
+                with self._lock:
+                    self.stats['challenge'] += 1
+                return self._count(200, {}, CHALLENGE_PAGE)
+            
+            status, body = self.route(raw_path)
+            return self._count(status, {}, body)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+    
+    def route(self, raw_path: str) -> Tuple[int, str]:
+        """Render the page for a path (query included)."""
+        if raw_path in self.recorded:
+            return self.recorded[raw_path]
+        
+        parsed = urlparse(raw_path)
+        # The crawl scripts append "&iPage=N" to the .php path itself
+        path, _, extra = parsed.path.partition('&')
+        params = parse_qs('&'.join(part for part in (parsed.query, extra) if part))
+        page_param = params.get('iPage', ['1'])[0] or '1'
+        if not page_param.isdigit():
+            self._route('other')
+            return 404, 'Not Found'
+        page = int(page_param)
+        
+        if path == '/makers.php3':
+            self._route('makers')
+            return 200, self.render_makers()
+        
+        if path == '/results.php3':
+            self._route('results')
+            query = params.get('sName', [''])[0]
+            phones = self.catalog.search(query) if query else list(self.catalog.phones.values())
+            base = f"results.php3?{parsed.query}"
+            return 200, self.render_listing(phones, page, lambda n: f"{base}&iPage={n}")
+        
+        match = BRAND_PATH_RE.match(path)
+        if match:
+            self._route('brand')
+            slug, brand_id, page_from_path = match.group(1), int(match.group(2)), match.group(3)
+            phones = self.catalog.by_brand.get(brand_id)
+            if phones is None:
+                return 404, 'Not Found'
+            page = int(page_from_path) if page_from_path else page
+            return 200, self.render_listing(phones, page, lambda n: f"{slug}-phones-f-{brand_id}-0-p{n}.php")
+        
+        match = PHONE_PATH_RE.match(path)
+        if match:
+            self._route('phone')
+            phone = self.catalog.phones.get(int(match.group(2)))
+            if phone is None:
+                return 404, 'Not Found'
+            return 200, self.render_phone(phone)
+        
+        self._route('other')
+        return 404, 'Not Found'
+    
+    # Rendering
+    
+    def render_makers(self) -> str:
+        cells = ''.join(
+            f'<td><a href="{brand["slug"]}-phones-{brand["id"]}.php">{brand["name"]}<br>'
+            f'<span>{brand["count"]} devices</span></a></td>'
+            + ('</tr><tr>' if index % 2 else '')
+            for index, brand in enumerate(self.catalog.brands)
+        )
+        table = f'<div class="st-text"><table><tbody><tr>{cells}</tr></tbody></table></div>'
+        # Replace the phone list with the brand table
+        return LISTING_RE.sub(lambda m: f'{m.group(1)}{m.group(2)}{table}', self.listing_template, count=1)
+    
+    def render_listing(self, phones: List[Dict], page: int, page_href) -> str:
+        """Listing page in the phone finder layout, with a.pages-next when more pages follow."""
+        pages = max(1, math.ceil(len(phones) / self.page_size))
+        chunk = phones[(page - 1) * self.page_size:page * self.page_size]
+        items = ''.join(
+            f'<li><a href="{phone["href"]}"><img src="https://fdn2.gsmarena.com/vv/bigpic/{phone["id"]}.jpg" '
+            f'title="{phone["brand"]} {phone["model"]} Android smartphone."><strong><span>{phone["brand"]}<br>'
+            f'{phone["model"]}</span></strong></a></li>'
+            for phone in chunk
+        )
+        # Outside div.makers, as on GSMArena: the crawl scripts take every div.makers link for a phone
+        navigation = ''
+        if page < pages:
+            navigation = (f'<div class="nav-pages"><strong>{page}</strong>'
+                          f'<a class="pages-next" href="{page_href(page + 1)}" title="Next page"></a></div>')
+        html = LISTING_RE.sub(lambda m: f'{m.group(1)}{items}{m.group(2)}{navigation}', self.listing_template, count=1)
+        return RESULT_COUNT_RE.sub(f'Your search returned <b>{len(phones)}</b> results', html, count=1)
+    
+    def render_phone(self, phone: Dict) -> str:
+        return PHONE_NAME_RE.sub(lambda m: f'{m.group(1)}{phone["brand"]} {phone["model"]}{m.group(2)}',
+                                 self.phone_template, count=1)
+    
+    # Stats
+    
+    def _count(self, status: int, headers: Dict[str, str], body: str) -> Tuple[int, Dict[str, str], str]:
+        with self._lock:
+            key = str(status)
+            self.stats[key] = self.stats.get(key, 0) + 1
+        return status, headers, body
+    
+    def _route(self, name: str):
+        with self._lock:
+            self.routes[name] = self.routes.get(name, 0) + 1
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            uptime = time.time() - self.started
+            return {
+                **self.stats,
+                'routes': dict(self.routes),
+                'inflight': self._inflight,
+                'uptime_s': round(uptime, 1),
+                'requests_per_s': round(self.stats['requests'] / max(uptime, 1e-9), 1),
+            }
+
+
+def make_server(site: FakeGSMArena, host: str = '127.0.0.1', port: int = 8800, verbose: bool = False) -> ThreadingHTTPServer:
+    """Create (not start) a threaded HTTP server for the fake site."""
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            status, headers, body = site.handle(self.client_address[0], self.path)
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', headers.pop('Content-Type', 'text/html; charset=utf-8'))
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+    
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def _parse_latency(value: str) -> Tuple[float, float]:
+    low, _, high = value.partition('-')
+    return float(low) / 1000, float(high or low) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--brands', type=int, default=20, help='Number of synthetic brands')
+    parser.add_argument('--phones-per-brand', type=int, default=500, help='Synthetic phones per brand')
+    parser.add_argument('--page-size', type=int, default=40, help='Phones per listing page')
+    parser.add_argument('--rate', type=float, default=0, help='Requests/second allowed per client (0 = unlimited)')
+    parser.add_argument('--burst', type=int, default=10, help='Requests a client may burst above the rate')
+    parser.add_argument('--max-inflight', type=int, default=0, help='Concurrent requests before 503 (0 = unlimited)')
+    parser.add_argument('--challenge-rate', type=float, default=0, help='Fraction of pages replaced by a bot challenge')
+    parser.add_argument('--latency-ms', default='0', help='Added latency, e.g. "50" or "20-80"')
+    parser.add_argument('--archive', help='Serve pages recorded with FETCH_MODE=record first')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency and challenge injection')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+    
+    catalog = Catalog(args.brands, args.phones_per_brand)
+    site = FakeGSMArena(
+        catalog, page_size=args.page_size, rate=args.rate, burst=args.burst, max_inflight=args.max_inflight,
+        challenge_rate=args.challenge_rate, latency=_parse_latency(args.latency_ms), archive=args.archive,
+        seed=args.seed
+    )
+    server = make_server(site, args.host, args.port, args.verbose)
+    
+    print(f"[FAKE] GSMArena stand-in with {len(catalog.brands)} brands, {len(catalog.phones)} phones")
+    print(f"[FAKE] Listening on http://{args.host}:{args.port} (stats: /__stats)")
+    print(f"[FAKE] Crawl it with GSMARENA_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n[FAKE] {json.dumps(site.snapshot())}")
+
+
+if __name__ == "__main__":
+    main()
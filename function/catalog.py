@@ -0,0 +1,328 @@
+"""
+Phone catalog - serve searches from phones already stored in MongoDB
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from search_index import SearchIndex, phone_fields
+from suggest import PrefixSuggester
+from utils.spec_parser import parse_phone_specs
+
+# Stored documents carry crawl metadata that search responses don't need
+CATALOG_PROJECTION = {'_id': 0, 'query': 0, 'method': 0}
+
+
+class PhoneCatalog:
+    """
+    In-process copy of a stored phone collection with a typo-tolerant search index.
+    
+    Phones are deduplicated by URL (the most recently scraped copy wins).
+    refresh() only fetches documents scraped since the previous load.
+    """
+    
+    def __init__(self, mongo_client, collection_name: str = "phone_all_makers"):
+        """
+        Args:
+            mongo_client: Connected MongoDBClient
+            collection_name: Collection holding one phone per document
+        """
+        self.mongo_client = mongo_client
+        self.collection_name = collection_name
+        
+        self._phones: Dict[str, Dict] = {}
+        self._index = SearchIndex()
+        self._suggester = PrefixSuggester()
+        self._parsed: Dict[str, Dict] = {}
+        self._facets = None
+        self._similarity = None
+        self._last_scraped_at: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self._loaded = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the initial load has completed."""
+        return self._loaded.is_set()
+    
+    def __len__(self) -> int:
+        return len(self._phones)
+    
+    def refresh(self) -> int:
+        """
+        Load phones scraped since the last refresh (everything on the first call).
+        
+        Returns:
+            Number of documents read
+        """
+        started = time.time()
+        documents = self.mongo_client.iter_phones(
+            since=self._last_scraped_at,
+            projection=CATALOG_PROJECTION,
+            collection_name=self.collection_name
+        )
+        
+        count = 0
+        for document in documents:
+            self._add(document)
+            count += 1
+        
+        self._loaded.set()
+        if count:
+            print(f"[CATALOG] Loaded {count} phones from {self.collection_name} "
+                  f"in {time.time() - started:.1f}s ({len(self._phones)} unique)")
+        return count
+    
+    def start_auto_refresh(self, interval: int = 300):
+        """
+        Load the catalog and keep refreshing it in a background thread.
+        
+        Args:
+            interval: Seconds between incremental refreshes
+        """
+        if self._refresh_thread:
+            return
+        
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"[CATALOG] ❌ Refresh failed: {e}")
+                time.sleep(interval)
+        
+        self._refresh_thread = threading.Thread(target=loop, name="catalog-refresh", daemon=True)
+        self._refresh_thread.start()
+    
+    def phones(self, sites: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Snapshot of the stored phones (the list holds references, not copies).
+        
+        Args:
+            sites: Only return phones from these sources (None for all)
+        """
+        with self._lock:
+            phones = list(self._phones.values())
+        if sites is not None:
+            wanted = {site.lower() for site in sites}
+            phones = [phone for phone in phones if (phone.get('source') or '').lower() in wanted]
+        return phones
+    
+    def search(self, query: str, sites: Optional[List[str]] = None, max_results: int = 10) -> List[Dict]:
+        """
+        Find stored phones matching every query token, tolerating typos.
+        
+        Args:
+            query: Search query (e.g., "Galaxy S24", "galxy s24 ultra")
+            sites: Only return phones from these sources (None for all)
+            max_results: Maximum phones to return per site
+        
+        Returns:
+            List of phone dictionaries, best match first
+        """
+        # BM25 ranks closest names first: "Galaxy S24" before "Galaxy S24 Ultra"
+        with self._lock:
+            phones = [self._phones[url] for url, _ in self._index.search(query, limit=None)]
+        
+        if sites is not None:
+            wanted = {site.lower() for site in sites}
+            phones = [phone for phone in phones if (phone.get('source') or '').lower() in wanted]
+        
+        per_site: Dict[str, int] = {}
+        results = []
+        for phone in phones:
+            site = (phone.get('source') or '').lower()
+            if per_site.get(site, 0) >= max_results:
+                continue
+            per_site[site] = per_site.get(site, 0) + 1
+            results.append(phone)
+        return results
+    
+    def facets(self):
+        """Return a FacetIndex over the current catalog, rebuilding it after refreshes."""
+        from facets import FacetIndex
+        
+        with self._lock:
+            if self._facets is None:
+                self._facets = FacetIndex(*self._parsed_rows())
+            return self._facets
+    
+    def similarity(self):
+        """Return a SimilarityIndex over the current catalog, rebuilding it after refreshes."""
+        from similarity import SimilarityIndex
+        
+        with self._lock:
+            if self._similarity is None:
+                self._similarity = SimilarityIndex(*self._parsed_rows())
+            return self._similarity
+    
+    def compare(self, urls: List[str]):
+        """
+        Build a comparison matrix for catalog phones.
+        
+        Args:
+            urls: Phone URLs, in the desired row order
+        
+        Returns:
+            Tuple of (ComparisonMatrix of the phones found, list of URLs not in the catalog)
+        """
+        from comparison import ComparisonMatrix
+        
+        phones, parsed, missing = [], [], []
+        with self._lock:
+            for url in urls:
+                phone = self._phones.get(url)
+                if phone is None:
+                    missing.append(url)
+                    continue
+                if url not in self._parsed:
+                    self._parsed[url] = parse_phone_specs(phone)
+                phones.append(phone)
+                parsed.append(self._parsed[url])
+        return ComparisonMatrix(phones, parsed), missing
+    
+    def _parsed_rows(self):
+        """
+        Return (phones, parsed specs) in catalog order (caller holds the lock).
+        
+        Specs are parsed once per stored phone; rebuilds only parse new ones.
+        """
+        phones = list(self._phones.values())
+        parsed = []
+        for phone in phones:
+            url = phone['url']
+            if url not in self._parsed:
+                self._parsed[url] = parse_phone_specs(phone)
+            parsed.append(self._parsed[url])
+        return phones, parsed
+    
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """
+        Complete a partially typed phone name.
+        
+        Names are ranked by popularity (how many sources list the phone, plus
+        how often it has been searched). When too few names start with the
+        prefix, typo-tolerant index matches fill the remaining slots.
+        
+        Args:
+            prefix: Typed text (e.g., "galaxy s2", "galxy")
+            limit: Maximum suggestions
+        
+        Returns:
+            List of {'name', 'weight'} dictionaries, best first
+        """
+        suggestions = self._suggester.suggest(prefix, limit=limit)
+        if len(suggestions) >= limit:
+            return suggestions
+        
+        seen = {suggestion['name'] for suggestion in suggestions}
+        suggestions = list(suggestions)
+        with self._lock:
+            for url, _ in self._index.search(prefix, limit=limit * 4):
+                name = _display_name(self._phones[url])
+                if name not in seen:
+                    seen.add(name)
+                    suggestions.append({'name': name, 'weight': self._suggester.weight(name)})
+                    if len(suggestions) >= limit:
+                        break
+        return suggestions
+    
+    def record_search(self, phones: List[Dict]):
+        """Count a served search towards the popularity of the top phone's name."""
+        if phones:
+            self._suggester.bump(_display_name(phones[0]))
+    
+    def search_results(self, query: str, sites: Optional[List[str]] = None,
+                       max_results: int = 10) -> Optional[dict]:
+        """
+        Search the catalog and return results shaped like UniversalSearch.search_all().
+        
+        Returns:
+            Results dictionary, or None if nothing matched
+        """
+        phones = self.search(query, sites=sites, max_results=max_results)
+        if not phones:
+            return None
+        self.record_search(phones)
+        
+        scrapers: Dict[str, dict] = {}
+        for phone in phones:
+            site = (phone.get('source') or 'catalog').lower()
+            scrapers.setdefault(site, {'status': 'success', 'count': 0, 'phones': []})
+            scrapers[site]['phones'].append(phone)
+            scrapers[site]['count'] += 1
+        
+        return {
+            'query': query,
+            'timestamp': datetime.now().isoformat(),
+            'scrapers': scrapers,
+            'total_found': len(phones)
+        }
+    
+    def _add(self, document: Dict):
+        """Insert or replace one phone and index it."""
+        scraped_at = document.get('scraped_at')
+        if isinstance(scraped_at, datetime):
+            if self._last_scraped_at is None or scraped_at > self._last_scraped_at:
+                self._last_scraped_at = scraped_at
+            document['scraped_at'] = scraped_at.isoformat()
+        
+        url = document.get('url')
+        if not url or not document.get('brand') or not document.get('model'):
+            return
+        
+        with self._lock:
+            previous = self._phones.get(url)
+            name = _display_name(document)
+            if previous is None or _display_name(previous) != name:
+                # Phones listed by several sources are more popular suggestions
+                self._suggester.add(name, brand=document['brand'])
+            self._phones[url] = document
+            self._index.add(url, phone_fields(document))
+            self._parsed.pop(url, None)
+            self._facets = None
+            self._similarity = None
+
+
+def _display_name(phone: Dict) -> str:
+    """Return "Brand Model" without repeating a brand the model already starts with."""
+    brand, model = phone.get('brand') or '', phone.get('model') or ''
+    if model.lower().startswith(brand.lower()):
+        return model
+    return f"{brand} {model}"
+
+
+_catalog: Optional[PhoneCatalog] = None
+_catalog_disabled = False
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(collection_name: Optional[str] = None, refresh_interval: Optional[int] = None) -> Optional[PhoneCatalog]:
+    """
+    Return the process-wide catalog, starting its background load on first use.
+    
+    Args:
+        collection_name: Collection to serve (default: CATALOG_COLLECTION or phone_all_makers)
+        refresh_interval: Seconds between refreshes (default: CATALOG_REFRESH_INTERVAL or 300)
+    
+    Returns:
+        PhoneCatalog, or None if MongoDB is not configured or unreachable
+    """
+    global _catalog, _catalog_disabled
+    collection_name = collection_name or os.environ.get('CATALOG_COLLECTION', 'phone_all_makers')
+    refresh_interval = refresh_interval or int(os.environ.get('CATALOG_REFRESH_INTERVAL', 300))
+    
+    with _catalog_lock:
+        if _catalog is None and not _catalog_disabled:
+            try:
+                from utils.mongodb_client import MongoDBClient
+                _catalog = PhoneCatalog(MongoDBClient(), collection_name=collection_name)
+            except Exception as e:
+                print(f"[CATALOG] ⚠️  Catalog disabled, searches will scrape live: {e}")
+                _catalog_disabled = True
+                return None
+            _catalog.start_auto_refresh(refresh_interval)
+        return _catalog
@@ -0,0 +1,194 @@
+"""
+Batch spec comparison for many phones at once.
+
+Builds a typed phones x fields matrix from parsed specs, with per-field
+min/max, ranks and "best" flags, and exports it as JSON, CSV or Parquet.
+"""
+import csv
+import io
+from typing import BinaryIO, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from utils.spec_parser import NUMERIC_FIELDS, parse_phone_specs
+
+# +1: higher is better, -1: lower is better, 0: no preferred direction
+FIELD_DIRECTIONS = {
+    'price_inr': -1,
+    'price_usd': -1,
+    'price_eur': -1,
+    'display_in': 0,
+    'battery_mah': 1,
+    'ram_gb': 1,
+    'storage_gb': 1,
+    'main_camera_mp': 1,
+    'weight_g': -1,
+    'year': 1,
+}
+
+TEXT_FIELDS = ('name', 'brand', 'model', 'source', 'url', 'os', 'chipset_vendor')
+
+
+class ComparisonMatrix:
+    """
+    Aligned comparison of phones over NUMERIC_FIELDS.
+    
+    Attributes:
+        values: float64 array (phones x fields), NaN where unknown
+        ranks: int array (phones x fields), 1 = best, 0 where unknown or unranked
+        best: bool array (phones x fields), True for the best value(s) of each field
+        minimum, maximum: per-field arrays (NaN for fields nobody has)
+    """
+    
+    def __init__(self, phones: Sequence[Dict], parsed: Optional[Sequence[Dict]] = None,
+                 fields: Sequence[str] = NUMERIC_FIELDS):
+        """
+        Args:
+            phones: Phone dictionaries, one row each
+            parsed: parse_phone_specs() output for each phone (parsed here if omitted)
+            fields: Numeric fields to compare, one column each
+        """
+        self.phones = list(phones)
+        self.parsed = list(parsed) if parsed is not None else [parse_phone_specs(phone) for phone in self.phones]
+        self.fields = list(fields)
+        
+        self.values = np.array(
+            [[row.get(field, np.nan) for field in self.fields] for row in self.parsed],
+            dtype=np.float64
+        ).reshape(len(self.phones), len(self.fields))
+        
+        known = ~np.isnan(self.values)
+        has_values = known.any(axis=0)
+        filled_min = np.where(known, self.values, np.inf).min(axis=0, initial=np.inf)
+        filled_max = np.where(known, self.values, -np.inf).max(axis=0, initial=-np.inf)
+        self.minimum = np.where(has_values, filled_min, np.nan)
+        self.maximum = np.where(has_values, filled_max, np.nan)
+        
+        self.ranks = np.zeros(self.values.shape, dtype=np.int32)
+        self.best = np.zeros(self.values.shape, dtype=bool)
+        for column, field in enumerate(self.fields):
+            direction = FIELD_DIRECTIONS.get(field, 0)
+            if not direction or not has_values[column]:
+                continue
+            rows = np.flatnonzero(known[:, column])
+            # Rank 1 is the best value; ties share the better rank
+            scores = -self.values[rows, column] * direction
+            ordered = np.sort(scores)
+            self.ranks[rows, column] = np.searchsorted(ordered, scores, side='left') + 1
+            self.best[rows, column] = self.ranks[rows, column] == 1
+    
+    def __len__(self) -> int:
+        return len(self.phones)
+    
+    def _text(self, row: int) -> Dict[str, str]:
+        """Identifying text columns for one phone."""
+        phone, parsed = self.phones[row], self.parsed[row]
+        return {
+            'name': f"{phone.get('brand', '')} {phone.get('model', '')}".strip(),
+            'brand': phone.get('brand') or '',
+            'model': phone.get('model') or '',
+            'source': phone.get('source') or '',
+            'url': phone.get('url') or '',
+            'os': parsed.get('os', ''),
+            'chipset_vendor': parsed.get('chipset_vendor', ''),
+        }
+    
+    def to_dict(self) -> Dict:
+        """
+        JSON-friendly comparison.
+        
+        Returns:
+            {'fields', 'phones': [{text columns, 'values', 'ranks', 'best'}],
+             'summary': {field: {'min', 'max', 'best': [row indexes]}}}
+        """
+        def number(value):
+            return None if np.isnan(value) else float(value)
+        
+        phones = []
+        for row in range(len(self.phones)):
+            entry = self._text(row)
+            entry['values'] = {field: number(value) for field, value in zip(self.fields, self.values[row])}
+            entry['ranks'] = {field: int(rank) for field, rank in zip(self.fields, self.ranks[row]) if rank}
+            entry['best'] = [field for field, flag in zip(self.fields, self.best[row]) if flag]
+            phones.append(entry)
+        
+        summary = {
+            field: {
+                'min': number(self.minimum[column]),
+                'max': number(self.maximum[column]),
+                'best': np.flatnonzero(self.best[:, column]).tolist()
+            }
+            for column, field in enumerate(self.fields)
+        }
+        return {'fields': self.fields, 'phones': phones, 'summary': summary}
+    
+    def to_csv(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Write one row per phone: text columns, values, then <field>_rank and <field>_best.
+        
+        Args:
+            path: File to write; returns the CSV text if omitted
+        """
+        output = io.StringIO() if path is None else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            writer = csv.writer(output)
+            writer.writerow(list(TEXT_FIELDS) + self.fields
+                            + [f'{field}_rank' for field in self.fields]
+                            + [f'{field}_best' for field in self.fields])
+            for row in range(len(self.phones)):
+                text = self._text(row)
+                writer.writerow(
+                    [text[column] for column in TEXT_FIELDS]
+                    + [_csv_number(value) for value in self.values[row]]
+                    + [int(rank) or '' for rank in self.ranks[row]]
+                    + [int(flag) for flag in self.best[row]]
+                )
+            if path is None:
+                return output.getvalue()
+        finally:
+            output.close()
+        return None
+    
+    def to_parquet(self, path: Union[str, BinaryIO]):
+        """
+        Write the matrix as a Parquet file (requires pyarrow).
+        
+        Args:
+            path: File path or writable binary file object (e.g. io.BytesIO)
+        
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+        
+        texts = [self._text(row) for row in range(len(self.phones))]
+        columns = {column: pa.array([text[column] for text in texts], type=pa.string()) for column in TEXT_FIELDS}
+        for index, field in enumerate(self.fields):
+            columns[field] = pa.array(self.values[:, index], mask=np.isnan(self.values[:, index]))
+            columns[f'{field}_rank'] = pa.array(self.ranks[:, index], mask=self.ranks[:, index] == 0)
+            columns[f'{field}_best'] = pa.array(self.best[:, index])
+        pq.write_table(pa.table(columns), path)
+
+
+def _csv_number(value: float) -> str:
+    """Exact text for a CSV cell: integers without a decimal point, floats round-trip."""
+    if np.isnan(value):
+        return ''
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def compare_batch(phones: Sequence[Union[Dict, object]], parsed: Optional[Sequence[Dict]] = None) -> ComparisonMatrix:
+    """
+    Compare many phones (Phone objects or dictionaries) at once.
+    
+    Args:
+        phones: Phones to compare
+        parsed: Already parsed specs, if available (e.g. from the catalog)
+    """
+    rows = [phone.to_dict() if hasattr(phone, 'to_dict') else phone for phone in phones]
+    return ComparisonMatrix(rows, parsed)
@@ -0,0 +1,176 @@
+"""
+Faceted filtering over parsed phone specs.
+
+Numeric fields are held as NumPy column arrays (NaN where unknown) and every
+categorical value as a packed bitset, so any filter combination is a handful
+of vectorized comparisons and bitwise ANDs over the whole catalog.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.spec_parser import CATEGORICAL_FIELDS, NUMERIC_FIELDS
+
+# Number of set bits for every byte value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def _popcount(bits: np.ndarray) -> int:
+    """Count set bits in a packed bitset."""
+    return int(_POPCOUNT[bits].sum())
+
+
+def _category_value(field: str, value) -> str:
+    """Normalize a categorical value (years are stored as floats by the parser)."""
+    if field == 'year':
+        return str(int(value))
+    return str(value).lower()
+
+
+class FacetIndex:
+    """
+    Column store of parsed specs for a fixed list of phones.
+    
+    Filters look like:
+        {'brand': ['samsung', 'xiaomi'], 'os': 'android',
+         'price_inr': {'max': 20000}, 'ram_gb': {'min': 8}}
+    
+    Categorical filters match any of the given values; numeric filters take
+    inclusive 'min' and/or 'max' bounds and exclude phones where the field is
+    unknown. Facet counts for a field ignore that field's own filter, so a
+    client can show how many phones each alternative value would match.
+    """
+    
+    def __init__(self, phones: List[Dict], parsed: List[Dict]):
+        """
+        Args:
+            phones: Phone dictionaries, in row order
+            parsed: parse_phone_specs() output for each phone
+        """
+        self.phones = phones
+        self.parsed = parsed
+        self.size = len(phones)
+        
+        self.columns: Dict[str, np.ndarray] = {
+            field: np.array([row.get(field, np.nan) for row in parsed], dtype=np.float64)
+            for field in NUMERIC_FIELDS
+        }
+        
+        self.bitsets: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in CATEGORICAL_FIELDS:
+            rows_by_value: Dict[str, List[int]] = {}
+            for row, values in enumerate(parsed):
+                if field in values:
+                    rows_by_value.setdefault(_category_value(field, values[field]), []).append(row)
+            self.bitsets[field] = {value: self._pack(rows) for value, rows in rows_by_value.items()}
+        
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+    
+    def _pack(self, rows: List[int]) -> np.ndarray:
+        """Build a packed bitset with the given rows set."""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+    
+    def filter(self, filters: Optional[Dict] = None, sort: Optional[str] = None, descending: bool = False,
+               limit: int = 20, offset: int = 0) -> Dict:
+        """
+        Apply filters and return the matching page with facet counts.
+        
+        Args:
+            filters: Field -> value(s) or {'min', 'max'} bounds (see class docstring)
+            sort: Numeric field to sort by (phones without it come last)
+            descending: Sort order
+            limit: Page size
+            offset: Page start
+        
+        Returns:
+            Dictionary with 'total', 'phones' (the page), 'parsed' (their typed
+            specs), 'facets' (value counts) and 'ranges' (numeric min/max)
+        
+        Raises:
+            ValueError: On unknown fields or malformed filter values
+        """
+        filters = filters or {}
+        masks = {field: self._field_mask(field, condition) for field, condition in filters.items()}
+        
+        if sort is not None and sort not in self.columns:
+            raise ValueError(f"Cannot sort by '{sort}'. Numeric fields: {', '.join(NUMERIC_FIELDS)}")
+        
+        selected = self._combine(masks.values())
+        rows = np.flatnonzero(np.unpackbits(selected, count=self.size))
+        
+        if sort is not None:
+            values = self.columns[sort][rows]
+            # NaN sorts last either way
+            order = np.argsort(-values if descending else values, kind='stable')
+            rows = rows[order]
+        
+        page = rows[offset:offset + limit]
+        
+        return {
+            'total': int(len(rows)),
+            'phones': [self.phones[row] for row in page],
+            'parsed': [self.parsed[row] for row in page],
+            'facets': self._facet_counts(masks),
+            'ranges': self._ranges(selected)
+        }
+    
+    def _field_mask(self, field: str, condition) -> np.ndarray:
+        """Return the packed bitset of rows satisfying one field's condition."""
+        if field in self.columns and isinstance(condition, dict):
+            column = self.columns[field]
+            mask = ~np.isnan(column)
+            try:
+                if condition.get('min') is not None:
+                    mask &= column >= float(condition['min'])
+                if condition.get('max') is not None:
+                    mask &= column <= float(condition['max'])
+            except (TypeError, ValueError):
+                raise ValueError(f"'{field}' bounds must be numbers")
+            return np.packbits(mask)
+        
+        if field in self.bitsets:
+            values = condition if isinstance(condition, list) else [condition]
+            bits = np.zeros_like(self._all)
+            for value in values:
+                try:
+                    value_bits = self.bitsets[field].get(_category_value(field, value))
+                except ValueError:
+                    raise ValueError(f"Invalid {field} value: {value!r}")
+                if value_bits is not None:
+                    bits |= value_bits
+            return bits
+        
+        if field in self.columns:
+            raise ValueError(f"'{field}' takes a {{'min': ..., 'max': ...}} range")
+        raise ValueError(f"Unknown filter field '{field}'. "
+                         f"Fields: {', '.join(sorted(set(NUMERIC_FIELDS) | set(CATEGORICAL_FIELDS)))}")
+    
+    def _combine(self, masks) -> np.ndarray:
+        """AND packed bitsets together (all rows if there are none)."""
+        result = self._all.copy()
+        for mask in masks:
+            result &= mask
+        return result
+    
+    def _facet_counts(self, masks: Dict[str, np.ndarray]) -> Dict[str, Dict[str, int]]:
+        """Count matches per categorical value, ignoring each field's own filter."""
+        facets = {}
+        for field, values in self.bitsets.items():
+            base = self._combine(mask for other, mask in masks.items() if other != field)
+            counts = {value: _popcount(bits & base) for value, bits in values.items()}
+            facets[field] = dict(sorted(((value, count) for value, count in counts.items() if count),
+                                        key=lambda item: -item[1]))
+        return facets
+    
+    def _ranges(self, selected: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Min/max of every numeric field over the selected rows."""
+        mask = np.unpackbits(selected, count=self.size).astype(bool)
+        ranges = {}
+        for field, column in self.columns.items():
+            values = column[mask]
+            values = values[~np.isnan(values)]
+            if len(values):
+                ranges[field] = {'min': float(values.min()), 'max': float(values.max()), 'count': int(len(values))}
+        return ranges
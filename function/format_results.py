@@ -2,21 +2,44 @@
 Format search results in detailed Flipkart-like format
 """
 import json
-from typing import List, Dict
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
 from models.phone import Phone
+from utils.spec_categorizer import categorize_specs
 
 
 def format_detailed_results(results: dict) -> dict:
     """
     Format search results in Flipkart-style detailed format.
     
+    Builds the whole formatted dictionary in memory; use
+    write_detailed_results() or iter_detailed_chunks() for large exports.
+    
     Args:
         results: Results from UniversalSearch.search_all()
         
     Returns:
         Detailed formatted results dictionary
     """
-    formatted = {
+    formatted = detailed_header(results)
+    formatted['result'] = [
+        format_detailed_phone(phone_data, scraper_name)
+        for phone_data, scraper_name in iter_result_phones(results)
+    ]
+    return formatted
+
+
+def detailed_header(results: dict) -> dict:
+    """
+    Build the top-level fields of the detailed format (everything but "result").
+    
+    Args:
+        results: Results from UniversalSearch.search_all()
+        
+    Returns:
+        Dictionary with total_result, query, query_params and timestamp
+    """
+    return {
         "total_result": results['total_found'],
         "query": results['query'],
         "query_params": results.get('query_params', {
@@ -26,56 +49,124 @@ def format_detailed_results(results: dict) -> dict:
             "max_price": None,
             "others": None
         }),
-        "timestamp": results['timestamp'],
-        "result": []
+        "timestamp": results['timestamp']
     }
+
+
+def iter_result_phones(results: dict) -> Iterator[Tuple[object, str]]:
+    """
+    Yield (phone_data, scraper_name) for every phone in search_all() results.
     
-    # Process results from each scraper
+    Args:
+        results: Results from UniversalSearch.search_all()
+    """
     for scraper_name, scraper_data in results['scrapers'].items():
         if scraper_data['count'] == 0:
             continue
         
         for phone_data in scraper_data['phones']:
-            # Create detailed phone entry
-            detailed_entry = {
-                "name": f"{phone_data['brand']} {phone_data['model']}",
-                "link": phone_data['url'],
-                "current_price": phone_data.get('price'),
-                "original_price": phone_data.get('original_price'),
-                "discounted": phone_data.get('discounted', False),
-                "thumbnail": phone_data.get('thumbnail'),
-                "query_url": phone_data['url'],
-                "rating": phone_data.get('rating'),
-                "in_stock": phone_data.get('in_stock', True),
-                "f_assured": phone_data.get('f_assured', False),
-                "source": phone_data.get('source', scraper_name),
-                
-                # Seller info
-                "seller": {
-                    "seller_name": phone_data.get('seller_name') or scraper_name,
-                    "seller_rating": phone_data.get('seller_rating')
-                },
-                
-                # Highlights
-                "highlights": phone_data.get('highlights', []),
-                
-                # Offers
-                "offers": phone_data.get('offers', []),
-                
-                # Detailed specs
-                "specs": phone_data.get('detailed_specs', []),
-                
-                # All images
-                "all_thumbnails": phone_data.get('all_images', phone_data.get('images', []))
-            }
-            
-            # Convert flat specs to detailed format if needed
-            if not detailed_entry['specs'] and phone_data.get('specs'):
-                detailed_entry['specs'] = convert_flat_specs_to_detailed(phone_data['specs'])
-            
-            formatted['result'].append(detailed_entry)
+            yield phone_data, scraper_name
+
+
+def format_basic_results(results: dict) -> dict:
+    """
+    Format search results as a flat list of phone summaries.
     
-    return formatted
+    Args:
+        results: Results from UniversalSearch.search_all()
+        
+    Returns:
+        Dictionary with query, total_results and phones
+    """
+    phones = []
+    for scraper_name, scraper_data in results['scrapers'].items():
+        if scraper_data.get('status') == 'success':
+            phones.extend(format_basic_phone(phone) for phone in scraper_data['phones'])
+    
+    return {
+        'query': results['query'],
+        'total_results': len(phones),
+        'phones': phones
+    }
+
+
+def format_basic_phone(phone_data) -> dict:
+    """
+    Format a single phone as a basic search result summary.
+    
+    Args:
+        phone_data: Phone (or CompactPhone) object or phone dictionary
+        
+    Returns:
+        Summary dictionary (name, brand, price, rating, url, image_url, source)
+    """
+    if hasattr(phone_data, 'to_dict'):
+        phone_data = phone_data.to_dict()
+    
+    images = phone_data.get('images') or []
+    return {
+        'name': f"{phone_data['brand']} {phone_data['model']}",
+        'brand': phone_data['brand'],
+        'price': phone_data.get('price'),
+        'rating': phone_data.get('rating'),
+        'url': phone_data.get('url'),
+        'image_url': phone_data.get('thumbnail') or (images[0] if images else None),
+        'source': phone_data.get('source')
+    }
+
+
+def format_detailed_phone(phone_data, scraper_name: str = "") -> dict:
+    """
+    Format a single phone as a Flipkart-style detailed entry.
+    
+    Args:
+        phone_data: Phone (or CompactPhone) object or phone dictionary
+        scraper_name: Name of the scraper the phone came from (fallback source)
+        
+    Returns:
+        Detailed phone entry dictionary
+    """
+    if hasattr(phone_data, 'to_dict'):
+        phone_data = phone_data.to_dict()
+    
+    # Create detailed phone entry
+    detailed_entry = {
+        "name": f"{phone_data['brand']} {phone_data['model']}",
+        "link": phone_data['url'],
+        "current_price": phone_data.get('price'),
+        "original_price": phone_data.get('original_price'),
+        "discounted": phone_data.get('discounted', False),
+        "thumbnail": phone_data.get('thumbnail'),
+        "query_url": phone_data['url'],
+        "rating": phone_data.get('rating'),
+        "in_stock": phone_data.get('in_stock', True),
+        "f_assured": phone_data.get('f_assured', False),
+        "source": phone_data.get('source', scraper_name),
+        
+        # Seller info
+        "seller": {
+            "seller_name": phone_data.get('seller_name') or scraper_name,
+            "seller_rating": phone_data.get('seller_rating')
+        },
+        
+        # Highlights
+        "highlights": phone_data.get('highlights', []),
+        
+        # Offers
+        "offers": phone_data.get('offers', []),
+        
+        # Detailed specs
+        "specs": phone_data.get('detailed_specs', []),
+        
+        # All images
+        "all_thumbnails": phone_data.get('all_images', phone_data.get('images', []))
+    }
+    
+    # Convert flat specs to detailed format if needed
+    if not detailed_entry['specs'] and phone_data.get('specs'):
+        detailed_entry['specs'] = convert_flat_specs_to_detailed(phone_data['specs'])
+    
+    return detailed_entry
 
 
 def convert_flat_specs_to_detailed(flat_specs: dict) -> List[Dict]:
@@ -88,76 +179,118 @@ def convert_flat_specs_to_detailed(flat_specs: dict) -> List[Dict]:
     Returns:
         List of categorized specs
     """
-    # Group specs by category
-    categories = {
-        "Display": ['Display', 'Screen', 'Resolution', 'Size', 'Type', 'Protection'],
-        "Platform": ['OS', 'Chipset', 'CPU', 'GPU', 'Platform'],
-        "Memory": ['RAM', 'Memory', 'Internal', 'Storage', 'Card slot'],
-        "Main Camera": ['Main camera', 'Main Camera', 'Camera', 'Video'],
-        "Selfie Camera": ['Selfie camera', 'Selfie Camera', 'Front camera'],
-        "Sound": ['Loudspeaker', '3.5mm jack', 'Sound'],
-        "Comms": ['WLAN', 'Bluetooth', 'GPS', 'NFC', 'Radio', 'USB'],
-        "Battery": ['Battery', 'Charging', 'Type', 'Charging'],
-        "Misc": ['Colors', 'Models', 'SAR', 'Price'],
-    }
+    return categorize_specs(flat_specs)
+
+
+def iter_detailed_chunks(phones: Iterable[Tuple[object, str]], header: Optional[dict] = None,
+                         format: str = "json", indent: Optional[int] = 2) -> Iterator[str]:
+    """
+    Format phones one at a time and yield the output text chunk by chunk.
     
-    detailed_specs = []
+    Only one phone is formatted and encoded at a time, so memory stays
+    constant however many phones the iterable produces. The "json" output
+    is the same text json.dump() writes for format_detailed_results().
     
-    for category_name, keywords in categories.items():
-        details = []
+    Args:
+        phones: (phone_data, scraper_name) pairs, e.g. iter_result_phones(results)
+        header: Top-level fields (see detailed_header()); "json" only. When it
+            has no total_result, the count is written after the result array.
+        format: "json" (one object with a "result" array) or "ndjson" (one
+            detailed phone per line)
+        indent: JSON indentation ("json" only; None for compact output)
         
-        for spec_key, spec_value in flat_specs.items():
-            # Check if this spec belongs to this category
-            if any(keyword.lower() in spec_key.lower() for keyword in keywords):
-                details.append({
-                    "property": spec_key,
-                    "value": spec_value
-                })
+    Yields:
+        Text chunks, at most one phone per chunk
         
-        if details:
-            detailed_specs.append({
-                "title": category_name,
-                "details": details
-            })
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if format == "ndjson":
+        for phone_data, scraper_name in phones:
+            yield json.dumps(format_detailed_phone(phone_data, scraper_name), ensure_ascii=False) + "\n"
+        return
+    if format != "json":
+        raise ValueError(f"Unsupported format: {format} (use 'json' or 'ndjson')")
     
-    # Add remaining specs as "General"
-    used_keys = set()
-    for category in detailed_specs:
-        for detail in category['details']:
-            used_keys.add(detail['property'])
+    header = dict(header or {})
+    count_at_end = 'total_result' not in header
+    header['result'] = []
     
-    general_details = []
-    for spec_key, spec_value in flat_specs.items():
-        if spec_key not in used_keys:
-            general_details.append({
-                "property": spec_key,
-                "value": spec_value
-            })
+    # Split the encoded header around the empty result array and fill it in as phones arrive
+    prefix, suffix = json.dumps(header, indent=indent, ensure_ascii=False).rsplit('[]', 1)
+    if indent is None:
+        item_prefix, separator, closing = '', ', ', ']'
+    else:
+        item_prefix = '\n' + ' ' * (indent * 2)
+        separator, closing = ',', '\n' + ' ' * indent + ']'
     
-    if general_details:
-        detailed_specs.append({
-            "title": "General",
-            "details": general_details
-        })
+    count = 0
+    yield prefix + '['
+    for phone_data, scraper_name in phones:
+        entry = json.dumps(format_detailed_phone(phone_data, scraper_name), indent=indent, ensure_ascii=False)
+        if indent is not None:
+            entry = entry.replace('\n', item_prefix)
+        yield (separator if count else '') + item_prefix + entry
+        count += 1
+    yield (closing if count else ']')
     
-    return detailed_specs
+    if count_at_end:
+        # Phone count only known now: add it as the last field
+        field = f'"total_result": {count}'
+        yield (', ' + field if indent is None else ',\n' + ' ' * indent + field) + suffix
+    else:
+        yield suffix
 
 
-def save_detailed_results(results: dict, filename: str):
+def write_detailed_results(phones: Iterable[Tuple[object, str]], output: IO[str],
+                           header: Optional[dict] = None, format: str = "json",
+                           indent: Optional[int] = 2) -> int:
+    """
+    Stream phones in detailed format to an open text file (see iter_detailed_chunks).
+    
+    Args:
+        phones: (phone_data, scraper_name) pairs
+        output: Writable text stream
+        header: Top-level fields for the "json" format
+        format: "json" or "ndjson"
+        indent: JSON indentation ("json" only)
+        
+    Returns:
+        Number of phones written
+    """
+    count = 0
+    
+    def counted():
+        nonlocal count
+        for item in phones:
+            count += 1
+            yield item
+    
+    for chunk in iter_detailed_chunks(counted(), header, format=format, indent=indent):
+        output.write(chunk)
+    return count
+
+
+def save_detailed_results(results: dict, filename: str, format: str = "json") -> int:
     """
     Save results in detailed Flipkart-like format.
     
+    Phones are formatted and written one at a time instead of building the
+    whole formatted document first.
+    
     Args:
         results: Results from UniversalSearch.search_all()
-        filename: Output JSON file path
+        filename: Output file path
+        format: "json" or "ndjson"
+        
+    Returns:
+        Number of phones saved
     """
-    formatted = format_detailed_results(results)
-    
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(formatted, f, indent=2, ensure_ascii=False)
+        count = write_detailed_results(iter_result_phones(results), f, header=detailed_header(results), format=format)
     
     print(f"\n[SAVED] Detailed results saved to: {filename}")
-    return formatted
+    return count
 
 
 def print_detailed_phone(phone_data: dict):
@@ -208,8 +341,9 @@ if __name__ == "__main__":
     results = searcher.search_all("Samsung S24", max_results_per_site=2)
     
     # Format and save in detailed format
-    detailed = save_detailed_results(results, "data/detailed_results.json")
+    save_detailed_results(results, "data/detailed_results.json")
     
     # Print first result
-    if detailed['result']:
-        print_detailed_phone(detailed['result'][0])
+    for phone_data, scraper_name in iter_result_phones(results):
+        print_detailed_phone(format_detailed_phone(phone_data, scraper_name))
+        break
@@ -14,8 +14,17 @@ if function_dir not in sys.path:
     sys.path.insert(0, function_dir)
 
 # Now import modules
-from universal_search import UniversalSearch
-from format_results import format_detailed_results
+from format_results import format_detailed_results, format_basic_results
+from utils.scraper_pool import get_scraper_pool
+from catalog import get_catalog
+
+
+def _scraper_pool():
+    """Warm scrapers kept alive across invocations of this runtime."""
+    return get_scraper_pool(
+        size=int(os.environ.get('SCRAPER_POOL_SIZE', 1)),
+        max_queued=int(os.environ.get('SCRAPER_POOL_MAX_QUEUED', 10))
+    )
 
 
 def main(context):
@@ -106,6 +115,7 @@ def handle_search(req, res):
         mode = body.get('mode', 'basic')
         max_results = int(body.get('max_results', 5))
         sites = body.get('sites', ['gsmarena', '91mobiles', 'kimovil'])
+        fresh = str(body.get('fresh', False)).lower() in ('1', 'true', 'yes')
         
         # Validate query
         if not query:
@@ -121,19 +131,31 @@ def handle_search(req, res):
                 'message': 'max_results must be between 1 and 20'
             }, 400)
         
-        # Perform search
+        detailed = (mode == 'detailed')
+        
+        # Answer from the stored catalog unless a fresh scrape was requested
+        catalog = None if fresh else get_catalog()
+        results = catalog.search_results(query, sites=sites, max_results=max_results) if catalog and catalog.ready else None
+        if results:
+            print(f"Served {results['total_found']} results from catalog")
+            formatted_results = format_detailed_results(results) if detailed else format_basic_results(results)
+            return res.json({
+                'success': True,
+                'origin': 'catalog',
+                'data': formatted_results
+            })
+        
+        # Perform search on a warm pooled scraper
         try:
-            searcher = UniversalSearch()
-            detailed = (mode == 'detailed')
-            
             print(f"Starting search for: {query}")
-            results = searcher.search(
-                query=query,
-                detailed=detailed,
-                max_results=max_results,
-                sites=sites
+            results = _scraper_pool().run(
+                lambda searcher: searcher.search_all(
+                    query=query,
+                    max_results_per_site=max_results,
+                    sites=sites
+                )
             )
-            print(f"Search completed. Found {len(results)} results")
+            print(f"Search completed. Found {results['total_found']} results")
         except Exception as search_error:
             print(f"Search error: {str(search_error)}")
             return res.json({
@@ -145,25 +167,11 @@ def handle_search(req, res):
         if detailed:
             formatted_results = format_detailed_results(results)
         else:
-            formatted_results = {
-                'query': query,
-                'total_results': len(results),
-                'phones': [
-                    {
-                        'name': phone.name,
-                        'brand': phone.brand,
-                        'price': phone.price,
-                        'rating': phone.rating,
-                        'url': phone.url,
-                        'image_url': phone.image_url,
-                        'source': phone.source
-                    }
-                    for phone in results
-                ]
-            }
+            formatted_results = format_basic_results(results)
         
         return res.json({
             'success': True,
+            'origin': 'live',
             'data': formatted_results
         })
     
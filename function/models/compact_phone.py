@@ -0,0 +1,214 @@
+"""
+Compact, slotted phone representation for large in-memory catalogs.
+"""
+
+import sys
+from dataclasses import MISSING, fields
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from models.phone import Phone, with_flat_specs
+
+# Phone fields with their defaults (factories are called on read)
+_DEFAULTS = {
+    f.name: (f.default_factory if f.default_factory is not MISSING else f.default)
+    for f in fields(Phone)
+}
+_FACTORIES = {f.name for f in fields(Phone) if f.default_factory is not MISSING}
+_FIELD_NAMES = tuple(_DEFAULTS)
+
+# Fields stored in their own slot; everything else lives in the sparse _extra dict
+_CORE_FIELDS = ('brand', 'model', 'url', 'source', 'price', 'currency', 'rating', 'thumbnail')
+
+# Short values ("Yes", "No", "Li-Po") repeat across phones and are interned
+_INTERN_MAX_LENGTH = 24
+
+# Identical spec key sequences (most phones from one site share them) are stored once
+_key_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern(text):
+    """Intern short strings so repeated keys and values share one object."""
+    if isinstance(text, str) and len(text) <= _INTERN_MAX_LENGTH:
+        return sys.intern(text)
+    return text
+
+
+def _readonly(value):
+    """Read-only view of a container field (tuple for lists, mapping proxy for dicts)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    return value
+
+
+def _shared_keys(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Return the canonical tuple for a key sequence."""
+    keys = tuple(sys.intern(key) for key in keys)
+    return _key_tuples.setdefault(keys, keys)
+
+
+class CompactPhone:
+    """
+    Memory-efficient stand-in for Phone.
+    
+    Exposes the same attributes and to_dict()/to_json() as Phone, but:
+    - uses __slots__ instead of a per-instance __dict__
+    - keeps rarely set fields in one sparse dict (None when all are default)
+    - stores specs as parallel key/value tuples with interned, shared key tuples
+    - stores detailed_specs as (title, keys, values) tuples
+    
+    Container fields are read-only on read (tuples and mapping proxies), so
+    in-place changes (phone.specs['RAM'] = ..., phone.images.append(...))
+    raise instead of being lost: change them by assignment (phone.specs = {...}).
+    """
+    
+    __slots__ = _CORE_FIELDS + ('_spec_keys', '_spec_values', '_detailed', '_images', '_extra')
+    
+    def __init__(self, brand: str, model: str, url: str, **kwargs):
+        """Accepts the same arguments as Phone."""
+        unknown = set(kwargs) - set(_FIELD_NAMES)
+        if unknown:
+            raise TypeError(f"Unexpected Phone fields: {', '.join(sorted(unknown))}")
+        
+        object.__setattr__(self, '_spec_keys', ())
+        object.__setattr__(self, '_spec_values', ())
+        object.__setattr__(self, '_detailed', ())
+        object.__setattr__(self, '_images', ())
+        object.__setattr__(self, '_extra', None)
+        for name in _CORE_FIELDS:
+            object.__setattr__(self, name, _DEFAULTS[name])
+        
+        self.brand = brand
+        self.model = model
+        self.url = url
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+    
+    @classmethod
+    def from_phone(cls, phone: Phone) -> 'CompactPhone':
+        """Convert a Phone."""
+        return cls.from_dict(phone.to_dict())
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompactPhone':
+        """Create from a phone dictionary, ignoring keys that are not Phone fields."""
+        return cls(**with_flat_specs({name: data[name] for name in _FIELD_NAMES if name in data}))
+    
+    def to_phone(self) -> Phone:
+        """Convert back to a regular Phone."""
+        return Phone(**self.to_dict())
+    
+    def to_dict(self, deep: bool = False, flat_specs: bool = True) -> Dict:
+        """Convert to the same dictionary Phone.to_dict() returns (containers are always fresh)."""
+        data = {}
+        for name in _FIELD_NAMES:
+            value = getattr(self, name)
+            data[name] = list(value) if isinstance(value, tuple) else dict(value) if isinstance(value, Mapping) else value
+        data['detailed_specs'] = [
+            {
+                'title': title,
+                'details': [{'property': key, 'value': value} for key, value in zip(keys, values)]
+            }
+            for title, keys, values in self._detailed
+        ]
+        if not flat_specs and self._detailed:
+            del data['specs']
+        return data
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Convert to JSON string."""
+        return self.to_phone().to_json(indent=indent)
+    
+    def to_bytes(self, format: str = "json") -> bytes:
+        """Serialize to compact bytes (see Phone.to_bytes)."""
+        return self.to_phone().to_bytes(format)
+    
+    # Specs
+    
+    @property
+    def specs(self) -> Mapping[str, str]:
+        return MappingProxyType(dict(zip(self._spec_keys, self._spec_values)))
+    
+    @specs.setter
+    def specs(self, specs: Optional[Dict[str, str]]):
+        specs = specs or {}
+        object.__setattr__(self, '_spec_keys', _shared_keys(tuple(specs)))
+        object.__setattr__(self, '_spec_values', tuple(_intern(value) for value in specs.values()))
+    
+    @property
+    def detailed_specs(self) -> Tuple[Mapping, ...]:
+        return tuple(
+            MappingProxyType({
+                'title': title,
+                'details': tuple(
+                    MappingProxyType({'property': key, 'value': value}) for key, value in zip(keys, values)
+                )
+            })
+            for title, keys, values in self._detailed
+        )
+    
+    @detailed_specs.setter
+    def detailed_specs(self, detailed_specs: Optional[List[Dict]]):
+        # Flat specs usually repeat the detailed values: reuse the same string objects
+        pool = {value: value for value in self._spec_values if isinstance(value, str)}
+        categories = []
+        for category in detailed_specs or []:
+            details = category.get('details') or []
+            keys = _shared_keys(tuple(detail.get('property', '') for detail in details))
+            values = tuple(pool.get(value, _intern(value)) for value in (detail.get('value', '') for detail in details))
+            categories.append((sys.intern(category.get('title') or ''), keys, values))
+        object.__setattr__(self, '_detailed', tuple(categories))
+    
+    @property
+    def images(self) -> Tuple[str, ...]:
+        return self._images
+    
+    @images.setter
+    def images(self, images: Optional[List[str]]):
+        object.__setattr__(self, '_images', tuple(images or ()))
+    
+    # Remaining fields
+    
+    def __getattr__(self, name: str):
+        # Only called for names without a slot or property
+        if name in _DEFAULTS:
+            extra = object.__getattribute__(self, '_extra')
+            if extra is not None and name in extra:
+                return _readonly(extra[name])
+            default = _DEFAULTS[name]
+            return _readonly(default()) if name in _FACTORIES else default
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    def __setattr__(self, name: str, value):
+        if name in _CORE_FIELDS:
+            object.__setattr__(self, name, _intern(value) if name in ('brand', 'source', 'currency') else value)
+            return
+        if name in ('specs', 'detailed_specs', 'images'):
+            object.__setattr__(self, name, value)
+            return
+        if name not in _DEFAULTS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        
+        extra = self._extra or {}
+        default = _DEFAULTS[name]
+        if (not value if name in _FACTORIES else value == default):
+            # Back to the default: nothing to store
+            extra.pop(name, None)
+        elif isinstance(value, list):
+            # all_images usually repeats images: share the tuple
+            extra[name] = self._images if tuple(value) == self._images else tuple(value)
+        else:
+            extra[name] = value
+        object.__setattr__(self, '_extra', extra or None)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CompactPhone, Phone)):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        """String representation of phone."""
+        price_str = f"{self.price} {self.currency}" if self.price else "N/A"
+        return f"Phone({self.brand} {self.model}, Price: {price_str}, Rating: {self.rating})"
@@ -2,9 +2,53 @@
 Data model for mobile phone information.
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict
 from typing import Optional, Dict, List
 import json
+import os
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON encoding
+    orjson = None
+
+
+def flatten_detailed_specs(detailed_specs: List[Dict]) -> Dict[str, str]:
+    """
+    Derive the flat specs view from nested detailed_specs.
+    
+    Later categories win on repeated property names (e.g. Battery "Type"
+    over Display "Type"), matching how scrapers build flat specs.
+    """
+    return {
+        detail['property']: detail['value']
+        for category in detailed_specs or []
+        for detail in category.get('details') or []
+    }
+
+
+def store_flat_specs() -> bool:
+    """
+    Whether stored phones keep flat specs next to detailed_specs.
+    
+    Set SPEC_STORAGE=detailed to persist only the nested form; readers
+    derive the flat view with with_flat_specs().
+    """
+    return os.environ.get('SPEC_STORAGE', 'both').lower() != 'detailed'
+
+
+def for_storage(phone_data: Dict) -> Dict:
+    """Return phone data as it should be persisted under the SPEC_STORAGE mode."""
+    if store_flat_specs() or not phone_data.get('detailed_specs') or 'specs' not in phone_data:
+        return phone_data
+    return {key: value for key, value in phone_data.items() if key != 'specs'}
+
+
+def with_flat_specs(phone_data: Dict) -> Dict:
+    """Fill in flat specs (in place) for phone data stored without them."""
+    if not phone_data.get('specs') and phone_data.get('detailed_specs'):
+        phone_data['specs'] = flatten_detailed_specs(phone_data['detailed_specs'])
+    return phone_data
 
 
 @dataclass
@@ -72,15 +116,74 @@ class Phone:
     total_results: Optional[int] = None
     query_params: Dict = field(default_factory=dict)
     
-    def to_dict(self) -> Dict:
-        """Convert phone object to dictionary."""
-        return asdict(self)
-    
-    def to_json(self) -> str:
+    def to_dict(self, deep: bool = False, flat_specs: bool = True) -> Dict:
+        """
+        Convert phone object to dictionary.
+        
+        Lists and dicts (specs, images, ...) are shared with the phone rather
+        than deep-copied, which makes this ~100x faster than dataclasses.asdict.
+        
+        Args:
+            deep: Return fully independent copies of nested values
+            flat_specs: Include flat specs even when they can be derived from
+                detailed_specs (False roughly halves the size of spec-heavy phones)
+        """
+        data = asdict(self) if deep else {name: getattr(self, name) for name in _FIELD_NAMES}
+        if not flat_specs and self.detailed_specs:
+            del data['specs']
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Phone':
+        """
+        Create a phone from a dictionary (e.g. to_dict() output or a stored document).
+        
+        Keys that are not Phone fields (_id, query, scraped_at, ...) are ignored.
+        Nested values are used as-is, not copied. Flat specs are derived from
+        detailed_specs when they were stored without them.
+        """
+        phone = cls(**{name: data[name] for name in _FIELD_NAMES if name in data})
+        if not phone.specs and phone.detailed_specs:
+            phone.specs = flatten_detailed_specs(phone.detailed_specs)
+        return phone
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
         """Convert phone object to JSON string."""
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+    
+    def to_bytes(self, format: str = "json") -> bytes:
+        """
+        Serialize to compact bytes for storage or transport.
+        
+        Args:
+            format: "json" (uses orjson when installed) or "msgpack" (requires msgpack)
+        """
+        data = self.to_dict()
+        if format == "json":
+            if orjson is not None:
+                return orjson.dumps(data)
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if format == "msgpack":
+            import msgpack
+            return msgpack.packb(data, use_bin_type=True)
+        raise ValueError(f"Unknown format: {format}")
+    
+    @classmethod
+    def from_bytes(cls, payload: bytes, format: str = "json") -> 'Phone':
+        """Create a phone from to_bytes() output."""
+        if format == "json":
+            data = orjson.loads(payload) if orjson is not None else json.loads(payload)
+        elif format == "msgpack":
+            import msgpack
+            data = msgpack.unpackb(payload, raw=False)
+        else:
+            raise ValueError(f"Unknown format: {format}")
+        return cls.from_dict(data)
     
     def __repr__(self) -> str:
         """String representation of phone."""
         price_str = f"{self.price} {self.currency}" if self.price else "N/A"
         return f"Phone({self.brand} {self.model}, Price: {price_str}, Rating: {self.rating})"
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(Phone))
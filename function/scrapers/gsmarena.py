@@ -3,19 +3,29 @@ GSMArena scraper for mobile phone specifications.
 """
 
 from bs4 import BeautifulSoup
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator
+import os
+import logging
 import re
 import time
 import random
 
 from utils.browser_client import HeadlessBrowserClient
-from models.phone import Phone
+from utils import timing
+from utils.log import get_logger, sampled
+from models.phone import Phone, flatten_detailed_specs
+
+log = get_logger('gsmarena')
 
 
 class GSMArenaScraper:
     """Scraper for GSMArena website using headless browser."""
     
-    BASE_URL = "https://www.gsmarena.com"
+    # Override with GSMARENA_BASE_URL to crawl a mirror or the local test server (benchmarks/fake_gsmarena.py)
+    BASE_URL = (os.environ.get('GSMARENA_BASE_URL') or "https://www.gsmarena.com").rstrip('/')
+    
+    # BeautifulSoup parser backend ('lxml', 'html.parser' or 'html5lib')
+    PARSER = "lxml"
     
     def __init__(self, client=None):
         # Allow passing an existing browser client to avoid multiple instances
@@ -34,19 +44,21 @@ class GSMArenaScraper:
         Returns:
             Phone object or None if scraping failed
         """
-        print(f"[SCRAPING] Scraping GSMArena: {url}")
+        log.debug("[SCRAPING] Scraping GSMArena: %s", url)
         
         response = self.client.get(url)
         if not response:
-            print("[FAILED] Failed to fetch page")
+            sampled(log, logging.WARNING, 'gsmarena-fetch', "[FAILED] Failed to fetch page: %s", url)
             return None
         
-        soup = BeautifulSoup(response.text, 'lxml')
+        with timing.span('parse', url):
+            soup = BeautifulSoup(response.text, self.PARSER)
+        normalize_started = time.perf_counter()
         
         # Extract basic information
         brand, model = self._extract_brand_model(soup)
         if not brand or not model:
-            print("[FAILED] Could not extract brand/model")
+            sampled(log, logging.WARNING, 'gsmarena-extract', "[FAILED] Could not extract brand/model: %s", url)
             return None
         
         phone = Phone(
@@ -64,9 +76,9 @@ class GSMArenaScraper:
         if phone.images:
             phone.thumbnail = phone.images[0]
         
-        # Extract specifications
-        phone.specs = self._extract_specifications(soup)
+        # Extract specifications (one pass over the spec tables; flat view derived from it)
         phone.detailed_specs = self._extract_detailed_specifications(soup)
+        phone.specs = flatten_detailed_specs(phone.detailed_specs)
         phone.all_images = phone.images.copy()  # Copy all images
         
         # Extract rating
@@ -75,7 +87,8 @@ class GSMArenaScraper:
         # Extract highlights
         phone.highlights = self._extract_highlights(soup)
         
-        print(f"[SUCCESS] Successfully scraped: {phone.brand} {phone.model}")
+        timing.record('normalize', time.perf_counter() - normalize_started, url)
+        log.debug("[SUCCESS] Successfully scraped: %s %s", phone.brand, phone.model)
         return phone
     
     def _extract_brand_model(self, soup: BeautifulSoup) -> tuple:
@@ -156,29 +169,8 @@ class GSMArenaScraper:
         return images
     
     def _extract_specifications(self, soup: BeautifulSoup) -> dict:
-        """Extract all specifications."""
-        specs = {}
-        
-        # GSMArena uses tables with specific structure
-        spec_tables = soup.find_all('table', cellspacing='0')
-        
-        for table in spec_tables:
-            rows = table.find_all('tr')
-            for row in rows:
-                # Get spec name
-                name_cell = row.find('td', class_='ttl')
-                if not name_cell:
-                    continue
-                
-                spec_name = name_cell.get_text(strip=True)
-                
-                # Get spec value
-                value_cell = row.find('td', class_='nfo')
-                if value_cell:
-                    spec_value = value_cell.get_text(strip=True)
-                    specs[spec_name] = spec_value
-        
-        return specs
+        """Extract all specifications as a flat dict (derived from the detailed specs)."""
+        return flatten_detailed_specs(self._extract_detailed_specifications(soup))
     
     def _extract_detailed_specifications(self, soup: BeautifulSoup) -> List[Dict]:
         """
@@ -261,37 +253,50 @@ class GSMArenaScraper:
         Returns:
             List of Phone objects
         """
-        print(f"[SEARCH] Searching GSMArena for: {query}")
+        return list(self.iter_search_phones(query, max_results=max_results))
+    
+    def iter_search_phones(self, query: str, max_results: int = None) -> Iterator[Phone]:
+        """
+        Search for phones on GSMArena, yielding each phone as soon as it is scraped.
+        
+        Args:
+            query: Search query (e.g., "Samsung Galaxy S23")
+            max_results: Maximum number of results to return (None for all results)
+            
+        Yields:
+            Phone objects in search result order
+        """
+        log.info("[SEARCH] Searching GSMArena for: %s", query)
         
         search_url = f"{self.BASE_URL}/results.php3?sQuickSearch=yes&sName={query}"
         response = self.client.get(search_url)
         
         if not response:
-            print("[FAILED] Search failed")
-            return []
+            log.warning("[FAILED] Search failed")
+            return
         
-        soup = BeautifulSoup(response.text, 'lxml')
-        phones = []
+        soup = BeautifulSoup(response.text, self.PARSER)
+        scraped = 0
         
         # Find all phone listings - based on mobile-specs-api selector: .makers ul li
         makers = soup.find('div', class_='makers')
         if not makers:
-            print("[FAILED] No search results found")
-            return []
+            log.info("[FAILED] No search results found")
+            return
         
         # Get the ul element within makers
         makers_list = makers.find('ul')
         if not makers_list:
-            print("[FAILED] No phone list found")
-            return []
+            log.warning("[FAILED] No phone list found")
+            return
         
         # Get all li items - mobile-specs-api method
         li_items = makers_list.find_all('li', limit=max_results)
         
         if max_results is None:
-            print(f"[INFO] Found {len(li_items)} total results, scraping all...")
+            log.info("[INFO] Found %s total results, scraping all...", len(li_items))
         else:
-            print(f"[INFO] Found results, scraping up to {max_results}...")
+            log.info("[INFO] Found results, scraping up to %s...", max_results)
         
         total = len(li_items)
         for idx, li in enumerate(li_items, 1):
@@ -306,18 +311,18 @@ class GSMArenaScraper:
                 href = '/' + href
             phone_url = self.BASE_URL + href
             
-            print(f"[{idx}/{total}] Scraping: {phone_url}")
+            log.debug("[%s/%s] Scraping: %s", idx, total, phone_url)
             
             # Add delay between requests to avoid rate limiting (5-10 seconds)
             # Increased delays to prevent rate limiting
             if idx > 1:  # Skip delay for first request
                 delay = random.uniform(5, 10)
-                print(f"⏳ Waiting {delay:.1f}s before next request...")
+                log.debug("⏳ Waiting %.1fs before next request...", delay)
                 time.sleep(delay)
             
             phone = self.scrape_phone(phone_url)
             if phone:
-                phones.append(phone)
+                scraped += 1
+                yield phone
         
-        print(f"[SUCCESS] Successfully scraped {len(phones)} out of {total} phones")
-        return phones
+        log.info("[SUCCESS] Successfully scraped %s out of %s phones", scraped, total)
@@ -3,11 +3,18 @@ Kimovil scraper for mobile phone price comparisons across regions.
 """
 
 from bs4 import BeautifulSoup
-from typing import Optional, List
+from typing import Optional, List, Iterator
+import logging
 import re
+import time
 
 from utils.adaptive_client import AdaptiveClient
+from utils import block_detection, timing
+from utils.log import get_logger, sampled
 from models.phone import Phone
+from utils.spec_categorizer import categorize_specs
+
+log = get_logger('kimovil')
 
 
 class KimovilScraper:
@@ -15,9 +22,12 @@ class KimovilScraper:
     
     BASE_URL = "https://www.kimovil.com"
     
-    def __init__(self):
-        # Use AdaptiveClient for automatic Cloudflare bypass
-        self.client = AdaptiveClient()
+    # BeautifulSoup parser backend ('lxml', 'html.parser' or 'html5lib')
+    PARSER = "lxml"
+    
+    def __init__(self, client=None):
+        # Use AdaptiveClient for automatic Cloudflare bypass (or a client passed in, e.g. for replay)
+        self.client = client or AdaptiveClient()
     
     def scrape_phone(self, url: str) -> Optional[Phone]:
         """
@@ -29,19 +39,21 @@ class KimovilScraper:
         Returns:
             Phone object or None if scraping failed
         """
-        print(f"[SCRAPING] Scraping Kimovil: {url}")
+        log.debug("[SCRAPING] Scraping Kimovil: %s", url)
         
         response = self.client.get(url)
         if not response:
-            print("[FAILED] Failed to fetch page")
+            sampled(log, logging.WARNING, 'kimovil-fetch', "[FAILED] Failed to fetch page: %s", url)
             return None
         
-        soup = BeautifulSoup(response.text, 'lxml')
+        with timing.span('parse', url):
+            soup = BeautifulSoup(response.text, self.PARSER)
+        normalize_started = time.perf_counter()
         
         # Extract basic information
         brand, model = self._extract_brand_model(soup)
         if not brand or not model:
-            print("[FAILED] Could not extract brand/model")
+            sampled(log, logging.WARNING, 'kimovil-extract', "[FAILED] Could not extract brand/model: %s", url)
             return None
         
         phone = Phone(
@@ -61,6 +73,7 @@ class KimovilScraper:
         
         # Extract specifications
         phone.specs = self._extract_specifications(soup)
+        phone.detailed_specs = categorize_specs(phone.specs)
         
         # Extract rating
         phone.rating = self._extract_rating(soup)
@@ -71,7 +84,8 @@ class KimovilScraper:
         # Extract description
         phone.description = self._extract_description(soup)
         
-        print(f"[SUCCESS] Successfully scraped: {phone.brand} {phone.model}")
+        timing.record('normalize', time.perf_counter() - normalize_started, url)
+        log.debug("[SUCCESS] Successfully scraped: %s %s", phone.brand, phone.model)
         return phone
     
     def _extract_brand_model(self, soup: BeautifulSoup) -> tuple:
@@ -246,28 +260,45 @@ class KimovilScraper:
         Returns:
             List of Phone objects
         """
-        print(f"[SEARCH] Searching Kimovil for: {query}")
-        print("[WARNING]  Note: Kimovil may block automated search. Consider using direct product URLs.")
+        return list(self.iter_search_phones(query, max_results=max_results))
+    
+    def iter_search_phones(self, query: str, max_results: int = 10) -> Iterator[Phone]:
+        """
+        Search for phones on Kimovil, yielding each phone as soon as it is scraped.
+        
+        Note: Kimovil has aggressive Cloudflare protection that may block automated requests.
+        For best results, use direct product URLs or consider Selenium with undetected-chromedriver.
+        
+        Args:
+            query: Search query (e.g., "Samsung Galaxy S23")
+            max_results: Maximum number of results to return
+            
+        Yields:
+            Phone objects in search result order
+        """
+        log.info("[SEARCH] Searching Kimovil for: %s", query)
+        log.warning("[WARNING]  Note: Kimovil may block automated search. Consider using direct product URLs.")
         
         # Try homepage first
         search_url = f"{self.BASE_URL}/en/"
         response = self.client.get(search_url)
         
         if not response or response.status_code != 200:
-            print(f"[FAILED] Kimovil is blocking requests (Cloudflare protection)")
-            print("[TIP] Solutions:")
-            print("   1. Use direct product URLs: scraper.scrape_phone('https://www.kimovil.com/en/phone.htm')")
-            print("   2. Try undetected-chromedriver (slower but more reliable)")
-            print("   3. See CLOUDFLARE_BYPASS_GUIDE.md for advanced options")
-            return []
+            log.warning("[FAILED] Kimovil is blocking requests (Cloudflare protection)")
+            log.info("[TIP] Solutions:")
+            log.info("   1. Use direct product URLs: scraper.scrape_phone('https://www.kimovil.com/en/phone.htm')")
+            log.info("   2. Try undetected-chromedriver (slower but more reliable)")
+            log.info("   3. See CLOUDFLARE_BYPASS_GUIDE.md for advanced options")
+            return
         
         # Check for Cloudflare challenge
-        if 'cloudflare' in response.text[:5000].lower() or 'captcha' in response.text[:5000].lower():
-            print("[WARNING]  Cloudflare challenge detected - automated search may not work")
-            return []
+        verdict = block_detection.classify(response.status_code, response.headers, response.text)
+        if verdict.blocked:
+            log.warning("[WARNING]  %s challenge detected (%s) - automated search may not work", verdict.kind, verdict.reason)
+            return
         
-        soup = BeautifulSoup(response.text, 'lxml')
-        phones = []
+        soup = BeautifulSoup(response.text, self.PARSER)
+        scraped = 0
         
         # Find phone links (pattern: /en/phone-name-ID.htm)
         all_links = soup.find_all('a', href=True, limit=200)
@@ -286,10 +317,10 @@ class KimovilScraper:
                             break
         
         if not phone_links:
-            print("[FAILED] No phone links found. Kimovil may be blocking or page structure changed.")
-            return []
+            log.warning("[FAILED] No phone links found. Kimovil may be blocking or page structure changed.")
+            return
         
-        print(f"[SCRAPING] Found {len(phone_links)} potential matches")
+        log.info("[SCRAPING] Found %s potential matches", len(phone_links))
         
         # Scrape each phone
         for href in phone_links:
@@ -303,13 +334,13 @@ class KimovilScraper:
             try:
                 phone = self.scrape_phone(phone_url)
                 if phone:
-                    phones.append(phone)
+                    scraped += 1
+                    yield phone
             except Exception as e:
-                print(f"[WARNING]  Error scraping {phone_url}: {e}")
+                sampled(log, logging.WARNING, 'kimovil-error', "[WARNING]  Error scraping %s: %s", phone_url, e)
                 continue
         
-        print(f"[SUCCESS] Successfully scraped {len(phones)} phones")
-        return phones
+        log.info("[SUCCESS] Successfully scraped %s phones", scraped)
     
     def get_price_comparisons(self, phone_url: str) -> List[dict]:
         """
@@ -321,14 +352,14 @@ class KimovilScraper:
         Returns:
             List of dictionaries with store, price, and availability info
         """
-        print(f"[PRICE] Getting price comparisons for: {phone_url}")
+        log.info("[PRICE] Getting price comparisons for: %s", phone_url)
         
         response = self.client.get(phone_url)
         if not response:
-            print("[FAILED] Failed to fetch page")
+            sampled(log, logging.WARNING, 'kimovil-fetch', "[FAILED] Failed to fetch page: %s", phone_url)
             return []
         
-        soup = BeautifulSoup(response.text, 'lxml')
+        soup = BeautifulSoup(response.text, self.PARSER)
         comparisons = []
         
         # Find price comparison table
@@ -347,5 +378,5 @@ class KimovilScraper:
                     }
                     comparisons.append(comparison)
         
-        print(f"[SUCCESS] Found {len(comparisons)} price comparisons")
+        log.info("[SUCCESS] Found %s price comparisons", len(comparisons))
         return comparisons
@@ -3,11 +3,18 @@
 """
 
 from bs4 import BeautifulSoup
-from typing import Optional, List
+from typing import Optional, List, Iterator
+import logging
 import re
+import time
 
 from utils.adaptive_client import AdaptiveClient
+from utils import timing
+from utils.log import get_logger, sampled
 from models.phone import Phone
+from utils.spec_categorizer import categorize_specs
+
+log = get_logger('mobiles91')
 
 
 class Mobiles91Scraper:
@@ -15,9 +22,12 @@ class Mobiles91Scraper:
     
     BASE_URL = "https://www.91mobiles.com"
     
-    def __init__(self):
-        # Use AdaptiveClient for automatic Cloudflare bypass
-        self.client = AdaptiveClient()
+    # BeautifulSoup parser backend ('lxml', 'html.parser' or 'html5lib')
+    PARSER = "lxml"
+    
+    def __init__(self, client=None):
+        # Use AdaptiveClient for automatic Cloudflare bypass (or a client passed in, e.g. for replay)
+        self.client = client or AdaptiveClient()
     
     def scrape_phone(self, url: str) -> Optional[Phone]:
         """
@@ -29,19 +39,21 @@ class Mobiles91Scraper:
         Returns:
             Phone object or None if scraping failed
         """
-        print(f"📱 Scraping 91mobiles: {url}")
+        log.debug("📱 Scraping 91mobiles: %s", url)
         
         response = self.client.get(url)
         if not response:
-            print("❌ Failed to fetch page")
+            sampled(log, logging.WARNING, '91mobiles-fetch', "❌ Failed to fetch page: %s", url)
             return None
         
-        soup = BeautifulSoup(response.text, 'lxml')
+        with timing.span('parse', url):
+            soup = BeautifulSoup(response.text, self.PARSER)
+        normalize_started = time.perf_counter()
         
         # Extract basic information
         brand, model = self._extract_brand_model(soup)
         if not brand or not model:
-            print("❌ Could not extract brand/model")
+            sampled(log, logging.WARNING, '91mobiles-extract', "❌ Could not extract brand/model: %s", url)
             return None
         
         phone = Phone(
@@ -62,6 +74,7 @@ class Mobiles91Scraper:
         
         # Extract specifications
         phone.specs = self._extract_specifications(soup)
+        phone.detailed_specs = categorize_specs(phone.specs)
         
         # Extract rating
         phone.rating, phone.reviews_count = self._extract_rating(soup)
@@ -72,7 +85,8 @@ class Mobiles91Scraper:
         # Extract availability
         phone.in_stock = self._check_availability(soup)
         
-        print(f"✅ Successfully scraped: {phone.brand} {phone.model}")
+        timing.record('normalize', time.perf_counter() - normalize_started, url)
+        log.debug("✅ Successfully scraped: %s %s", phone.brand, phone.model)
         return phone
     
     def _extract_brand_model(self, soup: BeautifulSoup) -> tuple:
@@ -231,7 +245,20 @@ class Mobiles91Scraper:
         Returns:
             List of Phone objects
         """
-        print(f"[SEARCH] Searching 91mobiles for: {query}")
+        return list(self.iter_search_phones(query, max_results=max_results))
+    
+    def iter_search_phones(self, query: str, max_results: int = 10) -> Iterator[Phone]:
+        """
+        Search for phones on 91mobiles, yielding each phone as soon as it is scraped.
+        
+        Args:
+            query: Search query (e.g., "Samsung Galaxy S23")
+            max_results: Maximum number of results to return
+            
+        Yields:
+            Phone objects in search result order
+        """
+        log.info("[SEARCH] Searching 91mobiles for: %s", query)
         
         # Use homepage - most reliable, has latest phones
         search_url = f"{self.BASE_URL}/"
@@ -240,12 +267,12 @@ class Mobiles91Scraper:
         response = self.client.get(search_url)
         
         if not response or response.status_code != 200:
-            print(f"[WARNING] Search failed (status: {response.status_code if response else 'None'})")
-            print("[TIP] Tip: Try using direct product URLs instead")
-            return []
+            log.warning("[WARNING] Search failed (status: %s)", response.status_code if response else 'None')
+            log.info("[TIP] Tip: Try using direct product URLs instead")
+            return
         
-        soup = BeautifulSoup(response.text, 'lxml')
-        phones = []
+        soup = BeautifulSoup(response.text, self.PARSER)
+        scraped = 0
         
         # Find all phone links on the page
         all_links = soup.find_all('a', href=True, limit=100)
@@ -265,7 +292,7 @@ class Mobiles91Scraper:
         
         # If no matches with query, get any phones from homepage
         if not phone_links and query_lower:
-            print(f"[INFO] No exact matches for '{query}', showing latest phones from homepage")
+            log.info("[INFO] No exact matches for '%s', showing latest phones from homepage", query)
             for link in all_links:
                 href = link.get('href', '')
                 if 'price-in-india' in href and href not in phone_links:
@@ -273,7 +300,7 @@ class Mobiles91Scraper:
                     if len(phone_links) >= max_results:
                         break
         
-        print(f"[SCRAPING] Found {len(phone_links)} potential matches")
+        log.info("[SCRAPING] Found %s potential matches", len(phone_links))
         
         # Scrape each phone
         for href in phone_links:
@@ -287,10 +314,10 @@ class Mobiles91Scraper:
             try:
                 phone = self.scrape_phone(phone_url)
                 if phone:
-                    phones.append(phone)
+                    scraped += 1
+                    yield phone
             except Exception as e:
-                print(f"[WARNING] Error scraping {phone_url}: {e}")
+                sampled(log, logging.WARNING, '91mobiles-error', "[WARNING] Error scraping %s: %s", phone_url, e)
                 continue
         
-        print(f"[SUCCESS] Successfully scraped {len(phones)} phones")
-        return phones
+        log.info("[SUCCESS] Successfully scraped %s phones", scraped)
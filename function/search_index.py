@@ -0,0 +1,403 @@
+"""
+In-memory search index over phone brand, model, aliases and key specs.
+
+Tokens are indexed per field and ranked with BM25. Query tokens that are
+misspelled ("galxy") are matched against the vocabulary through a trigram
+index and verified by edit distance, so typo-tolerant lookups stay fast.
+"""
+import gzip
+import json
+import math
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Field weights used for BM25 term frequencies
+FIELD_WEIGHTS = {
+    'brand': 1.5,
+    'model': 3.0,
+    'aliases': 1.0,
+    'specs': 0.3,
+}
+
+# Specs worth searching by (e.g. "snapdragon 8 gen 3")
+KEY_SPECS = ('Chipset', 'OS', 'CPU')
+
+# Penalty applied to matches that are only prefixes or fuzzy matches
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.6
+
+INDEX_FORMAT_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def trigrams(term: str) -> Set[str]:
+    """Return the padded character trigrams of a term."""
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between a and b, giving up once it exceeds limit.
+    
+    Returns:
+        The distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(cost)
+            row_min = min(row_min, cost)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def phone_fields(phone: Dict) -> Dict[str, str]:
+    """
+    Extract the searchable fields of a phone dictionary.
+    
+    Aliases come from the GSMArena "Models" spec (e.g. "SM-S928B, SM-S928U").
+    """
+    specs = phone.get('specs') or {}
+    return {
+        'brand': phone.get('brand') or '',
+        'model': phone.get('model') or '',
+        'aliases': specs.get('Models', ''),
+        'specs': ' '.join(specs.get(key, '') for key in KEY_SPECS),
+    }
+
+
+class SearchIndex:
+    """
+    Inverted index with BM25 ranking and typo-tolerant term expansion.
+    
+    Documents are identified by a string key (the phone URL in the catalog).
+    Every query token must match a document, either exactly, as a prefix
+    (last token only, for partially typed names) or as a close misspelling.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        
+        self._keys: List[Optional[str]] = []         # doc id -> key (None once removed)
+        self._ids: Dict[str, int] = {}               # key -> doc id
+        self._lengths: List[float] = []              # doc id -> weighted length
+        self._doc_terms: List[Dict[str, float]] = [] # doc id -> {term: weighted tf}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}     # trigram -> vocabulary terms
+        self._sorted_terms: Optional[List[str]] = None
+        self._total_length = 0.0
+        self._count = 0
+        self._expansions: Dict[Tuple[str, bool], List[Tuple[str, float]]] = {}
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+    
+    @classmethod
+    def build(cls, phones: Iterable[Dict], key_field: str = 'url') -> 'SearchIndex':
+        """
+        Build an index from phone dictionaries (e.g. documents of any stored collection).
+        
+        Args:
+            phones: Phone dictionaries
+            key_field: Field used as the document key
+        """
+        index = cls()
+        for phone in phones:
+            key = phone.get(key_field)
+            if key:
+                index.add(key, phone_fields(phone))
+        return index
+    
+    def add(self, key: str, fields: Dict[str, str]):
+        """
+        Add or replace a document.
+        
+        Args:
+            key: Document key
+            fields: Field name -> text (see FIELD_WEIGHTS)
+        """
+        terms: Dict[str, float] = {}
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        length = sum(terms.values())
+        
+        with self._lock:
+            if key in self._ids:
+                self.remove(key)
+            
+            doc_id = len(self._keys)
+            self._keys.append(key)
+            self._ids[key] = doc_id
+            self._lengths.append(length)
+            self._doc_terms.append(terms)
+            self._total_length += length
+            self._count += 1
+            
+            for term, tf in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    for gram in trigrams(term):
+                        self._trigrams.setdefault(gram, set()).add(term)
+                    self._sorted_terms = None
+                    self._expansions.clear()
+                postings[doc_id] = tf
+    
+    def remove(self, key: str):
+        """Remove a document (no-op if it is not indexed)."""
+        with self._lock:
+            doc_id = self._ids.pop(key, None)
+            if doc_id is None:
+                return
+            for term in self._doc_terms[doc_id]:
+                self._postings[term].pop(doc_id, None)
+            self._total_length -= self._lengths[doc_id]
+            self._count -= 1
+            self._keys[doc_id] = None
+            self._doc_terms[doc_id] = {}
+    
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Tuple[str, float]]:
+        """
+        Rank documents matching every query token.
+        
+        Args:
+            query: Free-text query (e.g. "galxy s24 ultra")
+            limit: Maximum results (None for all matches)
+        
+        Returns:
+            List of (key, score) tuples, best first
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        
+        with self._lock:
+            if not self._count:
+                return []
+            avg_length = self._total_length / self._count
+            expanded = []
+            for position, token in enumerate(tokens):
+                terms = self._expand(token, prefix=position == len(tokens) - 1)
+                if not terms:
+                    return []
+                weighted = []
+                for term, factor in terms:
+                    postings = self._postings[term]
+                    idf = math.log(1 + (self._count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    weighted.append((postings, factor * idf))
+                expanded.append(weighted)
+            
+            # Start from the rarest token so later tokens only see surviving candidates
+            expanded.sort(key=lambda weighted: sum(len(postings) for postings, _ in weighted))
+            
+            scores = self._token_scores(expanded[0], avg_length)
+            for weighted in expanded[1:]:
+                token_scores = self._token_scores(weighted, avg_length, candidates=scores)
+                scores = {doc_id: score + token_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in token_scores}
+                if not scores:
+                    return []
+            
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._lengths[item[0]]))[:limit]
+            return [(self._keys[doc_id], round(score, 4)) for doc_id, score in ranked]
+    
+    def _token_scores(self, weighted: List[Tuple[Dict[int, float], float]], avg_length: float,
+                      candidates: Optional[Dict[int, float]] = None) -> Dict[int, float]:
+        """
+        Best BM25 score per document over one query token's expansions.
+        
+        With candidates, documents are probed one by one when that is cheaper
+        than walking every posting list (e.g. a prefix with many expansions).
+        """
+        scores: Dict[int, float] = {}
+        total = sum(len(postings) for postings, _ in weighted)
+        if candidates is not None and len(candidates) * len(weighted) < total:
+            for doc_id in candidates:
+                for postings, weight in weighted:
+                    tf = postings.get(doc_id)
+                    if tf is not None:
+                        score = weight * self._bm25(tf, doc_id, avg_length)
+                        if score > scores.get(doc_id, 0.0):
+                            scores[doc_id] = score
+            return scores
+        
+        for postings, weight in weighted:
+            for doc_id, tf in postings.items():
+                score = weight * self._bm25(tf, doc_id, avg_length)
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+    
+    def _bm25(self, tf: float, doc_id: int, avg_length: float) -> float:
+        """BM25 term frequency component for one document."""
+        return tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length))
+    
+    def _expand(self, token: str, prefix: bool = False) -> List[Tuple[str, float]]:
+        """
+        Map a query token to vocabulary terms with a match factor.
+        
+        Exact matches get 1.0, prefix matches PREFIX_FACTOR and misspellings
+        FUZZY_FACTOR scaled by similarity. Results are memoized until the
+        vocabulary changes.
+        """
+        cache_key = (token, prefix)
+        cached = self._expansions.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        expansions: Dict[str, float] = {}
+        if token in self._postings and self._postings[token]:
+            expansions[token] = 1.0
+        
+        if prefix and len(token) >= 2:
+            for term in self._terms_with_prefix(token):
+                if term != token and self._postings[term]:
+                    expansions.setdefault(term, PREFIX_FACTOR)
+        
+        # Typo tolerance: only for tokens long enough to carry a misspelling
+        # and not for tokens with digits (a wrong digit is a different phone)
+        if len(token) >= 3 and token.isalpha():
+            max_distance = 1 if len(token) < 8 else 2
+            token_grams = trigrams(token)
+            shared: Dict[str, int] = {}
+            for gram in token_grams:
+                for term in self._trigrams.get(gram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            for term, common in shared.items():
+                if term in expansions or not self._postings[term]:
+                    continue
+                # Dice coefficient filter before the (more expensive) edit distance check
+                if 2 * common / (len(token_grams) + len(term)) < 0.3:
+                    continue
+                distance = edit_distance(token, term, max_distance)
+                if distance <= max_distance:
+                    expansions[term] = FUZZY_FACTOR * (1 - distance / (len(token) + 1))
+        
+        result = sorted(expansions.items(), key=lambda item: -item[1])
+        self._expansions[cache_key] = result
+        return result
+    
+    def _terms_with_prefix(self, prefix: str) -> List[str]:
+        """Return vocabulary terms starting with prefix (binary search over sorted terms)."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect_left(terms, prefix)
+        end = bisect_left(terms, prefix + '\uffff')
+        return terms[start:end]
+    
+    def save(self, path: str):
+        """
+        Write the index to a gzip-compressed JSON file.
+        
+        Postings are stored as delta-encoded document ids with their term
+        frequencies, which keeps the file small.
+        """
+        with self._lock:
+            live = [doc_id for doc_id, key in enumerate(self._keys) if key is not None]
+            remap = {doc_id: new_id for new_id, doc_id in enumerate(live)}
+            postings = {}
+            for term, docs in self._postings.items():
+                if not docs:
+                    continue
+                ids = sorted(remap[doc_id] for doc_id in docs)
+                deltas = [ids[0]] + [ids[i] - ids[i - 1] for i in range(1, len(ids))]
+                tfs = [docs[live[new_id]] for new_id in ids]
+                postings[term] = [deltas, tfs]
+            data = {
+                'version': INDEX_FORMAT_VERSION,
+                'k1': self.k1,
+                'b': self.b,
+                'keys': [self._keys[doc_id] for doc_id in live],
+                'lengths': [self._lengths[doc_id] for doc_id in live],
+                'postings': postings
+            }
+        
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    
+    @classmethod
+    def load(cls, path: str) -> 'SearchIndex':
+        """Read an index written by save()."""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if data.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format version: {data.get('version')}")
+        
+        index = cls(k1=data['k1'], b=data['b'])
+        index._keys = data['keys']
+        index._ids = {key: doc_id for doc_id, key in enumerate(index._keys)}
+        index._lengths = data['lengths']
+        index._doc_terms = [{} for _ in index._keys]
+        index._total_length = sum(index._lengths)
+        index._count = len(index._keys)
+        
+        for term, (deltas, tfs) in data['postings'].items():
+            docs = {}
+            doc_id = 0
+            for delta, tf in zip(deltas, tfs):
+                doc_id += delta
+                docs[doc_id] = tf
+                index._doc_terms[doc_id][term] = tf
+            index._postings[term] = docs
+            for gram in trigrams(term):
+                index._trigrams.setdefault(gram, set()).add(term)
+        return index
+
+
+if __name__ == "__main__":
+    # Build an index from a stored collection, save it and time a typo query
+    import os
+    import sys
+    import time
+    
+    from utils.mongodb_client import MongoDBClient
+    
+    collection = sys.argv[1] if len(sys.argv) > 1 else 'phone_all_makers'
+    output = sys.argv[2] if len(sys.argv) > 2 else f"data/{collection}.idx.json.gz"
+    
+    mongo = MongoDBClient()
+    started = time.time()
+    index = SearchIndex.build(mongo.iter_phones(projection={'brand': 1, 'model': 1, 'url': 1, 'specs': 1},
+                                                collection_name=collection))
+    print(f"[INDEX] Indexed {len(index)} phones in {time.time() - started:.1f}s")
+    
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    index.save(output)
+    print(f"[INDEX] Saved to {output} ({os.path.getsize(output) / 1024:.0f} KB)")
+    
+    for query in ("galxy s24 ultra", "iphone 15 pro", "redmi note"):
+        started = time.perf_counter()
+        hits = index.search(query, limit=5)
+        print(f"\n'{query}' ({(time.perf_counter() - started) * 1000:.2f} ms)")
+        for key, score in hits:
+            print(f"  {score:6.2f}  {key}")
@@ -0,0 +1,181 @@
+"""
+Background search jobs - run long searches on the shared scraper pool
+"""
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from universal_search import UniversalSearch
+from utils.scraper_pool import ScraperPool
+
+
+@dataclass
+class SearchJob:
+    """A queued or running search and its (partial) results."""
+    
+    id: str
+    query: str
+    sites: List[str]
+    mode: str = "basic"
+    max_results: int = 5
+    
+    # queued -> running -> done | error
+    status: str = "queued"
+    error: Optional[str] = None
+    
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    
+    progress: Dict = field(default_factory=dict)
+    phones: List = field(default_factory=list)  # (site, Phone) tuples, in scrape order
+
+
+class SearchJobManager:
+    """
+    Track searches that run in the background on a ScraperPool.
+    
+    Concurrency and queueing are bounded by the pool: at most pool.size
+    searches run at once and submit() raises PoolBusy once pool.max_queued
+    tasks are waiting.
+    """
+    
+    def __init__(self, pool: ScraperPool, ttl: int = 3600):
+        """
+        Args:
+            pool: Scraper pool the searches run on
+            ttl: Seconds to keep finished jobs before they expire
+        """
+        self.pool = pool
+        self.ttl = ttl
+        
+        self._jobs: Dict[str, SearchJob] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, query: str, sites: List[str], mode: str = "basic", max_results: int = 5) -> SearchJob:
+        """
+        Enqueue a search.
+        
+        Args:
+            query: Search query
+            sites: Sites to search
+            mode: 'basic' or 'detailed'
+            max_results: Maximum results per site
+        
+        Returns:
+            The queued SearchJob
+        
+        Raises:
+            PoolBusy: If the pool's queue is full
+        """
+        self._purge_expired()
+        
+        job = SearchJob(
+            id=uuid.uuid4().hex,
+            query=query,
+            sites=list(sites),
+            mode=mode,
+            max_results=max_results,
+            progress={'total_sites': len(sites), 'sites_done': 0, 'current_site': None, 'phones_found': 0}
+        )
+        
+        future = self.pool.submit(self._run_job, job)
+        with self._lock:
+            self._jobs[job.id] = job
+        future.add_done_callback(lambda f: self._finish_job(job, f))
+        
+        print(f"[JOBS] Queued job {job.id}: {query}")
+        return job
+    
+    def get(self, job_id: str) -> Optional[SearchJob]:
+        """Return a job by id, or None if it does not exist or has expired."""
+        self._purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def snapshot(self, job: SearchJob) -> Dict:
+        """
+        Return a consistent copy of a job's state.
+        
+        Returns:
+            Dictionary with job metadata, progress and a copy of the phone list
+        """
+        with self._lock:
+            return {
+                'job_id': job.id,
+                'status': job.status,
+                'error': job.error,
+                'query': job.query,
+                'sites': list(job.sites),
+                'mode': job.mode,
+                'max_results': job.max_results,
+                'created_at': job.created_at,
+                'started_at': job.started_at,
+                'finished_at': job.finished_at,
+                'expires_at': job.finished_at + self.ttl if job.finished_at else None,
+                'progress': dict(job.progress),
+                'phones': list(job.phones)
+            }
+    
+    def stats(self) -> Dict:
+        """Return job counts by status."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'retained': len(statuses)
+        }
+    
+    def _purge_expired(self):
+        """Drop finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+    
+    def _finish_job(self, job: SearchJob, future):
+        """Record the outcome of a job once its pool task completes."""
+        error = future.exception()
+        with self._lock:
+            if error is not None:
+                job.status = 'error'
+                job.error = str(error)
+            else:
+                job.status = 'done'
+            job.finished_at = time.time()
+        
+        if error is not None:
+            print(f"[JOBS] Job {job.id} failed: {error}")
+        else:
+            print(f"[JOBS] Job {job.id} done: {len(job.phones)} phones")
+    
+    def _run_job(self, searcher: UniversalSearch, job: SearchJob):
+        """Run one job on a pooled searcher, publishing progress and phones as they arrive."""
+        with self._lock:
+            job.status = 'running'
+            job.started_at = time.time()
+        
+        print(f"[JOBS] Running job {job.id} on {threading.current_thread().name}")
+        
+        for event in searcher.iter_search(job.query, max_results_per_site=job.max_results, sites=job.sites):
+            kind = event['event']
+            with self._lock:
+                if kind == 'site_start':
+                    job.progress['current_site'] = event['site']
+                elif kind == 'phone':
+                    job.phones.append((event['site'], event['phone']))
+                    job.progress['phones_found'] = len(job.phones)
+                elif kind == 'site_done':
+                    job.progress['sites_done'] += 1
+                    job.progress.setdefault('sites', {})[event['site']] = {
+                        'status': event['status'],
+                        'count': event['count'],
+                        'error': event.get('error')
+                    }
+                elif kind == 'done':
+                    job.progress['current_site'] = None
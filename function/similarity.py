@@ -0,0 +1,145 @@
+"""
+"Phones like this one" - nearest neighbours over parsed spec vectors.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Feature -> weight in the distance
+FEATURE_WEIGHTS = {
+    'display_in': 1.0,
+    'battery_mah': 1.0,
+    'ram_gb': 1.0,
+    'storage_gb': 0.75,
+    'main_camera_mp': 0.75,
+    'price': 1.5,
+    'year': 1.0,
+    'weight_g': 0.5,
+}
+
+# Features compared on a log scale (doubling matters more than the absolute step)
+LOG_FEATURES = ('ram_gb', 'storage_gb', 'main_camera_mp', 'price')
+
+# Approximate conversion used to put prices in one column
+PRICE_TO_INR = {
+    'price_inr': 1.0,
+    'price_usd': 83.0,
+    'price_eur': 90.0,
+}
+
+# Squared (standardized) difference charged for a feature the other phone lacks
+MISSING_PENALTY = 1.0
+
+# Phones sharing fewer known features than this with the target are skipped
+MIN_SHARED_FEATURES = 3
+
+
+def _price_inr(parsed: Dict) -> float:
+    """Return the phone's price in INR, converting the first known currency."""
+    for field, rate in PRICE_TO_INR.items():
+        if field in parsed:
+            return parsed[field] * rate
+    return np.nan
+
+
+class SimilarityIndex:
+    """
+    Standardized feature matrix of the catalog for batched nearest-neighbour queries.
+    
+    Each phone becomes a row of FEATURE_WEIGHTS features, standardized per
+    column. Missing values are masked rather than imputed: the distance is
+    the weighted mean squared difference over the target's features, with
+    MISSING_PENALTY charged for each feature the other phone lacks.
+    """
+    
+    def __init__(self, phones: List[Dict], parsed: List[Dict]):
+        """
+        Args:
+            phones: Phone dictionaries, in row order
+            parsed: parse_phone_specs() output for each phone
+        """
+        self.phones = phones
+        self.parsed = parsed
+        self.features = list(FEATURE_WEIGHTS)
+        self.weights = np.array([FEATURE_WEIGHTS[feature] for feature in self.features])
+        self._rows = {phone.get('url'): row for row, phone in enumerate(phones)}
+        
+        matrix = np.array([
+            [_price_inr(values) if feature == 'price' else values.get(feature, np.nan) for feature in self.features]
+            for values in parsed
+        ], dtype=np.float64).reshape(len(phones), len(self.features))
+        
+        for column, feature in enumerate(self.features):
+            if feature in LOG_FEATURES:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    matrix[:, column] = np.log2(np.where(matrix[:, column] > 0, matrix[:, column], np.nan))
+        
+        self.known = ~np.isnan(matrix)
+        counts = np.maximum(self.known.sum(axis=0), 1)
+        values = np.where(self.known, matrix, 0.0)
+        mean = values.sum(axis=0) / counts
+        std = np.sqrt((np.where(self.known, matrix - mean, 0.0) ** 2).sum(axis=0) / counts)
+        std[std == 0] = 1.0
+        self.matrix = np.where(self.known, (values - mean) / std, 0.0)
+    
+    def similar(self, url: str, k: int = 10, exclude_same_name: bool = True) -> List[Tuple[Dict, float]]:
+        """
+        Find the phones closest to a catalog phone.
+        
+        Args:
+            url: URL of the catalog phone to start from
+            k: Number of neighbours
+            exclude_same_name: Skip listings of the same phone from other sources
+        
+        Returns:
+            List of (phone, distance) tuples, closest first
+        
+        Raises:
+            KeyError: If the phone is not in the catalog
+        """
+        row = self._rows[url]
+        distances = self.distances(self.matrix[row], self.known[row])
+        distances[row] = np.inf
+        
+        if exclude_same_name:
+            name = self._name(self.phones[row])
+            for other in self._nearest(distances, k * 4):
+                if self._name(self.phones[other]) == name:
+                    distances[other] = np.inf
+        
+        return [(self.phones[other], round(float(distances[other]), 4)) for other in self._nearest(distances, k)]
+    
+    def distances(self, vector: np.ndarray, known: np.ndarray) -> np.ndarray:
+        """
+        Weighted masked distance from one standardized vector to every phone.
+        
+        Returns:
+            Array of distances (inf where too few features are shared)
+        """
+        shared = self.known & known
+        squared = ((self.matrix - vector) ** 2 * (shared * self.weights)).sum(axis=1)
+        # Features the target has but a phone lacks count as a fixed difference
+        missing = ((~self.known & known) * self.weights).sum(axis=1)
+        total_weight = (known * self.weights).sum()
+        
+        distances = np.sqrt((squared + MISSING_PENALTY * missing) / max(total_weight, 1e-9))
+        distances[shared.sum(axis=1) < MIN_SHARED_FEATURES] = np.inf
+        return distances
+    
+    @staticmethod
+    def _nearest(distances: np.ndarray, k: int) -> np.ndarray:
+        """Return the rows of the k smallest finite distances, closest first."""
+        finite = np.flatnonzero(np.isfinite(distances))
+        if len(finite) > k:
+            finite = finite[np.argpartition(distances[finite], k)[:k]]
+        return finite[np.argsort(distances[finite], kind='stable')]
+    
+    def parsed_for(self, phone: Dict) -> Optional[Dict]:
+        """Return the parsed specs of a phone in the index."""
+        row = self._rows.get(phone.get('url'))
+        return self.parsed[row] if row is not None else None
+    
+    @staticmethod
+    def _name(phone: Dict) -> str:
+        """Brand and model used to recognise the same phone across sources."""
+        return f"{phone.get('brand', '')} {phone.get('model', '')}".lower()
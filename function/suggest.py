@@ -0,0 +1,119 @@
+"""
+Prefix suggester for search box autocomplete.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from search_index import tokenize
+
+
+def normalize(text: str) -> str:
+    """Lowercase text and reduce it to space-separated alphanumeric tokens."""
+    return ' '.join(tokenize(text))
+
+
+class PrefixSuggester:
+    """
+    Weighted name completions over a sorted key array.
+    
+    Every name is reachable by its full normalized form ("samsung galaxy s24")
+    and without its brand ("galaxy s24"). Lookups binary-search the range of
+    keys starting with the prefix and return the highest weighted names.
+    The array is rebuilt lazily after names are added.
+    """
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        Args:
+            cache_size: Number of recent prefix lookups kept until the next rebuild
+        """
+        self.cache_size = cache_size
+        
+        self._weights: Dict[str, float] = {}       # display name -> weight
+        self._entries: Dict[str, set] = {}         # normalized key -> display names
+        self._keys: List[str] = []
+        self._names: List[List[str]] = []
+        self._dirty = False
+        self._cache: Dict[Tuple[str, int], List[Dict]] = {}
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._weights)
+    
+    def add(self, name: str, brand: str = '', weight: float = 1.0):
+        """
+        Add a name or increase its weight.
+        
+        Args:
+            name: Display name (e.g., "Samsung Galaxy S24 Ultra")
+            brand: Brand prefix of the name, so it is also matched without it
+            weight: Popularity to add
+        """
+        key = normalize(name)
+        if not key:
+            return
+        
+        with self._lock:
+            if name not in self._weights:
+                self._entries.setdefault(key, set()).add(name)
+                short_key = normalize(name[len(brand):]) if brand and name.lower().startswith(brand.lower()) else ''
+                if short_key and short_key != key:
+                    self._entries.setdefault(short_key, set()).add(name)
+                self._dirty = True
+            self._weights[name] = self._weights.get(name, 0.0) + weight
+            self._cache.clear()
+    
+    def bump(self, name: str, weight: float = 1.0):
+        """Increase the weight of a known name (e.g., when it is searched for)."""
+        with self._lock:
+            if name in self._weights:
+                self._weights[name] += weight
+                self._cache.clear()
+    
+    def weight(self, name: str) -> float:
+        """Return the popularity weight of a name (0 if unknown)."""
+        return self._weights.get(name, 0.0)
+    
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """
+        Return the highest weighted names starting with prefix.
+        
+        Args:
+            prefix: Typed text (case and punctuation are ignored)
+            limit: Maximum suggestions
+        
+        Returns:
+            List of {'name', 'weight'} dictionaries, best first
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        
+        with self._lock:
+            cached = self._cache.get((prefix, limit))
+            if cached is not None:
+                return cached
+            
+            if self._dirty:
+                self._rebuild()
+            
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + '\uffff', lo=start)
+            weights = self._weights
+            candidates = (name for names in self._names[start:end] for name in names)
+            # A name can sit under two keys in the range (with and without brand)
+            best = heapq.nlargest(limit * 2, candidates, key=lambda name: (weights[name], -len(name)))
+            results = [{'name': name, 'weight': weights[name]} for name in dict.fromkeys(best)][:limit]
+            
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[(prefix, limit)] = results
+            return results
+    
+    def _rebuild(self):
+        """Sort the keys (caller holds the lock)."""
+        self._keys = sorted(self._entries)
+        self._names = [sorted(self._entries[key]) for key in self._keys]
+        self._dirty = False
@@ -3,26 +3,69 @@ Universal Search - Search across all mobile phone scrapers
 """
 import json
 import os
-from typing import List, Optional
+import time
+from typing import Iterable, Iterator, List, Optional
 from datetime import datetime
 
 from scrapers.gsmarena import GSMArenaScraper
 from scrapers.mobiles91 import Mobiles91Scraper
 from scrapers.kimovil import KimovilScraper
 from models.phone import Phone
+from utils import metrics, profiling
+from utils.log import get_logger
+
+log = get_logger('search')
 
 
 class UniversalSearch:
     """Search across all available mobile phone scrapers."""
     
-    def __init__(self):
+    def __init__(self, profile: Optional[Iterable[str]] = None):
+        """
+        Args:
+            profile: Profile modes ("cpu", "mem") for each search_all() run
+                (see utils/profiling.py); None runs unprofiled
+        """
+        self.profile = set(profile or ())
         self.gsmarena = GSMArenaScraper()
         self.mobiles91 = Mobiles91Scraper()
         self.kimovil = KimovilScraper()
         
-    def search_all(self, query: str, max_results_per_site: int = 10, sites: Optional[List[str]] = None, max_results: int = None) -> dict:
+    def is_healthy(self) -> bool:
+        """Check that the shared browser is still usable."""
+        return self.gsmarena.client.is_healthy()
+    
+    def close(self):
+        """Close the browser and HTTP sessions."""
+        self.gsmarena.client.close()
+        for client in (self.mobiles91.client, self.kimovil.client):
+            client.client.session.close()
+    
+    # Display names of supported sites, in search order
+    SITE_LABELS = {
+        'gsmarena': 'GSMArena',
+        '91mobiles': '91mobiles',
+        'kimovil': 'Kimovil',
+    }
+    
+    def _site_scraper(self, site: str):
+        """Return the scraper instance for a site key."""
+        return {
+            'gsmarena': self.gsmarena,
+            '91mobiles': self.mobiles91,
+            'kimovil': self.kimovil,
+        }[site]
+    
+    def iter_search(self, query: str, max_results_per_site: int = 10, sites: Optional[List[str]] = None,
+                    max_results: int = None) -> Iterator[dict]:
         """
-        Search for phones across all scrapers.
+        Search for phones across all scrapers, yielding events as the search progresses.
+        
+        Events are dictionaries with an 'event' key:
+            - 'site_start': {'site', 'index', 'total_sites'}
+            - 'phone':      {'site', 'phone'} (phone is a Phone object)
+            - 'site_done':  {'site', 'status', 'count'[, 'error']}
+            - 'done':       {'query', 'timestamp', 'total_found', 'counts'}
         
         Args:
             query: Search query (e.g., "Samsung Galaxy S24", "iPhone 15", "OnePlus")
@@ -30,8 +73,8 @@ class UniversalSearch:
             sites: List of sites to search (optional). Options: ['gsmarena', '91mobiles', 'kimovil']
             max_results: Maximum results to return (None for all)
             
-        Returns:
-            Dictionary with results from each scraper
+        Yields:
+            Event dictionaries
         """
         # Use max_results if provided, otherwise fall back to max_results_per_site
         if max_results is not None:
@@ -40,100 +83,114 @@ class UniversalSearch:
         if sites is None:
             sites = ['gsmarena', '91mobiles', 'kimovil']
         
-        print(f"\n{'='*60}")
-        print(f"UNIVERSAL SEARCH: '{query}'")
-        print(f"Sites: {', '.join(sites)}")
-        print(f"{'='*60}\n")
+        # Keep the canonical search order (GSMArena first - most reliable)
+        sites = [site for site in self.SITE_LABELS if site in sites]
         
-        results = {
-            'query': query,
-            'timestamp': datetime.now().isoformat(),
-            'scrapers': {}
-        }
+        log.info('\n' + '=' * 60)
+        log.info("UNIVERSAL SEARCH: '%s'", query)
+        log.info("Sites: %s", ', '.join(sites))
+        log.info('=' * 60 + '\n')
         
+        timestamp = datetime.now().isoformat()
+        counts = {}
         total_sites = len(sites)
-        current_site = 0
         
-        # GSMArena (most reliable)
-        if 'gsmarena' in sites:
-            current_site += 1
-            print(f"[{current_site}/{total_sites}] Searching GSMArena...")
-            try:
-                # Use max_results_per_site (which now includes max_results if provided)
-                gsm_phones = self.gsmarena.search_phones(query, max_results=max_results_per_site if max_results_per_site != 10 else None)
-                results['scrapers']['gsmarena'] = {
-                    'status': 'success',
-                    'count': len(gsm_phones),
-                    'phones': gsm_phones  # Keep as Phone objects for now
-                }
-                print(f"      [SUCCESS] Found {len(gsm_phones)} phones\n")
-            except Exception as e:
-                print(f"      [ERROR] {str(e)}\n")
-                results['scrapers']['gsmarena'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'count': 0,
-                    'phones': []
-                }
-        
-        # 91mobiles (Indian prices)
-        if '91mobiles' in sites:
-            current_site += 1
-            print(f"[{current_site}/{total_sites}] Searching 91mobiles...")
-            try:
-                mob91_phones = self.mobiles91.search_phones(query, max_results=max_results_per_site)
-                results['scrapers']['91mobiles'] = {
-                    'status': 'success',
-                    'count': len(mob91_phones),
-                    'phones': [p.to_dict() for p in mob91_phones]
-                }
-                print(f"      [SUCCESS] Found {len(mob91_phones)} phones\n")
-            except Exception as e:
-                print(f"      [ERROR] {str(e)}\n")
-                results['scrapers']['91mobiles'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'count': 0,
-                    'phones': []
-                }
-        
-        # Kimovil (global prices - may be blocked)
-        if 'kimovil' in sites:
-            current_site += 1
-            print(f"[{current_site}/{total_sites}] Searching Kimovil...")
+        for current_site, site in enumerate(sites, 1):
+            log.info("[%s/%s] Searching %s...", current_site, total_sites, self.SITE_LABELS[site])
+            yield {'event': 'site_start', 'site': site, 'index': current_site, 'total_sites': total_sites}
+            
+            if site == 'gsmarena':
+                # GSMArena treats the legacy default of 10 as "all results"
+                site_max = max_results_per_site if max_results_per_site != 10 else None
+            else:
+                site_max = max_results_per_site
+            
+            count = 0
+            started = time.perf_counter()
             try:
-                kim_phones = self.kimovil.search_phones(query, max_results=max_results_per_site)
-                results['scrapers']['kimovil'] = {
-                    'status': 'success',
-                    'count': len(kim_phones),
-                    'phones': [p.to_dict() for p in kim_phones]
-                }
-                print(f"      [SUCCESS] Found {len(kim_phones)} phones\n")
+                for phone in self._site_scraper(site).iter_search_phones(query, max_results=site_max):
+                    count += 1
+                    yield {'event': 'phone', 'site': site, 'phone': phone}
+                counts[site] = count
+                metrics.SITE_SEARCH_SECONDS.observe(time.perf_counter() - started, site=site, status='success')
+                log.info("      [SUCCESS] Found %s phones\n", count)
+                yield {'event': 'site_done', 'site': site, 'status': 'success', 'count': count}
             except Exception as e:
-                print(f"      [ERROR] {str(e)}\n")
-                results['scrapers']['kimovil'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'count': 0,
-                    'phones': []
-                }
+                counts[site] = count
+                metrics.SITE_SEARCH_SECONDS.observe(time.perf_counter() - started, site=site, status='error')
+                log.warning("      [ERROR] %s\n", str(e))
+                yield {'event': 'site_done', 'site': site, 'status': 'error', 'count': count, 'error': str(e)}
+        
+        yield {
+            'event': 'done',
+            'query': query,
+            'timestamp': timestamp,
+            'total_found': sum(counts.values()),
+            'counts': counts
+        }
+    
+    def search_all(self, query: str, max_results_per_site: int = 10, sites: Optional[List[str]] = None, max_results: int = None) -> dict:
+        """
+        Search for phones across all scrapers.
+        
+        Args:
+            query: Search query (e.g., "Samsung Galaxy S24", "iPhone 15", "OnePlus")
+            max_results_per_site: Maximum results from each scraper (deprecated, use max_results)
+            sites: List of sites to search (optional). Options: ['gsmarena', '91mobiles', 'kimovil']
+            max_results: Maximum results to return (None for all)
+            
+        Returns:
+            Dictionary with results from each scraper
+        """
+        results = {
+            'query': query,
+            'timestamp': None,
+            'scrapers': {}
+        }
+        phones_by_site = {}
+        
+        with profiling.session(f'search_{query}', self.profile):
+            for event in self.iter_search(query, max_results_per_site, sites=sites, max_results=max_results):
+                kind = event['event']
+                if kind == 'site_start':
+                    phones_by_site[event['site']] = []
+                elif kind == 'phone':
+                    phone = event['phone']
+                    # GSMArena phones are kept as Phone objects, other sites as dicts
+                    phones_by_site[event['site']].append(phone if event['site'] == 'gsmarena' else phone.to_dict())
+                elif kind == 'site_done':
+                    site = event['site']
+                    if event['status'] == 'success':
+                        results['scrapers'][site] = {
+                            'status': 'success',
+                            'count': event['count'],
+                            'phones': phones_by_site[site]
+                        }
+                    else:
+                        results['scrapers'][site] = {
+                            'status': 'error',
+                            'error': event['error'],
+                            'count': 0,
+                            'phones': []
+                        }
+                elif kind == 'done':
+                    results['timestamp'] = event['timestamp']
         
         # Summary
         total = sum(s['count'] for s in results['scrapers'].values())
         results['total_found'] = total
         
-        print(f"{'='*60}")
-        print(f"SEARCH COMPLETE")
-        print(f"{'='*60}")
-        print(f"Total phones found: {total}")
+        log.info('=' * 60)
+        log.info("SEARCH COMPLETE")
+        log.info('=' * 60)
+        log.info("Total phones found: %s", total)
         
         # Print counts for searched sites only
-        for site in sites:
-            if site in results['scrapers']:
-                count = results['scrapers'][site]['count']
-                print(f"  - {site}: {count}")
+        for site in results['scrapers']:
+            count = results['scrapers'][site]['count']
+            log.info("  - %s: %s", site, count)
         
-        print(f"{'='*60}\n")
+        log.info('=' * 60 + '\n')
         
         return results
     
@@ -165,21 +222,64 @@ class UniversalSearch:
         # Ensure data directory exists
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
-        # Format results if detailed format requested
-        if detailed_format:
-            from format_results import format_detailed_results
-            results_to_save = format_detailed_results(results)
-        else:
-            results_to_save = results
-        
-        # Save results
+        # Save results (the detailed format is written phone by phone)
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results_to_save, f, indent=2, ensure_ascii=False)
+            if detailed_format:
+                from format_results import detailed_header, iter_result_phones, write_detailed_results
+                write_detailed_results(iter_result_phones(results), f, header=detailed_header(results))
+            else:
+                json.dump(results, f, indent=2, ensure_ascii=False)
         
-        print(f"[SAVED] Results saved to: {output_file}\n")
+        log.info("[SAVED] Results saved to: %s\n", output_file)
         
         return results
     
+    def export_detailed(self, query: str, output_file: str, format: str = "ndjson",
+                        sites: Optional[List[str]] = None, max_results: int = None) -> int:
+        """
+        Search and stream every phone to a file in detailed format as it is scraped.
+        
+        Unlike search_and_save(), no phones are kept in memory, so this suits
+        bulk exports of thousands of phones.
+        
+        Args:
+            query: Search query
+            output_file: Output file path
+            format: "ndjson" (one phone per line) or "json"
+            sites: List of sites to search (optional)
+            max_results: Maximum results per site (None for all)
+            
+        Returns:
+            Number of phones written
+        """
+        from format_results import write_detailed_results
+        
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        def phones():
+            for event in self.iter_search(query, sites=sites, max_results=max_results):
+                if event['event'] == 'phone':
+                    yield event['phone'], event['site']
+        
+        header = {
+            "query": query,
+            "query_params": {
+                "page_number": None,
+                "sort": None,
+                "min_price": None,
+                "max_price": None,
+                "others": None
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            count = write_detailed_results(phones(), f, header=header, format=format)
+        
+        log.info("[SAVED] %s phones exported to: %s\n", count, output_file)
+        return count
+    
     def display_results(self, results: dict, show_details: bool = True):
         """
         Display search results in a readable format.
@@ -246,17 +346,17 @@ class UniversalSearch:
         Returns:
             Phone object with all details, or None if failed
         """
-        print(f"\n[FETCHING] Getting details from: {url}\n")
+        log.info("\n[FETCHING] Getting details from: %s\n", url)
         
         # Determine which scraper to use based on URL
-        if 'gsmarena.com' in url:
+        if 'gsmarena.com' in url or url.startswith(GSMArenaScraper.BASE_URL):
             return self.gsmarena.scrape_phone(url)
         elif '91mobiles.com' in url:
             return self.mobiles91.scrape_phone(url)
         elif 'kimovil.com' in url:
             return self.kimovil.scrape_phone(url)
         else:
-            print(f"[ERROR] Unknown website. Supported: GSMArena, 91mobiles, Kimovil")
+            log.warning("[ERROR] Unknown website. Supported: GSMArena, 91mobiles, Kimovil")
             return None
     
     def compare_phones(self, phone_list: List[Phone]) -> dict:
@@ -300,6 +400,22 @@ class UniversalSearch:
                 comparison['specs_comparison'][spec_key].append(value)
         
         return comparison
+    
+    def compare_phones_batch(self, phone_list: List[Phone]):
+        """
+        Compare parsed numeric specs across many phones.
+        
+        Unlike compare_phones(), values are typed and ranked, and the
+        result can be exported with to_csv() / to_parquet().
+        
+        Args:
+            phone_list: List of Phone objects (or phone dictionaries) to compare
+            
+        Returns:
+            ComparisonMatrix
+        """
+        from comparison import compare_batch
+        return compare_batch(phone_list)
 
 
 def interactive_search():
@@ -369,8 +485,8 @@ def interactive_search():
 
 
 if __name__ == "__main__":
-    # Example usage
-    searcher = UniversalSearch()
+    # Example usage (--profile=cpu|mem or PROFILE=cpu|mem to profile the search)
+    searcher = UniversalSearch(profile=profiling.requested())
     
     # Quick search example
     results = searcher.search_and_save("Samsung Galaxy S24", max_results_per_site=3)
@@ -6,17 +6,21 @@ Uses basic HTTP client only for maximum compatibility.
 from typing import Optional
 import requests as base_requests
 
+from utils.fetch_replay import fetch_mode
+
 
 class AdaptiveClient:
     """
     HTTP client wrapper that uses the basic HTTPClient.
     Simplified version for Appwrite serverless deployment.
+    
+    Record/replay (FETCH_MODE) is handled by the wrapped HTTPClient.
     """
     
     def __init__(self, delay_range: tuple = (1, 3)):
         """Initialize adaptive client with HTTPClient."""
         self.delay_range = delay_range
-        self.method = 'requests'
+        self.method = 'replay' if fetch_mode() == 'replay' else 'requests'
         self.client = self._create_client()
         
         print(f"[AdaptiveClient] Using basic HTTP client for Appwrite")
@@ -0,0 +1,133 @@
+"""
+Block and bot-challenge detection for fetched pages.
+
+Shared by HTTPClient and HeadlessBrowserClient. A page is classified from
+its status, a few response headers, its <title> and the start of the body
+(SCAN_CHARS) with a precompiled title pattern and body markers, so the cost per page is constant
+however large the page is:
+
+    verdict = classify(200, response.headers, html)
+    if verdict.blocked:
+        print(verdict.kind, verdict.reason)   # 'cloudflare', 'title: just a moment...'
+
+    classify(200, {}, '<title>Captcha challenge</title>').kind               # 'captcha'
+    classify(200, {}, '<title>Security check: Galaxy S24 update</title>')    # NOT_BLOCKED
+
+Kinds:
+    rate_limit      HTTP 429
+    cloudflare      Cloudflare interstitial / managed challenge
+    captcha         reCAPTCHA, hCaptcha, DataDome and "are you a human" pages
+    access_denied   other 401/403 answers
+
+Only markers that appear on challenge pages are matched. Phrases that also
+occur on normal pages ('ray id' in footers, 'captcha' in comment forms,
+'cloudflare' in CDN URLs) are not, and neither are matches past the
+start of the body.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+# Challenge pages put their title and markers in the first couple of KB
+SCAN_CHARS = 2048
+
+_TITLE_RE = re.compile(r'<title[^>]*>\s*(.*?)\s*</title', re.IGNORECASE | re.DOTALL)
+
+# Checked in order; the name of the group that matched is the kind
+_TITLE_MATCHER = re.compile(
+    r'(?P<cloudflare>^just a moment|^attention required|^please wait\b.*cloudflare|^one more step)'
+    # Captcha titles are the whole short wording: news titles mention captchas too
+    r'|(?P<captcha>^(?:captcha(?: check| challenge| required)?|are you a (?:human|robot)'
+    r'|verify(?:ing)? (?:you are )?(?:a )?human|security check|pardon our interruption)\W*$)'
+    r'|(?P<access_denied>^access denied|^403 forbidden|^forbidden$|^request blocked)',
+    re.IGNORECASE
+)
+# Literal markers, searched in the lower-cased start of the body: a dozen
+# substring checks are far cheaper than one regex alternation over 2 KB
+_BODY_MARKERS = (
+    ('cf-browser-verification', 'cloudflare'),
+    ('/cdn-cgi/challenge-platform/', 'cloudflare'),
+    ('_cf_chl_opt', 'cloudflare'),
+    ('cf-chl-', 'cloudflare'),
+    ('id="challenge-body"', 'cloudflare'),
+    ('id="challenge-form"', 'cloudflare'),
+    ('checking your browser before accessing', 'cloudflare'),
+    ('class="g-recaptcha"', 'captcha'),
+    ('class="h-captcha"', 'captcha'),
+    ('hcaptcha.com/1/api', 'captcha'),
+    ('google.com/recaptcha/api', 'captcha'),
+    ('captcha-delivery.com', 'captcha'),
+    ('/_incapsula_resource', 'captcha'),
+    ('px-captcha', 'captcha'),
+    ('our systems have detected unusual traffic', 'captcha'),
+)
+
+
+@dataclass(frozen=True)
+class Verdict:
+    """Result of classify(): kind is None when the page is not blocked."""
+    
+    kind: Optional[str] = None
+    reason: str = ''
+    
+    @property
+    def blocked(self) -> bool:
+        return self.kind is not None
+
+
+NOT_BLOCKED = Verdict()
+
+
+def page_title(text: str) -> str:
+    """Title of a page from its first SCAN_CHARS characters ('' when absent)."""
+    match = _TITLE_RE.search(text, 0, SCAN_CHARS)
+    return ' '.join(match.group(1).split()) if match else ''
+
+
+def classify(status: Optional[int], headers: Optional[Mapping[str, str]] = None,
+             text: Optional[str] = None) -> Verdict:
+    """
+    Classify a fetched page.
+    
+    Args:
+        status: HTTP status (None when unknown)
+        headers: Response headers (any case-insensitive or lower-case mapping)
+        text: Page HTML (only the first SCAN_CHARS characters are inspected)
+    
+    Returns:
+        Verdict with the kind of block and what matched, or NOT_BLOCKED
+    """
+    if status == 429:
+        return Verdict('rate_limit', 'status 429')
+    
+    headers = headers or {}
+    if _header(headers, 'cf-mitigated') == 'challenge':
+        return Verdict('cloudflare', 'header cf-mitigated')
+    if status in (401, 403) and (_header(headers, 'x-datadome') or _header(headers, 'x-dd-b')):
+        return Verdict('captcha', f'status {status} from DataDome')
+    
+    if text:
+        title = page_title(text)
+        if title:
+            match = _TITLE_MATCHER.search(title)
+            if match:
+                return Verdict(match.lastgroup, f'title: {title[:60].lower()}')
+        head = text[:SCAN_CHARS].lower()
+        for marker, kind in _BODY_MARKERS:
+            if marker in head:
+                return Verdict(kind, f'body: {marker}')
+    
+    if status == 403 and _header(headers, 'server') == 'cloudflare':
+        return Verdict('cloudflare', 'status 403 from Cloudflare')
+    if status in (401, 403):
+        return Verdict('access_denied', f'status {status}')
+    return NOT_BLOCKED
+
+
+def _header(headers: Mapping[str, str], name: str) -> str:
+    value = headers.get(name)
+    if value is None and isinstance(headers, dict):
+        # Plain dicts (recorded fetches, Playwright) may not be lower-cased
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    return (value or '').strip().lower()
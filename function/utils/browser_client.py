@@ -4,25 +4,137 @@ Bypasses bot detection by acting like a real browser.
 """
 
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+import logging
+import os
 import time
 import random
 
+from utils.fetch_replay import get_recorder, get_replayer
+from utils import block_detection, metrics, timing
+from utils.log import get_logger, sampled
+from utils.storage_state import get_store, site_of
+
+log = get_logger('browser')
+
+
+class PageResponse:
+    """Minimal response object returned by HeadlessBrowserClient.get()."""
+    
+    def __init__(self, text: str, status_code: int = 200):
+        self.text = text
+        self.status_code = status_code
+
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """
+    Resident memory of all descendants of a process, in MB.
+    
+    Uses psutil when installed, else /proc (Linux); None when neither is available.
+    """
+    try:
+        import psutil
+        try:
+            children = psutil.Process(root_pid).children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+    except ImportError:
+        pass
+    
+    if not os.path.isdir('/proc'):
+        return None
+    children_of: Dict[int, list] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                # "pid (comm) state ppid ..."; comm may contain spaces
+                ppid = int(f.read().rsplit(b')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children_of.setdefault(ppid, []).append(int(entry))
+    
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    pending = list(children_of.get(root_pid, []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(children_of.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/statm', 'rb') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / (1024 * 1024)
+
 
 class HeadlessBrowserClient:
-    """Headless browser client for stealth scraping with anti-bot detection."""
+    """
+    Headless browser client for stealth scraping with anti-bot detection.
+    
+    A watchdog keeps long crawls from degrading: the browser context is
+    recycled every BROWSER_MAX_PAGES_PER_CONTEXT pages, the browser's
+    process tree is checked against BROWSER_MAX_RSS_MB every
+    BROWSER_RSS_CHECK_EVERY pages (context recycled first, browser
+    relaunched if that is not enough), and a crashed browser or context is
+    restarted and the URL that was loading is retried.
+    
+    Cookies and localStorage are persisted per site (utils.storage_state):
+    new contexts start with the saved state, and the state of visited sites
+    is saved at most every BROWSER_STATE_SAVE_SECONDS, right after a
+    challenge is passed, and before a context is closed.
+    """
+    
+    # Restarts after a crash per get() call before the URL counts as failed
+    MAX_CRASH_RESTARTS = 2
     
-    def __init__(self):
-        """Initialize Playwright browser."""
+    _SCOPE_LABELS = {'context': 'Browser context', 'browser': 'Browser'}
+    
+    def __init__(self, max_pages_per_context: Optional[int] = None, max_rss_mb: Optional[float] = None,
+                 rss_check_every: Optional[int] = None):
+        """
+        Initialize Playwright browser (not launched when replaying recorded fetches).
+        
+        Args:
+            max_pages_per_context: Pages before the context is recycled (default:
+                BROWSER_MAX_PAGES_PER_CONTEXT or 500; 0 disables)
+            max_rss_mb: RSS limit of the browser processes in MB (default:
+                BROWSER_MAX_RSS_MB or 1500; 0 disables)
+            rss_check_every: Pages between RSS checks (default: BROWSER_RSS_CHECK_EVERY or 25)
+        """
         self.playwright = None
         self.browser = None
         self.context = None
-        self._init_browser()
+        self.max_pages_per_context = (max_pages_per_context if max_pages_per_context is not None
+                                      else int(os.environ.get('BROWSER_MAX_PAGES_PER_CONTEXT', 500)))
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else float(os.environ.get('BROWSER_MAX_RSS_MB', 1500))
+        self.rss_check_every = rss_check_every or int(os.environ.get('BROWSER_RSS_CHECK_EVERY', 25))
+        self.pages_in_context = 0
+        self.pages_served = 0
+        self.restarts = {'context': 0, 'browser': 0}
+        self.state_store = get_store()
+        self.state_save_interval = float(os.environ.get('BROWSER_STATE_SAVE_SECONDS', 60))
+        self._state_saved_at = 0.0
+        self._unsaved_sites = set()
+        self.replayer = get_replayer()
+        if not self.replayer:
+            self._init_browser()
     
     def _init_browser(self):
         """Initialize browser with stealth settings."""
         self.playwright = sync_playwright().start()
-        
+        self._launch()
+    
+    def _launch(self):
+        """Launch the browser and open a fresh context."""
         # Launch browser with stealth settings
         self.browser = self.playwright.chromium.launch(
             headless=True,
@@ -34,6 +146,14 @@ class HeadlessBrowserClient:
                 '--disable-web-security',
             ]
         )
+        self._new_context()
+    
+    def _new_context(self):
+        """Open a browser context with realistic settings and the stealth scripts."""
+        # Start from the cookies earlier contexts and processes saved
+        storage_state = self.state_store.load() if self.state_store else None
+        if storage_state and not (storage_state['cookies'] or storage_state['origins']):
+            storage_state = None
         
         # Create context with realistic settings
         self.context = self.browser.new_context(
@@ -41,6 +161,7 @@ class HeadlessBrowserClient:
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             locale='en-US',
             timezone_id='America/New_York',
+            storage_state=storage_state,
         )
         
         # Add extra stealth scripts
@@ -73,6 +194,116 @@ class HeadlessBrowserClient:
                     originalQuery(parameters)
             );
         """)
+        self.pages_in_context = 0
+    
+    @staticmethod
+    def _close_quietly(target):
+        """Close a context / browser / Playwright instance that may already be dead."""
+        if target is None:
+            return
+        try:
+            if hasattr(target, 'stop'):
+                target.stop()
+            else:
+                target.close()
+        except Exception:
+            pass
+    
+    def _driver_pid(self) -> int:
+        """PID whose descendants are this client's browser processes."""
+        try:
+            # Playwright's Node driver process, the parent of Chromium
+            return self.playwright._impl_obj._connection._transport._proc.pid
+        except AttributeError:
+            # Fall back to this process: covers every browser it started
+            return os.getpid()
+    
+    def save_storage_state(self, force: bool = False):
+        """
+        Persist the cookies and localStorage of the sites visited since the last save.
+        
+        Args:
+            force: Save now instead of waiting for BROWSER_STATE_SAVE_SECONDS
+        """
+        if not (self.state_store and self.context and self._unsaved_sites):
+            return
+        if not force and time.time() - self._state_saved_at < self.state_save_interval:
+            return
+        try:
+            state = self.context.storage_state()
+            self.state_store.save(state, sites=self._unsaved_sites)
+        except Exception as e:
+            sampled(log, logging.WARNING, 'browser-state-save', "⚠️  Could not save storage state: %s", e)
+            return
+        self._unsaved_sites.clear()
+        self._state_saved_at = time.time()
+    
+    def browser_rss_mb(self) -> Optional[float]:
+        """Resident memory of the browser processes in MB (None when unavailable)."""
+        if self.playwright is None:
+            return None
+        return _process_tree_rss_mb(self._driver_pid())
+    
+    def restart(self, scope: str, reason: str):
+        """
+        Replace the context ('context') or relaunch the whole browser ('browser').
+        
+        Args:
+            scope: 'context' or 'browser'
+            reason: Why ('pages', 'rss', 'crash'), for logs and metrics
+        """
+        with timing.span('recycle'):
+            if reason != 'crash':
+                self.save_storage_state(force=True)
+            self._close_quietly(self.context)
+            self.context = None
+            if scope == 'browser' or not self.is_healthy():
+                scope = 'browser'
+                self._close_quietly(self.browser)
+                self.browser = None
+                try:
+                    self._launch()
+                except Exception:
+                    # The Playwright driver died with the browser: start a new one
+                    self._close_quietly(self.playwright)
+                    self._init_browser()
+            else:
+                self._new_context()
+        
+        self.restarts[scope] += 1
+        metrics.BROWSER_RESTARTS.inc(scope=scope, reason=reason)
+        level = logging.WARNING if reason == 'crash' else logging.INFO
+        log.log(level, "♻️  %s restarted (%s) after %d pages", self._SCOPE_LABELS[scope], reason, self.pages_served)
+    
+    def _watchdog(self):
+        """Before each page: recover a dead browser, recycle on page count or memory."""
+        if not self.is_healthy():
+            self.restart('browser', 'crash')
+            return
+        
+        if self.max_rss_mb and self.pages_served and self.pages_served % self.rss_check_every == 0:
+            rss = self.browser_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                log.info("🧠 Browser RSS %.0f MB is over the %.0f MB limit", rss, self.max_rss_mb)
+                self.restart('context', 'rss')
+                rss = self.browser_rss_mb()
+                if rss is not None and rss > self.max_rss_mb:
+                    self.restart('browser', 'rss')
+                return
+        
+        if self.max_pages_per_context and self.pages_in_context >= self.max_pages_per_context:
+            self.restart('context', 'pages')
+    
+    def _crash_scope(self, error: Exception) -> Optional[str]:
+        """'browser' or 'context' when an error means that part died, else None."""
+        if self.replayer:
+            return None
+        if not self.is_healthy():
+            return 'browser'
+        message = str(error).lower()
+        if 'crash' in message or 'has been closed' in message:
+            return 'context'
+        return None
     
     def get(self, url: str, max_retries: int = 3, **kwargs) -> Optional[str]:
         """
@@ -86,118 +317,182 @@ class HeadlessBrowserClient:
         Returns:
             Page HTML content or None if failed
         """
-        for attempt in range(1, max_retries + 1):
-            page = None
+        host = metrics.host_of(url)
+        client = type(self).__name__
+        attempt = 0
+        crash_restarts = 0
+        blocked = False
+        while attempt < max_retries:
+            attempt += 1
             try:
-                # Create new page
-                page = self.context.new_page()
-                
-                # Set proxy if provided
-                if 'proxies' in kwargs and kwargs['proxies']:
-                    proxy_url = kwargs['proxies'].get('http', '')
-                    if proxy_url:
-                        # Note: Playwright proxy needs to be set at context level
-                        # This is a workaround - we'll handle it differently
-                        print(f"⚠️  Proxy support: Use context-level proxy for better results")
+                status, headers, content = self._load(url, **kwargs)
+                metrics.FETCH_RESPONSES.inc(host=host, client=client, status=status or 'error')
                 
-                # Random delay before navigation
-                time.sleep(random.uniform(0.5, 1.5))
+                # Check for bot detection
+                verdict = block_detection.classify(status, headers, content)
+                if verdict.blocked:
+                    metrics.FETCH_BLOCKED.inc(host=host, client=client, kind=verdict.kind)
                 
-                # Navigate to page with longer timeout
-                print(f"🌐 Loading: {url[:60]}...")
-                response = page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                if status == 200 and not verdict.blocked:
+                    if not self.replayer:
+                        self._unsaved_sites.add(site_of(host))
+                        # A passed challenge usually just set a clearance cookie
+                        self.save_storage_state(force=blocked)
+                    return PageResponse(content)
                 
-                if response and response.status == 200:
-                    # Simple timeout instead of networkidle (which can hang)
-                    print(f"⏳ Waiting for page to settle...")
-                    page.wait_for_timeout(3000)  # 3 second wait
-                    
-                    # Get page content
-                    content = page.content()
-                    print(f"✅ Page loaded successfully ({len(content)} bytes)")
-                    
-                    # Check for bot detection
-                    if self._is_blocked(content):
-                        print(f"⚠️  Bot detection triggered (attempt {attempt}/{max_retries})")
-                        if attempt < max_retries:
-                            time.sleep(random.uniform(3, 6))
-                            page.close()
-                            continue
-                        return None
-                    
-                    page.close()
-                    
-                    # Return mock response object with text attribute
-                    class Response:
-                        def __init__(self, text):
-                            self.text = text
-                            self.status_code = 200
-                    
-                    return Response(content)
+                elif verdict.blocked and verdict.kind != 'rate_limit':
+                    log.warning("⚠️  Bot detection triggered on %s: %s (attempt %d/%d)", url, verdict.reason, attempt, max_retries)
+                    blocked = True
+                    if attempt < max_retries:
+                        timing.sleep(random.uniform(3, 6), 'backoff', url)
+                        continue
+                    if self.state_store:
+                        # Don't hand a session the site keeps challenging to new contexts
+                        self.state_store.clear(site_of(host))
+                    return None
                 
-                elif response and response.status == 429:
-                    print(f"❌ Rate limited (attempt {attempt}/{max_retries})")
+                elif status == 429:
+                    log.warning("❌ Rate limited on %s (attempt %d/%d)", url, attempt, max_retries)
                     wait_time = (2 ** attempt) * 15  # Longer wait: 30s, 60s, 120s
                     if attempt < max_retries:
-                        print(f"⏰ Cooling down for {wait_time}s...")
-                        page.close()
-                        time.sleep(wait_time)
+                        log.info("⏰ Cooling down for %ds...", wait_time)
+                        timing.sleep(wait_time, 'backoff', url)
                         continue
                     else:
-                        page.close()
                         return None
                 
                 else:
-                    print(f"❌ HTTP {response.status if response else 'error'} (attempt {attempt}/{max_retries})")
+                    log.warning("❌ HTTP %s on %s (attempt %d/%d)", status or 'error', url, attempt, max_retries)
                 
-                if page:
-                    page.close()
-                    
                 if attempt == max_retries:
                     return None
                     
             except Exception as e:
+                metrics.FETCH_RESPONSES.inc(host=host, client=client, status='error')
+                crashed = self._crash_scope(e)
+                if crashed and crash_restarts < self.MAX_CRASH_RESTARTS:
+                    # Restart and load the same URL again; a crash is not a failed attempt
+                    crash_restarts += 1
+                    attempt -= 1
+                    log.warning("💥 %s died while loading %s: %s", self._SCOPE_LABELS[crashed], url, str(e)[:80])
+                    try:
+                        self.restart(crashed, 'crash')
+                        continue
+                    except Exception as restart_error:
+                        # Could not relaunch: that costs the attempt after all
+                        attempt += 1
+                        e = restart_error
+                        log.warning("💥 Restart after crash failed: %s", str(e)[:80])
+                
                 error_msg = str(e)
                 if 'timeout' in error_msg.lower():
-                    print(f"❌ Timeout (attempt {attempt}/{max_retries})")
+                    log.warning("❌ Timeout on %s (attempt %d/%d)", url, attempt, max_retries)
                 else:
-                    print(f"❌ Browser error (attempt {attempt}/{max_retries}): {error_msg[:80]}")
+                    log.warning("❌ Browser error (attempt %d/%d): %s", attempt, max_retries, error_msg[:80])
                 
-                if page:
-                    page.close()
-                    
                 if attempt == max_retries:
                     return None
                     
-                time.sleep(random.uniform(1, 3))
+                timing.sleep(random.uniform(1, 3), 'backoff', url)
         
         return None
     
-    def _is_blocked(self, content: str) -> bool:
-        """Detect if request was blocked by bot detection."""
-        content_lower = content.lower()
+    def _load(self, url: str, **kwargs) -> Tuple[Optional[int], Dict[str, str], Optional[str]]:
+        """
+        Load one page in a fresh tab (or from the fetch archive when replaying).
         
-        bot_indicators = [
-            'are you a human',
-            'captcha',
-            'just a moment',
-            'checking your browser',
-            'please verify',
-            'unusual traffic',
-            'cf-browser-verification',
-            'ray id',
-        ]
+        Returns:
+            (HTTP status or None, response headers, page HTML when there was a response)
+        """
+        if self.replayer:
+            recorded = self.replayer.get(url)
+            return recorded.status, recorded.headers, recorded.body
         
-        return any(indicator in content_lower for indicator in bot_indicators)
+        self._watchdog()
+        
+        # Create new page
+        page = self.context.new_page()
+        self.pages_in_context += 1
+        self.pages_served += 1
+        try:
+            # Set proxy if provided
+            if 'proxies' in kwargs and kwargs['proxies']:
+                proxy_url = kwargs['proxies'].get('http', '')
+                if proxy_url:
+                    # Note: Playwright proxy needs to be set at context level
+                    # This is a workaround - we'll handle it differently
+                    sampled(log, logging.WARNING, 'browser-proxy', "⚠️  Proxy support: Use context-level proxy for better results")
+            
+            # Random delay before navigation
+            timing.sleep(random.uniform(0.5, 1.5), 'delay', url)
+            
+            # Navigate to page with longer timeout
+            log.debug("🌐 Loading: %s...", url[:60])
+            with timing.span('navigation', url):
+                response = page.goto(url, wait_until='domcontentloaded', timeout=60000)
+            status = response.status if response else None
+            headers = response.headers if response else {}
+            content = None
+            if response:
+                self._record_network_timing(response, url)
+            
+            if status == 200:
+                # Simple timeout instead of networkidle (which can hang)
+                log.debug("⏳ Waiting for page to settle...")
+                with timing.span('settle', url):
+                    page.wait_for_timeout(3000)  # 3 second wait
+                
+                # Get page content
+                with timing.span('content', url):
+                    content = page.content()
+                log.debug("✅ Page loaded successfully (%d bytes)", len(content))
+            elif response:
+                # Error pages are small; their title tells a challenge from a server error
+                with timing.span('content', url):
+                    content = page.content()
+            
+            recorder = get_recorder()
+            if recorder and response:
+                recorder.record(url, status, headers, content, type(self).__name__)
+            
+            return status, headers, content
+        finally:
+            self._close_quietly(page)
+    
+    @staticmethod
+    def _record_network_timing(response, url: str):
+        """Record DNS and connect time of the main request from the browser's resource timing."""
+        try:
+            network = response.request.timing
+        except Exception:
+            return
+        # Offsets in ms from the request start; -1 when not applicable (e.g. reused connection)
+        for stage, start, end in (('dns', 'domainLookupStart', 'domainLookupEnd'),
+                                  ('connect', 'connectStart', 'connectEnd')):
+            if network.get(start, -1) >= 0 and network.get(end, -1) >= network.get(start, -1):
+                timing.record(stage, (network[end] - network[start]) / 1000, url)
+    
+    def is_healthy(self) -> bool:
+        """Check that the browser process is still connected."""
+        if self.replayer:
+            return True
+        try:
+            return self.browser is not None and self.browser.is_connected()
+        except Exception:
+            return False
     
     def close(self):
-        """Close browser and cleanup."""
+        """Save the storage state, close browser and cleanup."""
         if self.context:
+            self.save_storage_state(force=True)
             self.context.close()
+            self.context = None
         if self.browser:
             self.browser.close()
+            self.browser = None
         if self.playwright:
             self.playwright.stop()
+            self.playwright = None
     
     def __del__(self):
         """Cleanup on deletion."""
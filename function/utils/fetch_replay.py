@@ -0,0 +1,244 @@
+"""
+Record/replay layer for the fetch clients (HTTPClient, AdaptiveClient, HeadlessBrowserClient).
+
+Activated through the environment, so whole pipelines (UniversalSearch,
+scrape_all_makers.py, web_app.py) can be recorded once and then replayed
+offline, reproducibly, for load tests and profiling:
+
+    FETCH_MODE=record  FETCH_ARCHIVE=data/crawl.jsonl.gz python scrape_all_makers.py
+    FETCH_MODE=replay  FETCH_ARCHIVE=data/crawl.jsonl.gz REPLAY_LATENCY_MS=50-300 \
+        REPLAY_429_RATE=0.05 REPLAY_CHALLENGE_RATE=0.02 python scrape_all_makers.py
+
+The archive is gzipped JSON lines, one response per line:
+{"url", "status", "headers", "body", "client", "recorded_at"}.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from utils.log import get_logger, sampled
+
+log = get_logger('replay')
+
+DEFAULT_ARCHIVE = "data/fetch_archive.jsonl.gz"
+
+# Headers describing the wire encoding; the archive stores decoded text
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+# Served instead of the recorded page when a bot challenge is injected
+CHALLENGE_PAGE = """<!DOCTYPE html><html lang="en-US"><head><title>Just a moment...</title></head>
+<body><div id="challenge-body"><h1>Checking your browser before accessing the site.</h1>
+<p>Please verify you are a human. This process is automatic.</p>
+<div class="cf-browser-verification"></div><p>Ray ID: 8a1b2c3d4e5f6789</p></div></body></html>"""
+
+
+def fetch_mode() -> str:
+    """Return the active mode: 'record', 'replay' or '' (live fetching)."""
+    mode = os.environ.get('FETCH_MODE', '').strip().lower()
+    return mode if mode in ('record', 'replay') else ''
+
+
+def _archive_path() -> str:
+    return os.environ.get('FETCH_ARCHIVE', DEFAULT_ARCHIVE)
+
+
+def _parse_latency(value: str) -> Tuple[float, float]:
+    """Parse REPLAY_LATENCY_MS ("200" or "50-300") into seconds."""
+    if not value:
+        return 0.0, 0.0
+    low, _, high = value.partition('-')
+    low = float(low) / 1000
+    return low, (float(high) / 1000 if high else low)
+
+
+class RecordedResponse:
+    """A response from the archive, or an injected failure."""
+    
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: str):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+    
+    def to_requests(self):
+        """Build a requests.Response, so HTTPClient's status handling runs unchanged."""
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = 'utf-8'
+        response._content = self.body.encode('utf-8')
+        return response
+
+
+class FetchRecorder:
+    """Appends fetched responses to a gzipped JSON lines archive (thread-safe)."""
+    
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        # Appending adds a gzip member; readers see one continuous stream
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        atexit.register(self.close)
+        print(f"[RECORD] Recording fetches to {path}")
+    
+    def record(self, url: str, status: Optional[int], headers: Optional[Dict[str, str]],
+               body: Optional[str], client: str):
+        """
+        Append one response.
+        
+        Args:
+            url: Requested URL
+            status: HTTP status (None when the request failed without a response)
+            headers: Response headers
+            body: Decoded response text
+            client: Name of the recording client
+        """
+        entry = {
+            'url': url,
+            'status': status,
+            'headers': {k: v for k, v in (headers or {}).items() if k.lower() not in _DROPPED_HEADERS},
+            'body': body or '',
+            'client': client,
+            'recorded_at': datetime.now().isoformat(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"[RECORD] {self.count} responses saved to {self.path}")
+
+
+class FetchReplayer:
+    """
+    Serves archived responses by URL, with optional injected latency, 429s and bot challenges.
+    
+    Responses are keyed by URL; when a URL was recorded several times the
+    last successful response wins. Unknown URLs get a 404. Injected faults
+    are drawn from a seeded generator, so a replay is reproducible.
+    """
+    
+    def __init__(self, path: str, latency: Tuple[float, float] = (0.0, 0.0), rate_429: float = 0.0,
+                 challenge_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            path: Archive written by FetchRecorder
+            latency: (min, max) seconds added to every response
+            rate_429: Fraction of requests answered with 429 Too Many Requests
+            challenge_rate: Fraction of requests answered with a bot challenge page
+            seed: Seed for latency and fault injection
+        """
+        self.path = path
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.challenge_rate = challenge_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._responses: Dict[str, RecordedResponse] = {}
+        self._stats = {'served': 0, 'missing': 0, 'injected_429': 0, 'injected_challenge': 0}
+        
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                previous = self._responses.get(entry['url'])
+                if previous is not None and previous.status == 200 and entry['status'] != 200:
+                    continue
+                self._responses[entry['url']] = RecordedResponse(
+                    entry['url'], entry['status'] or 0, entry.get('headers') or {}, entry.get('body') or ''
+                )
+        
+        atexit.register(self._report)
+        print(f"[REPLAY] Serving {len(self._responses)} recorded URLs from {path}")
+    
+    def get(self, url: str) -> RecordedResponse:
+        """Return the response for a URL after the configured latency."""
+        with self._lock:
+            delay = self._random.uniform(*self.latency)
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+        
+        if roll < self.rate_429:
+            self._count('injected_429')
+            return RecordedResponse(url, 429, {'Retry-After': '1'}, 'Too Many Requests')
+        if roll < self.rate_429 + self.challenge_rate:
+            self._count('injected_challenge')
+            return RecordedResponse(url, 200, {'Content-Type': 'text/html'}, CHALLENGE_PAGE)
+        
+        response = self._responses.get(url)
+        if response is None:
+            self._count('missing')
+            sampled(log, logging.WARNING, 'replay-missing', "[REPLAY] Not in archive: %s", url)
+            return RecordedResponse(url, 404, {}, '')
+        self._count('served')
+        return response
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+    
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+    
+    def _report(self):
+        print(f"[REPLAY] {self.stats()}")
+
+
+_recorder: Optional[FetchRecorder] = None
+_replayer: Optional[FetchReplayer] = None
+_init_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[FetchRecorder]:
+    """Return the shared recorder when FETCH_MODE=record, else None."""
+    global _recorder
+    if fetch_mode() != 'record':
+        return None
+    with _init_lock:
+        if _recorder is None:
+            _recorder = FetchRecorder(_archive_path())
+    return _recorder
+
+
+def get_replayer() -> Optional[FetchReplayer]:
+    """Return the shared replayer when FETCH_MODE=replay, else None."""
+    global _replayer
+    if fetch_mode() != 'replay':
+        return None
+    with _init_lock:
+        if _replayer is None:
+            _replayer = FetchReplayer(
+                _archive_path(),
+                latency=_parse_latency(os.environ.get('REPLAY_LATENCY_MS', '')),
+                rate_429=float(os.environ.get('REPLAY_429_RATE', 0)),
+                challenge_rate=float(os.environ.get('REPLAY_CHALLENGE_RATE', 0)),
+                seed=int(os.environ.get('REPLAY_SEED', 0)),
+            )
+    return _replayer
@@ -4,9 +4,14 @@ HTTP Client with simple headers - based on mobile-specs-api approach.
 
 import requests
 from typing import Optional, Dict
-import time
 import random
 
+from utils.fetch_replay import get_recorder, get_replayer
+from utils import block_detection, metrics, timing
+from utils.log import get_logger
+
+log = get_logger('http')
+
 
 class HTTPClient:
     """Simple HTTP client for scraping."""
@@ -52,7 +57,17 @@ class HTTPClient:
         
         for attempt in range(1, max_retries + 1):
             try:
-                response = self.session.get(url, timeout=timeout, **kwargs)
+                response = self._fetch(url, timeout=timeout, **kwargs)
+                verdict = block_detection.classify(response.status_code, response.headers, response.text)
+                if verdict.blocked:
+                    metrics.FETCH_BLOCKED.inc(host=metrics.host_of(url), client=type(self).__name__, kind=verdict.kind)
+                    if response.ok:
+                        # A challenge page served with 200 is not a result
+                        log.warning("⚠️  Bot detection triggered on %s: %s (attempt %d/%d)", url, verdict.reason, attempt, max_retries)
+                        if attempt == max_retries:
+                            return None
+                        timing.sleep(random.uniform(3, 6), 'backoff', url)
+                        continue
                 response.raise_for_status()
                 return response
                 
@@ -61,16 +76,17 @@ class HTTPClient:
                     if e.response.status_code == 429:
                         # Rate limited - wait longer with exponential backoff
                         wait_time = (2 ** attempt) * 5  # 10s, 20s, 40s
-                        print(f"❌ Rate limited (attempt {attempt}/{max_retries}) - Waiting {wait_time}s...")
+                        log.warning("❌ Rate limited on %s (attempt %d/%d) - Waiting %ds...", url, attempt, max_retries, wait_time)
                         if attempt < max_retries:
-                            time.sleep(wait_time)
+                            timing.sleep(wait_time, 'backoff', url)
                             continue
                     elif e.response.status_code in [403, 401]:
-                        print(f"⚠️  Access denied (attempt {attempt}/{max_retries})")
+                        verdict = block_detection.classify(e.response.status_code, e.response.headers, e.response.text)
+                        log.warning("⚠️  Access denied on %s: %s (attempt %d/%d)", url, verdict.reason, attempt, max_retries)
                     else:
-                        print(f"❌ HTTP {e.response.status_code} (attempt {attempt}/{max_retries})")
+                        log.warning("❌ HTTP %d on %s (attempt %d/%d)", e.response.status_code, url, attempt, max_retries)
                 else:
-                    print(f"❌ HTTP error (attempt {attempt}/{max_retries}): {str(e)[:80]}")
+                    log.warning("❌ HTTP error (attempt %d/%d): %s", attempt, max_retries, str(e)[:80])
                 
                 if attempt == max_retries:
                     return None
@@ -79,19 +95,40 @@ class HTTPClient:
                     requests.exceptions.ConnectionError,
                     requests.exceptions.ProxyError) as e:
                 # These errors are common with bad proxies, fail fast
-                print(f"❌ Connection error (attempt {attempt}/{max_retries}): {type(e).__name__}")
+                log.warning("❌ Connection error on %s (attempt %d/%d): %s", url, attempt, max_retries, type(e).__name__)
                 if attempt == max_retries:
                     return None
-                time.sleep(1)  # Short delay before retry
+                timing.sleep(1, 'backoff', url)  # Short delay before retry
                     
             except requests.exceptions.RequestException as e:
-                print(f"❌ Request error (attempt {attempt}/{max_retries}): {str(e)[:80]}")
+                log.warning("❌ Request error (attempt %d/%d): %s", attempt, max_retries, str(e)[:80])
                 if attempt == max_retries:
                     return None
-                time.sleep(random.uniform(1, 3))
+                timing.sleep(random.uniform(1, 3), 'backoff', url)
         
         return None
     
+    def _fetch(self, url: str, **kwargs) -> requests.Response:
+        """Send one GET, served from or saved to the fetch archive when FETCH_MODE is set."""
+        client = type(self).__name__
+        replayer = get_replayer()
+        if replayer:
+            response = replayer.get(url).to_requests()
+            metrics.FETCH_RESPONSES.inc(host=metrics.host_of(url), client=client, status=response.status_code)
+            return response
+        
+        try:
+            with timing.span('request', url):
+                response = self.session.get(url, **kwargs)
+        except Exception:
+            metrics.FETCH_RESPONSES.inc(host=metrics.host_of(url), client=client, status='error')
+            raise
+        metrics.FETCH_RESPONSES.inc(host=metrics.host_of(url), client=client, status=response.status_code)
+        recorder = get_recorder()
+        if recorder:
+            recorder.record(url, response.status_code, dict(response.headers), response.text, client)
+        return response
+    
     def rotate_user_agent(self):
         """Rotate to a new random user agent."""
         # Use fixed user agent since fake_useragent was removed
@@ -0,0 +1,171 @@
+"""
+Logging for the scrapers and crawl scripts.
+
+A thin layer over the standard logging module, configured from the environment:
+
+    LOG_LEVEL=INFO            DEBUG shows per-page detail (loading, settle wait, parsed phone)
+    LOG_FORMAT=text           or "json" for one JSON object per line
+    LOG_SAMPLE_EVERY=100      repetitive per-item warnings are logged once per N occurrences
+    LOG_PROGRESS_EVERY=25     progress lines every N items ...
+    LOG_PROGRESS_SECONDS=30   ... or every T seconds, whichever comes first
+
+Per-item messages use lazy %-formatting (log.debug("Loading %s", url)), so
+they cost one level check when disabled.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+ROOT_LOGGER = 'scraper'
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus any `extra` fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure(level: Optional[str] = None, format: Optional[str] = None):
+    """
+    Set up the scraper loggers (called automatically by get_logger()).
+    
+    Args:
+        level: Log level name (default: LOG_LEVEL or INFO)
+        format: "text" or "json" (default: LOG_FORMAT or text)
+    """
+    global _configured
+    with _configure_lock:
+        level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+        format = (format or os.environ.get('LOG_FORMAT', 'text')).lower()
+        
+        handler = logging.StreamHandler(sys.stdout)
+        # Text mode keeps the plain console output the scripts always had
+        handler.setFormatter(JSONFormatter() if format == 'json' else logging.Formatter('%(message)s'))
+        
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [handler]
+        root.setLevel(getattr(logging, level, logging.INFO))
+        root.propagate = False
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger under the 'scraper' namespace (e.g. get_logger('browser'))."""
+    if not _configured:
+        configure()
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+class Sampler:
+    """
+    Logs the first occurrence of each message key, then one per `every`.
+    
+    Used for messages that repeat per item (a failed page, a missing
+    archive entry); the logged line reports how many were suppressed.
+    """
+    
+    def __init__(self, every: Optional[int] = None):
+        self.every = every or int(os.environ.get('LOG_SAMPLE_EVERY', 100))
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def log(self, logger: logging.Logger, level: int, key: str, msg: str, *args, **kwargs):
+        if not logger.isEnabledFor(level):
+            return
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        if count == 1:
+            logger.log(level, msg, *args, **kwargs)
+        elif count % self.every == 0:
+            hidden = self.every - 1 - (count == self.every)
+            logger.log(level, msg + ' (%d so far, %d not shown)', *args, count, hidden, **kwargs)
+
+
+_sampler = Sampler()
+
+
+def sampled(logger: logging.Logger, level: int, key: str, msg: str, *args, **kwargs):
+    """Log through the shared Sampler (see Sampler.log)."""
+    _sampler.log(logger, level, key, msg, *args, **kwargs)
+
+
+class Progress:
+    """
+    Throttled progress line for per-item loops.
+    
+        progress = Progress(log, 'Samsung', total=len(urls))
+        for url in urls:
+            ...
+            progress.update(saved=saved_count)
+        progress.done(saved=saved_count)
+    
+    A line is logged every `every` items or `interval` seconds, whichever
+    comes first, with the rate and an ETA when the total is known.
+    """
+    
+    def __init__(self, logger: logging.Logger, label: str, total: Optional[int] = None,
+                 every: Optional[int] = None, interval: Optional[float] = None):
+        self.logger = logger
+        self.label = label
+        self.total = total
+        self.every = every or int(os.environ.get('LOG_PROGRESS_EVERY', 25))
+        self.interval = interval if interval is not None else float(os.environ.get('LOG_PROGRESS_SECONDS', 30))
+        self.count = 0
+        self.started = time.monotonic()
+        self._last_count = 0
+        self._last_time = self.started
+    
+    def update(self, n: int = 1, **fields):
+        """Count n items; log a progress line if one is due."""
+        self.count += n
+        now = time.monotonic()
+        if self.count - self._last_count >= self.every or now - self._last_time >= self.interval:
+            self._emit(now, fields)
+    
+    def done(self, **fields):
+        """Log the final line."""
+        self._emit(time.monotonic(), fields, final=True)
+    
+    def _emit(self, now: float, fields: Dict, final: bool = False):
+        self._last_count = self.count
+        self._last_time = now
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
+        elapsed = now - self.started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        position = f"{self.count}/{self.total}" if self.total else str(self.count)
+        parts = [f"{self.label}: {'done ' if final else ''}{position}", f"{rate * 60:.1f}/min"]
+        if self.total and rate > 0 and not final:
+            parts.append(f"ETA {(self.total - self.count) / rate / 60:.0f}min")
+        parts.extend(f"{key}={value}" for key, value in fields.items())
+        self.logger.info(
+            "📊 %s", ' | '.join(parts),
+            extra={'progress': self.label, 'count': self.count, 'total': self.total,
+                   'per_min': round(rate * 60, 2), **fields}
+        )
@@ -0,0 +1,246 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain dictionaries behind a lock, so updating
+one costs a dict lookup and an addition. web_app.py serves them at
+/metrics; no client library or collector process is needed. Values that
+already live elsewhere (pool, cache, crawl stage timings) are read by
+collector callbacks only when /metrics is scraped.
+
+    from utils import metrics
+    metrics.FETCH_RESPONSES.inc(host='www.gsmarena.com', client='browser', status='429')
+    with metrics.MONGO_WRITE_SECONDS.time(collection='phones'):
+        collection.insert_one(document)
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils import timing
+from utils.log import get_logger
+
+log = get_logger('metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency buckets in seconds, from a parse (ms) to a full multi-page search (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            return self._values.get(key, 0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}' for key, value in items]
+
+
+class Histogram:
+    """Histogram with fixed buckets and optional labels."""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+    
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the enclosed block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        return [
+            line
+            for key, counts, total in items
+            for line in _histogram_lines(self.name, self.labels, key, self.buckets, counts, total)
+        ]
+
+
+def _histogram_lines(name: str, label_names: Tuple[str, ...], label_values: Tuple[str, ...],
+                     buckets: Tuple[float, ...], counts: List[int], total: float) -> List[str]:
+    """Render one histogram series from per-bucket (non-cumulative) counts."""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets + (float('inf'),), counts):
+        cumulative += count
+        le = f'le="{_format_value(bound)}"'
+        lines.append(f'{name}_bucket{_format_labels(label_names, label_values, le)} {cumulative}')
+    labels = _format_labels(label_names, label_values)
+    lines.append(f'{name}_sum{labels} {_format_value(round(total, 6))}')
+    lines.append(f'{name}_count{labels} {cumulative}')
+    return lines
+
+
+class Registry:
+    """Holds metrics and collector callbacks and renders them for /metrics."""
+    
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[str]]]]] = []
+        self._lock = threading.Lock()
+    
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+    
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+    
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[str]]]]):
+        """
+        Register a callback run at render time.
+        
+        The callback returns (name, kind, help, sample lines) tuples, e.g.
+        ('scraper_pool_busy', 'gauge', 'Busy workers', ['scraper_pool_busy 1']).
+        """
+        with self._lock:
+            self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """Return every metric in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                log.warning("⚠️  Metrics collector %s failed: %s", getattr(collector, '__name__', collector), e)
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def gauge(name: str, help: str, value: float, labels: Optional[Dict[str, str]] = None) -> Tuple[str, str, str, List[str]]:
+    """Build a single-sample gauge family for a collector."""
+    labels = labels or {}
+    sample = f'{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}'
+    return name, 'gauge', help, [sample]
+
+
+def host_of(url: str) -> str:
+    """Host label for a URL (bounded cardinality: one value per site)."""
+    return urlparse(url).hostname or 'unknown'
+
+
+REGISTRY = Registry()
+
+SEARCH_SECONDS = REGISTRY.histogram(
+    'phone_search_duration_seconds', 'Latency of /api/search requests',
+    labels=('sites', 'mode', 'origin')
+)
+SITE_SEARCH_SECONDS = REGISTRY.histogram(
+    'phone_site_search_duration_seconds', 'Time spent searching one site (listing and phone pages)',
+    labels=('site', 'status')
+)
+FETCH_RESPONSES = REGISTRY.counter(
+    'fetch_responses_total', 'Page fetches by host, client and HTTP status ("error" without a response)',
+    labels=('host', 'client', 'status')
+)
+FETCH_BLOCKED = REGISTRY.counter(
+    'fetch_blocked_total', 'Fetches classified as blocked by utils.block_detection, by kind (cloudflare, captcha, access_denied, rate_limit)',
+    labels=('host', 'client', 'kind')
+)
+BROWSER_RESTARTS = REGISTRY.counter(
+    'browser_restarts_total', 'Headless browser contexts recycled and browsers relaunched, by reason (pages, rss, crash)',
+    labels=('scope', 'reason')
+)
+MONGO_WRITE_SECONDS = REGISTRY.histogram(
+    'mongo_write_duration_seconds', 'Latency of MongoDB inserts',
+    labels=('collection',)
+)
+
+
+def _stage_collector():
+    """Expose the crawl stage timings (utils.timing) as one histogram."""
+    name = 'crawl_stage_duration_seconds'
+    timings = timing.get_timings()
+    lines = []
+    for stage, histogram in timings.stage_histograms().items():
+        lines.extend(_histogram_lines(name, ('stage',), (stage,), timing.BUCKETS, histogram['counts'], histogram['total']))
+    return [(name, 'histogram', 'Duration of fetch, parse and storage stages', lines)]
+
+
+REGISTRY.add_collector(_stage_collector)
+
+
+def render() -> str:
+    """Render the process-wide registry."""
+    return REGISTRY.render()
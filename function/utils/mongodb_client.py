@@ -3,10 +3,17 @@ MongoDB client for storing scraped phone data
 """
 
 from pymongo import MongoClient
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime
+import logging
 import os
 
+from models.phone import for_storage, with_flat_specs
+from utils import metrics, timing
+from utils.log import get_logger, sampled
+
+log = get_logger('mongodb')
+
 
 class MongoDBClient:
     """MongoDB client for storing phone scraping results."""
@@ -73,11 +80,12 @@ class MongoDBClient:
                 'timestamp': datetime.utcnow(),
                 'method': method,
                 'total_results': len(phones),
-                'phones': phones,  # Array of phones with source as first field
+                'phones': [for_storage(phone) for phone in phones],  # Array of phones with source as first field
                 'created_at': datetime.utcnow()
             }
             
-            result = self.collection.insert_one(document)
+            with metrics.MONGO_WRITE_SECONDS.time(collection=self.collection.name):
+                result = self.collection.insert_one(document)
             
             print(f"[MONGODB] ✅ Saved {len(phones)} phones to collection")
             print(f"[MONGODB] Document ID: {result.inserted_id}")
@@ -100,20 +108,23 @@ class MongoDBClient:
         Returns:
             Inserted document ID or None if failed
         """
+        url = phone_data.get('url')
         try:
             # Create document with metadata and phone data at same level
-            document = {
-                'query': query,
-                'method': method,
-                'scraped_at': datetime.utcnow(),
-                **phone_data  # Spread phone data fields (includes 'source' as first field)
-            }
-            
-            result = self.collection.insert_one(document)
+            with timing.span('serialize', url):
+                document = {
+                    'query': query,
+                    'method': method,
+                    'scraped_at': datetime.utcnow(),
+                    **for_storage(phone_data)  # Spread phone data fields (includes 'source' as first field)
+                }
+            
+            with timing.span('db_write', url), metrics.MONGO_WRITE_SECONDS.time(collection=self.collection.name):
+                result = self.collection.insert_one(document)
             return str(result.inserted_id)
             
         except Exception as e:
-            print(f"[MONGODB] ❌ Failed to save phone: {e}")
+            sampled(log, logging.ERROR, f'save-phone:{type(e).__name__}', "[MONGODB] ❌ Failed to save phone: %s", e)
             return None
     
     def get_recent_scrapes(self, limit: int = 10) -> List[Dict]:
@@ -175,6 +186,36 @@ class MongoDBClient:
             print(f"[MONGODB] ❌ Search failed: {e}")
             return []
     
+    def iter_phones(self, since: Optional[datetime] = None, projection: Optional[Dict] = None,
+                    collection_name: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Iterate over stored phone documents (one phone per document), oldest first.
+        
+        Documents stored without flat specs (SPEC_STORAGE=detailed) get them
+        derived from detailed_specs.
+        
+        Args:
+            since: Only return phones scraped after this time (for incremental loads)
+            projection: Optional MongoDB projection
+            collection_name: Collection to read (defaults to the current collection)
+            batch_size: Cursor batch size
+            
+        Yields:
+            Phone documents
+        """
+        collection = self.db[collection_name] if collection_name else self.collection
+        query = {'scraped_at': {'$gt': since}} if since else {}
+        cursor = (
+            collection
+            .find(query, projection)
+            .sort('scraped_at', 1)
+            .batch_size(batch_size)
+        )
+        for document in cursor:
+            if '_id' in document:
+                document['_id'] = str(document['_id'])
+            yield with_flat_specs(document)
+    
     def get_collection_stats(self) -> Dict:
         """Get statistics about the collection."""
         try:
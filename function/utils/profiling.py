@@ -0,0 +1,414 @@
+"""
+CPU and memory profiling for crawl runs.
+
+Enabled per run with a switch or an environment variable:
+
+    python scrape_all_makers.py --profile=cpu
+    PROFILE=mem python scrape_by_category.py
+    PROFILE=cpu,mem python github_scraper.py
+    
+    cpu   cProfile, with one profile per timing stage (utils.timing spans),
+          so hotspots are reported separately for parse, normalize,
+          db_write, ... and for code outside any span ("other")
+    mem   tracemalloc: net and peak bytes per stage, allocation sites from
+          snapshot diffs around every PROFILE_MEM_EVERY-th span of each
+          stage, and the largest sites still allocated at the end
+
+When the run finishes, the top PROFILE_TOP entries (default 20) are printed
+per stage. Files are written to PROFILE_OUTPUT (default data/profiles, empty
+to disable):
+
+    <run>_<timestamp>.pstats      merged CPU profile (pstats, snakeviz, gprof2dot)
+    <run>_<timestamp>.collapsed   sampled stacks, one "stage;frame;frame count"
+                                  per line (flamegraph.pl, speedscope)
+    <run>_<timestamp>.mem.json    memory report
+
+Stages are switched on the thread that runs the span, so worker threads
+are profiled too; code outside any span is only profiled on the thread
+that started the session. On Python 3.12+ only one cProfile profiler can
+be active per process: a span that starts while another thread is being
+CPU-profiled runs without CPU profiling, and the report says how many did.
+Memory profiling covers every thread on any version.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from utils import timing
+
+MODES = ('cpu', 'mem')
+
+# Stage name for code outside any timing span
+OTHER = 'other'
+
+_active = None
+_active_lock = threading.Lock()
+
+
+def parse_modes(value: Optional[str]) -> Set[str]:
+    """
+    Parse a profile switch value ("cpu", "mem", "cpu,mem"; empty for none).
+    
+    Raises:
+        ValueError: For an unknown mode
+    """
+    modes = {mode.strip().lower() for mode in (value or '').split(',') if mode.strip()}
+    unknown = modes - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode(s): {', '.join(sorted(unknown))} (use cpu, mem or cpu,mem)")
+    return modes
+
+
+def requested(argv: Optional[List[str]] = None) -> Set[str]:
+    """Profile modes asked for with --profile=<modes> / --profile <modes>, else the PROFILE env var."""
+    argv = sys.argv[1:] if argv is None else argv
+    for index, arg in enumerate(argv):
+        if arg.startswith('--profile='):
+            return parse_modes(arg.split('=', 1)[1])
+        if arg == '--profile':
+            return parse_modes(argv[index + 1] if index + 1 < len(argv) else 'cpu')
+    return parse_modes(os.environ.get('PROFILE'))
+
+
+def _enable(profile: cProfile.Profile) -> bool:
+    """Switch a profiler on; False if another thread's profiler is active (Python 3.12+)."""
+    try:
+        profile.enable()
+        return True
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process: a second
+        # thread's span runs unprofiled while another thread is profiled
+        return False
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of profiled threads into collapsed-stack counts."""
+    
+    def __init__(self, profiler: 'Profiler', interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.profiler = profiler
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, stage in self.profiler.current_stages().items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                key = ';'.join([stage] + stack[::-1])
+                self.counts[key] = self.counts.get(key, 0) + 1
+    
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Profiles a run, attributing CPU time and allocations to timing stages.
+    
+    Installed as the span hook of utils.timing while running; use session()
+    rather than creating one directly.
+    """
+    
+    def __init__(self, run: str, modes: Iterable[str], top: Optional[int] = None,
+                 output_dir: Optional[str] = None, mem_every: Optional[int] = None):
+        self.run = run
+        self.modes = set(modes)
+        self.top = top or int(os.environ.get('PROFILE_TOP', 20))
+        self.output_dir = output_dir if output_dir is not None else os.environ.get('PROFILE_OUTPUT', 'data/profiles')
+        self.mem_every = mem_every or int(os.environ.get('PROFILE_MEM_EVERY', 20))
+        self.started_at = datetime.now()
+        
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # stage -> cProfile.Profile of every thread that ran it
+        self._cpu: Dict[str, List[cProfile.Profile]] = {}
+        # spans that ran without CPU profiling (see _enable)
+        self._cpu_unprofiled = 0
+        # thread id -> innermost stage, read by the stack sampler
+        self._stages_by_thread: Dict[int, str] = {}
+        self._sampler: Optional[_StackSampler] = None
+        # stage -> {'count', 'net', 'peak'}, and stage -> {site: bytes} from sampled spans
+        self._mem: Dict[str, Dict[str, float]] = {}
+        self._mem_sites: Dict[str, Dict[str, int]] = {}
+        self._final_sites: List[Dict] = []
+    
+    # -- stage switching (timing span hook) ---------------------------------
+    
+    def _thread_state(self):
+        state = self._local
+        if not hasattr(state, 'stack'):
+            state.stack = []
+            state.profiles = {}
+        return state
+    
+    def _profile_for(self, state, stage: str) -> cProfile.Profile:
+        profile = state.profiles.get(stage)
+        if profile is None:
+            profile = state.profiles[stage] = cProfile.Profile()
+            with self._lock:
+                self._cpu.setdefault(stage, []).append(profile)
+        return profile
+    
+    def enter(self, stage: str):
+        state = self._thread_state()
+        outer = state.stack[-1] if state.stack else None
+        frame = {'stage': stage, 'profile': None, 'mem': None, 'snapshot': None, 'peak_seen': 0}
+        
+        if 'cpu' in self.modes:
+            if outer is not None and outer['profile'] is not None:
+                outer['profile'].disable()
+            frame['profile'] = self._profile_for(state, stage)
+        
+        if 'mem' in self.modes and tracemalloc.is_tracing():
+            with self._lock:
+                stats = self._mem.setdefault(stage, {'count': 0, 'net': 0, 'peak': 0})
+                stats['count'] += 1
+                sample = stats['count'] == 1 or stats['count'] % self.mem_every == 0
+            if sample:
+                frame['snapshot'] = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            frame['mem'] = tracemalloc.get_traced_memory()[0]
+        
+        state.stack.append(frame)
+        with self._lock:
+            self._stages_by_thread[threading.get_ident()] = stage
+        if frame['profile'] is not None and not _enable(frame['profile']):
+            with self._lock:
+                self._cpu_unprofiled += 1
+    
+    def exit(self, stage: str):
+        state = self._thread_state()
+        if not state.stack or state.stack[-1]['stage'] != stage:
+            return
+        frame = state.stack.pop()
+        outer = state.stack[-1] if state.stack else None
+        
+        if frame['profile'] is not None:
+            frame['profile'].disable()
+        
+        if frame['mem'] is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame['peak_seen'])
+            if outer is not None:
+                # reset_peak() for this span hid the outer span's peak so far
+                outer['peak_seen'] = max(outer['peak_seen'], peak)
+            with self._lock:
+                stats = self._mem[stage]
+                stats['net'] += current - frame['mem']
+                stats['peak'] = max(stats['peak'], peak - frame['mem'])
+            if frame['snapshot'] is not None:
+                self._add_sites(stage, frame['snapshot'], tracemalloc.take_snapshot())
+        
+        with self._lock:
+            if outer is not None:
+                self._stages_by_thread[threading.get_ident()] = outer['stage']
+            else:
+                self._stages_by_thread.pop(threading.get_ident(), None)
+        if outer is not None and outer['profile'] is not None and not _enable(outer['profile']):
+            with self._lock:
+                self._cpu_unprofiled += 1
+    
+    def current_stages(self) -> Dict[int, str]:
+        """Innermost stage of every thread currently inside a span (or the session)."""
+        with self._lock:
+            return dict(self._stages_by_thread)
+    
+    def _add_sites(self, stage: str, before, after):
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+        with self._lock:
+            sites = self._mem_sites.setdefault(stage, {})
+            for stat in diff[:self.top]:
+                if stat.size_diff <= 0:
+                    continue
+                site = str(stat.traceback[0])
+                sites[site] = sites.get(site, 0) + stat.size_diff
+    
+    # -- session ------------------------------------------------------------
+    
+    def start(self):
+        if 'mem' in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(int(os.environ.get('PROFILE_MEM_FRAMES', 1)))
+        if 'cpu' in self.modes and self.output_dir:
+            self._sampler = _StackSampler(self, 1 / float(os.environ.get('PROFILE_SAMPLE_HZ', 100)))
+        timing.get_timings().span_hook = self
+        self.enter(OTHER)
+        if self._sampler is not None:
+            self._sampler.start()
+        print(f"[PROFILE] Profiling {self.run}: {', '.join(sorted(self.modes))}")
+    
+    def stop(self):
+        if self._sampler is not None:
+            self._sampler.stop()
+        # Close spans left open on this thread (an exception unwinding past them)
+        state = self._thread_state()
+        while state.stack:
+            self.exit(state.stack[-1]['stage'])
+        timing.get_timings().span_hook = None
+        if 'mem' in self.modes and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            self._final_sites = [
+                {'site': str(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top]
+            ]
+            tracemalloc.stop()
+    
+    # -- reporting ----------------------------------------------------------
+    
+    def cpu_stats(self) -> Dict[str, pstats.Stats]:
+        """Merged pstats.Stats per stage, busiest stage first."""
+        with self._lock:
+            profiles = {stage: list(items) for stage, items in self._cpu.items()}
+        merged = {}
+        for stage, items in profiles.items():
+            stats = None
+            for profile in items:
+                try:
+                    if stats is None:
+                        stats = pstats.Stats(profile)
+                    else:
+                        stats.add(profile)
+                except TypeError:
+                    # A profile that never recorded a call has no stats
+                    continue
+            if stats is not None:
+                merged[stage] = stats
+        return dict(sorted(merged.items(), key=lambda item: item[1].total_tt, reverse=True))
+    
+    def hotspots(self, stats: pstats.Stats) -> List[Dict]:
+        """Top functions of a stage by own time (tottime)."""
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        return [
+            {'function': pstats.func_std_string(func), 'calls': calls,
+             'tottime_s': round(tottime, 4), 'cumtime_s': round(cumtime, 4)}
+            for func, (_, calls, tottime, cumtime, _) in rows
+        ]
+    
+    def memory_report(self) -> Dict:
+        with self._lock:
+            stages = {stage: dict(stats) for stage, stats in self._mem.items()}
+            sites = {stage: dict(items) for stage, items in self._mem_sites.items()}
+        return {
+            'run': self.run,
+            'sampled_every': self.mem_every,
+            'stages': {
+                stage: {
+                    'count': int(stats['count']),
+                    'net_kb': round(stats['net'] / 1024, 1),
+                    'peak_kb': round(stats['peak'] / 1024, 1),
+                    'sites_kb': {
+                        site: round(size / 1024, 1)
+                        for site, size in sorted(sites.get(stage, {}).items(), key=lambda item: item[1], reverse=True)[:self.top]
+                    },
+                }
+                for stage, stats in sorted(stages.items(), key=lambda item: item[1]['peak'], reverse=True)
+            },
+            'largest_at_end': list(self._final_sites),
+        }
+    
+    def report(self) -> Dict[str, str]:
+        """Print the per-stage report and write the output files; returns {kind: path}."""
+        written = {}
+        base = None
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+            name = re.sub(r'[^\w.-]+', '_', self.run).strip('_') or 'run'
+            base = os.path.join(self.output_dir, f"{name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}")
+        
+        if 'cpu' in self.modes:
+            by_stage = self.cpu_stats()
+            print(f"\n[PROFILE] CPU hotspots by stage (top {self.top} by own time):")
+            for stage, stats in by_stage.items():
+                print(f"  {stage}: {stats.total_tt:.2f}s in {stats.total_calls} calls")
+                for row in self.hotspots(stats):
+                    print(f"    {row['tottime_s']:>9.3f}s {row['cumtime_s']:>9.3f}s {row['calls']:>8}  {row['function']}")
+            if self._cpu_unprofiled:
+                print(f"  {self._cpu_unprofiled} spans ran without CPU profiling: Python 3.12+ allows one "
+                      f"active profiler per process, so concurrent threads are only partly covered")
+            if base and by_stage:
+                stats_list = list(by_stage.values())
+                merged = stats_list[0]
+                for stats in stats_list[1:]:
+                    merged.add(stats)
+                merged.dump_stats(f"{base}.pstats")
+                written['pstats'] = f"{base}.pstats"
+            if base and self._sampler is not None and self._sampler.counts:
+                with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+                    for stack, count in sorted(self._sampler.counts.items()):
+                        f.write(f"{stack} {count}\n")
+                written['collapsed'] = f"{base}.collapsed"
+        
+        if 'mem' in self.modes:
+            memory = self.memory_report()
+            print(f"\n[PROFILE] Memory by stage (allocation sites sampled every {self.mem_every} spans):")
+            for stage, data in memory['stages'].items():
+                print(f"  {stage}: n={data['count']} net={data['net_kb']:.0f}KB peak={data['peak_kb']:.0f}KB")
+                for site, size in data['sites_kb'].items():
+                    print(f"    {size:>10.1f}KB  {site}")
+            print("  still allocated at the end:")
+            for site in memory['largest_at_end']:
+                print(f"    {site['bytes'] / 1024:>10.1f}KB  {site['site']} ({site['blocks']} blocks)")
+            if base:
+                with open(f"{base}.mem.json", 'w', encoding='utf-8') as f:
+                    json.dump(memory, f, indent=2, ensure_ascii=False)
+                written['mem'] = f"{base}.mem.json"
+        
+        for path in written.values():
+            print(f"[SAVED] Profile saved to: {path}")
+        return written
+
+
+@contextmanager
+def session(run: str, modes: Optional[Iterable[str]] = None) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the enclosed block and report when it ends (also when it raises).
+    
+    Args:
+        run: Name used in the report and output file names
+        modes: Profile modes ("cpu", "mem"); None or empty runs unprofiled
+    
+    Yields:
+        The Profiler, or None when profiling is off or a session is already
+        running (an entry point profiling a UniversalSearch that profiles too)
+    """
+    global _active
+    modes = set(modes or ())
+    with _active_lock:
+        if not modes or _active is not None:
+            profiler = None
+        else:
+            profiler = _active = Profiler(run, modes)
+    if profiler is None:
+        yield None
+        return
+    
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        with _active_lock:
+            _active = None
+        profiler.report()
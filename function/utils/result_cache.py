@@ -0,0 +1,184 @@
+"""
+In-memory search result cache with TTL, LRU eviction and stale-while-revalidate.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+def make_cache_key(query: str, sites: Iterable[str], mode: str, max_results: int) -> Tuple:
+    """
+    Build a normalized cache key for a search.
+    
+    Queries differing only in case or whitespace, and site lists differing
+    only in order, map to the same key.
+    """
+    normalized_query = ' '.join(query.lower().split())
+    return (normalized_query, tuple(sorted(set(sites))), mode, int(max_results))
+
+
+class _Entry:
+    """A cached value with its size and freshness timestamps."""
+    
+    __slots__ = ('value', 'size', 'stored_at')
+    
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.stored_at = time.time()
+
+
+class ResultCache:
+    """
+    Thread-safe TTL + LRU cache for search results.
+    
+    - Entries younger than `ttl` are served as fresh hits.
+    - Entries older than `ttl` but younger than `ttl + stale_ttl` are served
+      immediately while a background refresh replaces them.
+    - Concurrent misses for the same key share one computation.
+    - The least recently used entries are evicted once `max_entries` or
+      `max_bytes` (JSON-encoded size) is exceeded.
+    """
+    
+    def __init__(self, ttl: float = 900, stale_ttl: float = 3600,
+                 max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            ttl: Seconds an entry is considered fresh
+            stale_ttl: Extra seconds a stale entry may be served while refreshing
+            max_entries: Maximum number of cached results
+            max_bytes: Approximate memory cap (sum of JSON-encoded entry sizes)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {'hit': 0, 'stale': 0, 'miss': 0, 'coalesced': 0, 'evicted': 0, 'refresh_errors': 0}
+    
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any],
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, str]:
+        """
+        Return the cached value for key, computing it on a miss.
+        
+        Args:
+            key: Cache key (see make_cache_key)
+            compute: Callable producing a JSON-serializable value
+            cacheable: Optional predicate; values it rejects are returned but not stored
+        
+        Returns:
+            Tuple of (value, status) where status is 'hit', 'stale', 'miss' or 'coalesced'
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hit'] += 1
+                    return entry.value, 'hit'
+                if age <= self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['stale'] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        threading.Thread(target=self._refresh, args=(key, compute, cacheable), daemon=True).start()
+                    return entry.value, 'stale'
+                # Too old to serve
+                self._remove(key)
+            
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self._stats['miss'] += 1
+                leader = True
+        
+        if not leader:
+            return future.result(), 'coalesced'
+        
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        
+        self._store(key, value, cacheable)
+        future.set_result(value)
+        return value, 'miss'
+    
+    def invalidate(self, key: Optional[Tuple] = None):
+        """Drop one entry, or all entries if key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+    
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['inflight'] = len(self._inflight)
+        lookups = stats['hit'] + stats['stale'] + stats['miss'] + stats['coalesced']
+        stats['hit_ratio'] = round((stats['hit'] + stats['stale']) / lookups, 4) if lookups else 0.0
+        return stats
+    
+    def _refresh(self, key: Tuple, compute: Callable[[], Any], cacheable: Optional[Callable[[Any], bool]]):
+        """Recompute a stale entry in the background."""
+        with self._lock:
+            future = self._inflight[key]
+        try:
+            value = compute()
+        except Exception as e:
+            print(f"[CACHE] Background refresh failed for {key[0]!r}: {e}")
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._stats['refresh_errors'] += 1
+            future.set_exception(e)
+            return
+        self._store(key, value, cacheable)
+        future.set_result(value)
+    
+    def _store(self, key: Tuple, value: Any, cacheable: Optional[Callable[[Any], bool]] = None):
+        """Insert a value and evict least recently used entries over the limits."""
+        if cacheable is not None and not cacheable(value):
+            with self._lock:
+                self._inflight.pop(key, None)
+            return
+        
+        size = len(json.dumps(value, ensure_ascii=False, default=str))
+        with self._lock:
+            self._inflight.pop(key, None)
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evicted'] += 1
+    
+    def _remove(self, key: Tuple):
+        """Remove an entry (caller holds the lock)."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
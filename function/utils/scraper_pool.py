@@ -0,0 +1,256 @@
+"""
+Process-wide pool of warm UniversalSearch instances.
+Browsers are launched once per worker thread and reused across requests.
+"""
+
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class PoolBusy(Exception):
+    """Raised when the pool's wait queue is full."""
+
+
+class ScraperPool:
+    """
+    Fixed-size pool of scraper workers.
+    
+    Each worker thread owns one UniversalSearch (one headless browser plus
+    HTTP sessions). Playwright's sync API only works on the thread that
+    started it, so instead of handing searchers out, callers submit work
+    that runs on the thread owning the searcher. At most `size` searches run
+    at once; up to `max_queued` more wait in FIFO order.
+    """
+    
+    _STOP = object()
+    # Items iterate() buffers before the worker waits for the caller to catch up
+    ITERATE_BUFFER = 100
+    
+    def __init__(self, size: int = 2, max_queued: int = 50, health_interval: float = 60.0,
+                 searcher_factory: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            size: Number of warm searchers (maximum concurrent searches)
+            max_queued: Maximum number of tasks waiting for a searcher
+            health_interval: Seconds between health checks of idle searchers
+            searcher_factory: Callable creating a searcher (defaults to UniversalSearch)
+        """
+        if searcher_factory is None:
+            from universal_search import UniversalSearch
+            searcher_factory = UniversalSearch
+        
+        self.size = size
+        self.max_queued = max_queued
+        self.health_interval = health_interval
+        self.searcher_factory = searcher_factory
+        
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._queued = 0
+        self._busy = 0
+        self._restarts = 0
+    
+    def start(self):
+        """Start workers and launch their browsers (no-op if already started)."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                thread = threading.Thread(target=self._worker_loop, name=f"scraper-{i + 1}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"[POOL] Started {self.size} scraper workers")
+    
+    def shutdown(self):
+        """Stop workers after the queued tasks finish and close their browsers."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._tasks.put(self._STOP)
+        for thread in threads:
+            thread.join()
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run fn(searcher, *args, **kwargs) on a pooled searcher.
+        
+        Returns:
+            Future resolving to fn's return value
+        
+        Raises:
+            PoolBusy: If max_queued tasks are already waiting
+        """
+        self.start()
+        
+        with self._lock:
+            if self._queued >= self.max_queued:
+                raise PoolBusy(f"Too many queued searches (limit {self.max_queued})")
+            self._queued += 1
+        
+        future = Future()
+        self._tasks.put((future, fn, args, kwargs))
+        return future
+    
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run fn(searcher, *args, **kwargs) on a pooled searcher and wait for the result."""
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+    
+    def iterate(self, fn: Callable, *args, **kwargs) -> Iterator:
+        """
+        Run a generator function fn(searcher, ...) on a pooled searcher and relay its items.
+        
+        Items are handed over as soon as the worker produces them. If the
+        caller stops iterating early (e.g. a client disconnects) the worker
+        closes the generator and the searcher goes back to the pool. The
+        same happens when the returned iterator is dropped without ever
+        being started. At most ITERATE_BUFFER items wait for the caller.
+        """
+        items = queue.Queue(maxsize=self.ITERATE_BUFFER)
+        cancelled = threading.Event()
+        done = object()
+        
+        def put(item) -> bool:
+            # Wait for room, but give up once the caller has gone away
+            while not cancelled.is_set():
+                try:
+                    items.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def relay(searcher):
+            generator = fn(searcher, *args, **kwargs)
+            try:
+                for item in generator:
+                    if not put(item):
+                        break
+            finally:
+                generator.close()
+        
+        # Submit eagerly so PoolBusy is raised here rather than on first next()
+        future = self.submit(relay)
+        future.add_done_callback(lambda _: put(done))
+        iterator = self._relay(future, items, done, cancelled)
+        # An unstarted generator never runs its finally: cancel when it is collected
+        weakref.finalize(iterator, cancelled.set)
+        return iterator
+    
+    @staticmethod
+    def _relay(future: Future, items: queue.Queue, done: object, cancelled: threading.Event) -> Iterator:
+        """Yield items from a worker until it finishes."""
+        try:
+            while True:
+                item = items.get()
+                if item is done:
+                    break
+                yield item
+            # Re-raise any error from the worker
+            future.result()
+        finally:
+            cancelled.set()
+    
+    def stats(self) -> Dict:
+        """Return pool utilization counters."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'busy': self._busy,
+                'idle': len(self._threads) - self._busy,
+                'queued': self._queued,
+                'restarts': self._restarts
+            }
+    
+    def _worker_loop(self):
+        """Worker thread: own one searcher and run tasks on it."""
+        searcher = self._create_searcher()
+        
+        while True:
+            try:
+                task = self._tasks.get(timeout=self.health_interval)
+            except queue.Empty:
+                # Idle: keep the browser healthy so the next request starts warm
+                searcher = self._ensure_healthy(searcher)
+                continue
+            
+            if task is self._STOP:
+                self._close_searcher(searcher)
+                return
+            
+            future, fn, args, kwargs = task
+            with self._lock:
+                self._queued -= 1
+                self._busy += 1
+            
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                searcher = self._ensure_healthy(searcher)
+                if searcher is None:
+                    future.set_exception(RuntimeError("Search backend unavailable (browser failed to start)"))
+                    continue
+                try:
+                    future.set_result(fn(searcher, *args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+    
+    def _create_searcher(self):
+        """Create a searcher, returning None if the browser cannot start."""
+        try:
+            return self.searcher_factory()
+        except Exception as e:
+            print(f"[POOL] Failed to start searcher in {threading.current_thread().name}: {e}")
+            return None
+    
+    def _ensure_healthy(self, searcher):
+        """Return a working searcher, replacing it if its browser has died."""
+        if searcher is not None:
+            is_healthy = getattr(searcher, 'is_healthy', None)
+            if is_healthy is None or is_healthy():
+                return searcher
+            print(f"[POOL] Searcher in {threading.current_thread().name} is unhealthy, restarting")
+            self._close_searcher(searcher)
+            with self._lock:
+                self._restarts += 1
+        
+        started = time.time()
+        searcher = self._create_searcher()
+        if searcher is not None:
+            print(f"[POOL] Searcher ready in {time.time() - started:.1f}s")
+        return searcher
+    
+    def _close_searcher(self, searcher):
+        """Close a searcher, ignoring errors from an already-dead browser."""
+        if searcher is None or not hasattr(searcher, 'close'):
+            return
+        try:
+            searcher.close()
+        except Exception as e:
+            print(f"[POOL] Error closing searcher: {e}")
+
+
+_default_pool: Optional[ScraperPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_scraper_pool(size: int = 2, max_queued: int = 50) -> ScraperPool:
+    """
+    Return the process-wide scraper pool, creating it on first use.
+    
+    Args:
+        size: Pool size used if the pool does not exist yet
+        max_queued: Queue limit used if the pool does not exist yet
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ScraperPool(size=size, max_queued=max_queued)
+        return _default_pool
@@ -0,0 +1,122 @@
+"""
+Group flat spec keys ("RAM", "Selfie camera", "Charging") into the nested
+detailed_specs categories.
+
+The keyword table is compiled once into a single regex, and the categories
+of every spec key seen are memoized, so categorizing a phone is one pass
+over its specs with a dict lookup per key.
+"""
+import re
+from typing import Dict, List, Tuple
+
+# Category -> keywords matched case-insensitively anywhere in the spec key.
+# A key matching several categories is listed under each of them.
+SPEC_CATEGORIES = {
+    "Display": ['Display', 'Screen', 'Resolution', 'Size', 'Type', 'Protection'],
+    "Platform": ['OS', 'Chipset', 'CPU', 'GPU', 'Platform'],
+    "Memory": ['RAM', 'Memory', 'Internal', 'Storage', 'Card slot'],
+    "Main Camera": ['Main camera', 'Main Camera', 'Camera', 'Video'],
+    "Selfie Camera": ['Selfie camera', 'Selfie Camera', 'Front camera'],
+    "Sound": ['Loudspeaker', '3.5mm jack', 'Sound'],
+    "Comms": ['WLAN', 'Bluetooth', 'GPS', 'NFC', 'Radio', 'USB'],
+    "Battery": ['Battery', 'Charging', 'Type'],
+    "Misc": ['Colors', 'Models', 'SAR', 'Price'],
+}
+
+# Title of the category collecting keys that match no keyword
+GENERAL_CATEGORY = "General"
+
+# The memo is cleared when it grows past this many keys (some sites use free text as keys)
+MEMO_MAX_KEYS = 4096
+
+
+class SpecCategorizer:
+    """
+    Compiled spec key -> categories classifier.
+    
+    Keywords are combined into one lookahead regex, so a single scan
+    reports every keyword occurrence, overlapping ones included
+    ("selfie camera" is both Selfie Camera and Main Camera).
+    """
+    
+    def __init__(self, categories: Dict[str, List[str]] = SPEC_CATEGORIES):
+        """
+        Args:
+            categories: Category title -> keywords, in output order
+        """
+        self.titles = list(categories)
+        
+        keyword_categories: Dict[str, set] = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword.lower(), set()).add(index)
+        
+        # Only one alternative is reported per position, so try longer keywords
+        # first and let each one also carry the categories of its prefixes
+        keywords = sorted(keyword_categories, key=len, reverse=True)
+        self._keyword_categories = {
+            keyword: frozenset().union(*(
+                keyword_categories[other] for other in keywords if keyword.startswith(other)
+            ))
+            for keyword in keywords
+        }
+        self._pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(keyword) for keyword in keywords) + '))',
+            re.IGNORECASE
+        )
+        self._memo: Dict[str, Tuple[int, ...]] = {}
+    
+    def categories_for(self, spec_key: str) -> Tuple[int, ...]:
+        """
+        Return the indexes (into self.titles) of the categories a spec key belongs to.
+        
+        An empty tuple means the key belongs to the General category.
+        """
+        indexes = self._memo.get(spec_key)
+        if indexes is None:
+            found = set()
+            for match in self._pattern.finditer(spec_key):
+                found |= self._keyword_categories[match.group(1).lower()]
+            indexes = tuple(sorted(found))
+            if len(self._memo) >= MEMO_MAX_KEYS:
+                self._memo.clear()
+            self._memo[spec_key] = indexes
+        return indexes
+    
+    def categorize(self, flat_specs: Dict[str, str]) -> List[Dict]:
+        """
+        Convert flat specs to the nested detailed format in a single pass.
+        
+        Args:
+            flat_specs: Dictionary of spec_name: spec_value
+        
+        Returns:
+            List of {"title", "details": [{"property", "value"}]} in category
+            order, followed by "General" for keys matching no category
+        """
+        buckets: List[List[Dict]] = [[] for _ in self.titles]
+        general = []
+        
+        for spec_key, spec_value in flat_specs.items():
+            detail = {"property": spec_key, "value": spec_value}
+            indexes = self.categories_for(spec_key)
+            if not indexes:
+                general.append(detail)
+            for index in indexes:
+                buckets[index].append(detail if index == indexes[0] else dict(detail))
+        
+        detailed_specs = [
+            {"title": title, "details": details}
+            for title, details in zip(self.titles, buckets) if details
+        ]
+        if general:
+            detailed_specs.append({"title": GENERAL_CATEGORY, "details": general})
+        return detailed_specs
+
+
+_default_categorizer = SpecCategorizer()
+
+
+def categorize_specs(flat_specs: Dict[str, str]) -> List[Dict]:
+    """Categorize flat specs with the shared default categorizer (see SpecCategorizer.categorize)."""
+    return _default_categorizer.categorize(flat_specs or {})
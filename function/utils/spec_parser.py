@@ -0,0 +1,233 @@
+"""
+Parse raw spec strings into typed, comparable fields.
+
+Scrapers store specs as free text ("128GB 8GB RAM, 256GB 12GB RAM",
+"Li-Ion 5000 mAh, non-removable"). This module extracts the numeric and
+categorical values the facet, similarity and comparison features work on.
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Numeric fields, in a stable order (used as column order by callers)
+NUMERIC_FIELDS = (
+    'price_inr', 'price_usd', 'price_eur',
+    'display_in', 'battery_mah', 'ram_gb', 'storage_gb',
+    'main_camera_mp', 'weight_g', 'year',
+)
+
+CATEGORICAL_FIELDS = ('brand', 'os', 'chipset_vendor', 'year', 'source')
+
+CURRENCY_SYMBOLS = {
+    '₹': 'inr',
+    'rs': 'inr',
+    'inr': 'inr',
+    '$': 'usd',
+    'usd': 'usd',
+    '€': 'eur',
+    'eur': 'eur',
+}
+
+CHIPSET_VENDORS = (
+    ('snapdragon', 'qualcomm'),
+    ('qualcomm', 'qualcomm'),
+    ('dimensity', 'mediatek'),
+    ('helio', 'mediatek'),
+    ('mediatek', 'mediatek'),
+    ('exynos', 'samsung'),
+    ('tensor', 'google'),
+    ('apple', 'apple'),
+    ('bionic', 'apple'),
+    ('kirin', 'hisilicon'),
+    ('unisoc', 'unisoc'),
+    ('spreadtrum', 'unisoc'),
+)
+
+_NUMBER = r'(\d+(?:[.,]\d+)*)'
+_PRICE_RE = re.compile(r'(₹|\$|€|\brs\.?|\binr\b|\busd\b|\beur\b)\s*' + _NUMBER + r'|' + _NUMBER + r'\s*(inr|usd|eur)\b', re.I)
+_STORAGE_RE = re.compile(r'(\d+)\s*(GB|TB)(?!\s*RAM)', re.I)
+_RAM_RE = re.compile(r'(\d+(?:\.\d+)?)\s*GB\s*RAM', re.I)
+_GB_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(GB|TB|MB)', re.I)
+_MAH_RE = re.compile(r'(\d{3,5})\s*mAh', re.I)
+_INCHES_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:inches|inch|in\b|")', re.I)
+_MP_RE = re.compile(r'(\d+(?:\.\d+)?)\s*MP', re.I)
+_GRAMS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*g\b', re.I)
+_YEAR_RE = re.compile(r'\b(19[89]\d|20\d\d)\b')
+
+
+def _to_float(text: str) -> Optional[float]:
+    """Parse "1,29,999" or "1,299.99" as a number."""
+    try:
+        return float(text.replace(',', ''))
+    except ValueError:
+        return None
+
+
+def iter_spec_values(phone: Dict) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield (category, property, value) for every spec of a phone dictionary.
+    
+    Uses detailed_specs when present, since flat specs lose repeated
+    property names (e.g. "Type" under both Display and Battery).
+    Categories and properties are lowercased.
+    """
+    detailed = phone.get('detailed_specs') or []
+    if detailed:
+        for category in detailed:
+            title = (category.get('title') or '').lower()
+            for detail in category.get('details') or []:
+                yield title, (detail.get('property') or '').lower(), detail.get('value') or ''
+        return
+    
+    for key, value in (phone.get('specs') or {}).items():
+        yield '', key.lower(), value or ''
+
+
+def parse_prices(*texts: Optional[str]) -> Dict[str, float]:
+    """
+    Extract prices per currency from price strings.
+    
+    Args:
+        texts: Strings like "$ 1,299.99 / € 1,119.00 / ₹ 1,29,999" or "About 200 EUR"
+    
+    Returns:
+        Dictionary like {'price_usd': 1299.99, 'price_inr': 129999.0}
+    """
+    prices = {}
+    for text in texts:
+        if not text:
+            continue
+        for match in _PRICE_RE.finditer(text):
+            symbol = (match.group(1) or match.group(4) or '').lower().rstrip('.')
+            amount = _to_float(match.group(2) or match.group(3))
+            currency = CURRENCY_SYMBOLS.get(symbol)
+            if currency and amount:
+                prices.setdefault(f'price_{currency}', amount)
+    return prices
+
+
+def _gigabytes(amount: str, unit: str) -> float:
+    """Convert an amount in MB/GB/TB to GB."""
+    value = float(amount)
+    unit = unit.upper()
+    if unit == 'TB':
+        return value * 1024
+    if unit == 'MB':
+        return value / 1024
+    return value
+
+
+def chipset_vendor(chipset: str) -> Optional[str]:
+    """Map a chipset description to its vendor ("Snapdragon 8 Gen 3" -> "qualcomm")."""
+    text = chipset.lower()
+    for keyword, vendor in CHIPSET_VENDORS:
+        if keyword in text:
+            return vendor
+    return None
+
+
+_IOS_RE = re.compile(r'\bios\b')
+
+
+def os_family(os_text: str) -> Optional[str]:
+    """Map an OS description to a family ("Android 14, One UI 6.1" -> "android")."""
+    text = os_text.lower()
+    if not text:
+        return None
+    if 'harmony' in text:
+        return 'harmonyos'
+    if 'android' in text:
+        return 'android'
+    # Whole word only: "HiOS" (Tecno/Infinix) and "KaiOS" are not iOS
+    if _IOS_RE.search(text):
+        return 'ios'
+    return 'other'
+
+
+def parse_phone_specs(phone: Dict) -> Dict:
+    """
+    Extract typed fields from a phone dictionary.
+    
+    Args:
+        phone: Phone dictionary (Phone.to_dict() or a stored document)
+    
+    Returns:
+        Dictionary with NUMERIC_FIELDS as floats and brand/os/chipset_vendor/source
+        as lowercase strings. Fields that could not be parsed are omitted.
+    """
+    parsed: Dict = {}
+    price_texts: List[str] = [phone.get('price') or '']
+    ram: List[float] = []
+    storage: List[float] = []
+    cameras: List[float] = []
+    
+    for category, prop, value in iter_spec_values(phone):
+        if not value:
+            continue
+        
+        if prop == 'price' or 'price' in category:
+            price_texts.append(value)
+        
+        elif prop == 'internal' or (category == 'memory' and 'card' not in prop):
+            # GSMArena: "128GB 8GB RAM, 256GB 12GB RAM"
+            ram.extend(float(x) for x in _RAM_RE.findall(value))
+            storage.extend(_gigabytes(amount, unit) for amount, unit in _STORAGE_RE.findall(value))
+        
+        elif prop == 'ram':
+            ram.extend(_gigabytes(amount, unit) for amount, unit in _GB_RE.findall(value))
+        
+        elif 'storage' in prop or 'internal memory' in prop or prop == 'rom':
+            storage.extend(_gigabytes(amount, unit) for amount, unit in _GB_RE.findall(value))
+        
+        elif 'mah' in value.lower() and ('battery' in category or 'battery' in prop or prop in ('type', 'capacity')):
+            match = _MAH_RE.search(value)
+            if match:
+                parsed.setdefault('battery_mah', float(match.group(1)))
+        
+        elif prop in ('size', 'display size', 'screen size') or (prop == 'display' and '"' in value):
+            match = _INCHES_RE.search(value)
+            if match:
+                parsed.setdefault('display_in', float(match.group(1)))
+        
+        elif 'main camera' in category or 'rear camera' in prop or 'main camera' in prop or (
+                'camera' in prop and 'front' not in prop and 'selfie' not in prop and 'selfie' not in category):
+            cameras.extend(float(x) for x in _MP_RE.findall(value.split(',')[0]))
+        
+        elif prop == 'weight':
+            match = _GRAMS_RE.search(value)
+            if match:
+                parsed.setdefault('weight_g', float(match.group(1)))
+        
+        elif prop in ('announced', 'launch date', 'release date', 'launched'):
+            match = _YEAR_RE.search(value)
+            if match:
+                parsed.setdefault('year', float(match.group(1)))
+        
+        elif prop in ('os', 'operating system'):
+            family = os_family(value)
+            if family:
+                parsed.setdefault('os', family)
+        
+        elif prop in ('chipset', 'processor', 'soc'):
+            vendor = chipset_vendor(value)
+            if vendor:
+                parsed.setdefault('chipset_vendor', vendor)
+    
+    parsed.update({field: amount for field, amount in parse_prices(*price_texts).items()})
+    if ram:
+        parsed['ram_gb'] = max(ram)
+    if storage:
+        parsed['storage_gb'] = max(storage)
+    if cameras:
+        parsed['main_camera_mp'] = max(cameras)
+    
+    if 'year' not in parsed:
+        match = _YEAR_RE.search(phone.get('launch_year') or phone.get('launch_date') or '')
+        if match:
+            parsed['year'] = float(match.group(1))
+    
+    if phone.get('brand'):
+        parsed['brand'] = phone['brand'].strip().lower()
+    if phone.get('source'):
+        parsed['source'] = phone['source'].strip().lower()
+    
+    return parsed
@@ -0,0 +1,173 @@
+"""
+Persisted Playwright storage state (cookies and localStorage) per site.
+
+Challenge and consent flows leave cookies (e.g. cf_clearance) that let
+later visits through. Saving them lets every new browser context, pooled
+worker and later run start with them instead of paying for the challenge
+again:
+
+    BROWSER_STATE_DIR=data/browser_state   one JSON file per site (empty disables)
+    BROWSER_STATE_TTL_HOURS=12             files older than this are ignored
+
+A site is the last two labels of the host name (www.gsmarena.com and
+m.gsmarena.com share gsmarena.com). Files are replaced atomically, so
+worker processes can share a directory; the newest write of a site wins.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.log import get_logger
+
+log = get_logger('storage_state')
+
+_IP_RE = re.compile(r'^[\d.]+$|:')
+
+
+def site_of(host: str) -> str:
+    """Site key of a host or cookie domain ('.www.gsmarena.com' -> 'gsmarena.com')."""
+    host = (host or '').lstrip('.').lower()
+    if not host or _IP_RE.search(host) or host.count('.') < 1:
+        return host or 'unknown'
+    return '.'.join(host.split('.')[-2:])
+
+
+class StorageStateStore:
+    """
+    Directory of per-site storage state files.
+    
+    load() merges the fresh files into one Playwright storage_state dict for
+    BrowserContext(storage_state=...); save() splits a context's state by
+    site and writes one file per site. Parsed files are cached by mtime, so
+    loading for every new context is cheap.
+    """
+    
+    def __init__(self, directory: str, ttl_hours: float = 12):
+        """
+        Args:
+            directory: Directory holding <site>.json files
+            ttl_hours: Age after which a site's saved state is ignored
+        """
+        self.directory = directory
+        self.ttl = ttl_hours * 3600
+        self._cache: Dict[str, tuple] = {}  # path -> (mtime, state)
+        self._lock = threading.Lock()
+    
+    def _path(self, site: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^\w.-]+', '_', site) + '.json')
+    
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("⚠️  Ignoring unreadable storage state %s: %s", path, e)
+            return None
+        with self._lock:
+            self._cache[path] = (mtime, state)
+        return state
+    
+    def load(self, sites: Optional[List[str]] = None) -> Dict:
+        """
+        Merged storage state of the fresh sites, without expired cookies.
+        
+        Args:
+            sites: Site keys to load (default: every saved site)
+        
+        Returns:
+            {'cookies': [...], 'origins': [...]} (empty lists when nothing is saved)
+        """
+        merged = {'cookies': [], 'origins': []}
+        if sites is None:
+            try:
+                names = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+            except OSError:
+                return merged
+            paths = [os.path.join(self.directory, name) for name in names]
+        else:
+            paths = [self._path(site) for site in sites]
+        
+        now = time.time()
+        for path in sorted(paths):
+            state = self._read(path)
+            if not state or now - state.get('saved_at', 0) > self.ttl:
+                continue
+            # Session cookies have expires == -1
+            merged['cookies'].extend(
+                cookie for cookie in state.get('cookies', [])
+                if cookie.get('expires', -1) in (-1, None) or cookie['expires'] > now
+            )
+            merged['origins'].extend(state.get('origins', []))
+        return merged
+    
+    def save(self, state: Dict, sites: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Write a context's storage state, one file per site.
+        
+        Args:
+            state: Result of BrowserContext.storage_state()
+            sites: Only write these site keys (default: all). Pass the sites
+                visited since the last save, so state a context merely loaded
+                does not get a new timestamp and outlive its TTL.
+        
+        Returns:
+            Site keys written
+        """
+        by_site: Dict[str, Dict] = {}
+        for cookie in state.get('cookies', []):
+            site = site_of(cookie.get('domain', ''))
+            by_site.setdefault(site, {'cookies': [], 'origins': []})['cookies'].append(cookie)
+        for origin in state.get('origins', []):
+            host = re.sub(r'^\w+://', '', origin.get('origin', '')).split('/')[0].split(':')[0]
+            by_site.setdefault(site_of(host), {'cookies': [], 'origins': []})['origins'].append(origin)
+        
+        if sites is not None:
+            sites = set(sites)
+            by_site = {site: site_state for site, site_state in by_site.items() if site in sites}
+        
+        os.makedirs(self.directory, exist_ok=True)
+        saved_at = time.time()
+        for site, site_state in by_site.items():
+            site_state['saved_at'] = saved_at
+            path = self._path(site)
+            # Write then rename so readers in other processes never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(site_state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        return sorted(by_site)
+    
+    def clear(self, site: str):
+        """Forget a site's saved state (e.g. when it keeps getting challenged)."""
+        try:
+            os.remove(self._path(site))
+        except OSError:
+            pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[StorageStateStore]:
+    """Process-wide store from BROWSER_STATE_DIR / BROWSER_STATE_TTL_HOURS, or None when disabled."""
+    global _store
+    directory = os.environ.get('BROWSER_STATE_DIR', 'data/browser_state')
+    if not directory:
+        return None
+    with _store_lock:
+        if _store is None or _store.directory != directory:
+            _store = StorageStateStore(directory, float(os.environ.get('BROWSER_STATE_TTL_HOURS', 12)))
+        return _store
@@ -0,0 +1,219 @@
+"""
+Per-stage timing spans for crawl runs.
+
+Fetch, parse and storage code wraps each stage in a span:
+
+    with span('parse', url):
+        soup = BeautifulSoup(html, 'lxml')
+
+Durations are kept per URL and aggregated per stage into a histogram, so
+a finished run can report where its time went (write_summary()).
+
+Stages recorded by the shared code:
+    dns, connect       - from the browser's network timing of the main request
+    navigation         - page.goto() until DOMContentLoaded
+    settle             - fixed wait for scripts after navigation
+    content            - page.content()
+    request            - HTTPClient GET (connection setup included)
+    parse              - building the BeautifulSoup tree
+    normalize          - extracting fields and specs into a Phone
+    serialize          - Phone / document to dict
+    db_write           - MongoDB insert
+    delay, backoff     - politeness sleeps and rate-limit cooldowns
+    recycle            - browser context recycling and relaunches (watchdog)
+"""
+
+import bisect
+import json
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Histogram bucket upper bounds in seconds (the last bucket is +Inf)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Bounds for long-lived processes (web_app.py): raw samples kept per stage
+# (a uniform reservoir once full) and URLs with a per-stage breakdown
+MAX_SAMPLES = 100_000
+MAX_URLS = 50_000
+
+
+class StageHistogram:
+    """Duration histogram of one stage, with percentiles from (a reservoir of) the raw samples."""
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.samples: List[float] = []
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+    
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile in seconds (0 when empty)."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+    
+    def summary(self) -> Dict:
+        count = self.count
+        return {
+            'count': count,
+            'total_s': round(self.total, 3),
+            'mean_ms': round(self.total / count * 1000, 2) if count else 0,
+            'p50_ms': round(self.percentile(50) * 1000, 2),
+            'p95_ms': round(self.percentile(95) * 1000, 2),
+            'p99_ms': round(self.percentile(99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2),
+            'buckets': {
+                ('+Inf' if index == len(BUCKETS) else f'le_{BUCKETS[index]}'): n
+                for index, n in enumerate(self.counts) if n
+            },
+        }
+
+
+class RunTimings:
+    """Thread-safe store of stage durations, per URL and aggregated per stage."""
+    
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, StageHistogram] = {}
+        self._urls: Dict[str, Dict[str, float]] = {}
+        # Object with enter(stage) / exit(stage), told about every span (utils.profiling)
+        self.span_hook = None
+    
+    def record(self, stage: str, seconds: float, url: Optional[str] = None):
+        """
+        Add one duration.
+        
+        Args:
+            stage: Stage name (see module docstring)
+            seconds: Duration in seconds
+            url: URL the work was done for (None for run-level work)
+        """
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = StageHistogram()
+            histogram.observe(seconds)
+            if url and (url in self._urls or len(self._urls) < MAX_URLS):
+                stages = self._urls.setdefault(url, {})
+                stages[stage] = stages.get(stage, 0.0) + seconds
+    
+    @contextmanager
+    def span(self, stage: str, url: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as one occurrence of `stage` (recorded even if it raises)."""
+        hook = self.span_hook
+        if hook is not None:
+            hook.enter(stage)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, url)
+            if hook is not None:
+                hook.exit(stage)
+    
+    def stage_histograms(self) -> Dict[str, Dict]:
+        """Per-stage bucket counts (non-cumulative, +Inf last) and total seconds."""
+        with self._lock:
+            return {
+                stage: {'counts': list(histogram.counts), 'total': histogram.total}
+                for stage, histogram in self._stages.items()
+            }
+    
+    def stage_summaries(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self._stages.items()}
+    
+    def summary(self, run: str = '', slowest: int = 20, extra: Optional[Dict] = None) -> Dict:
+        """
+        Build the run summary.
+        
+        Args:
+            run: Name of the run (script)
+            slowest: Number of slowest URLs to list with their stage breakdown
+            extra: Additional fields (counts, configuration) to include
+        
+        Returns:
+            Dictionary with wall time, per-stage histograms and the slowest URLs
+        """
+        stages = self.stage_summaries()
+        wall = time.time() - self.started
+        with self._lock:
+            urls = sorted(self._urls.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        
+        return {
+            'run': run,
+            'started_at': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'wall_s': round(wall, 3),
+            'urls': len(urls),
+            **(extra or {}),
+            'stages': dict(sorted(stages.items(), key=lambda item: item[1]['total_s'], reverse=True)),
+            'share_of_wall': {
+                stage: round(data['total_s'] / wall, 4) if wall else 0 for stage, data in stages.items()
+            },
+            'slowest_urls': [
+                {'url': url, 'total_ms': round(sum(times.values()) * 1000, 1),
+                 'stages_ms': {stage: round(seconds * 1000, 1) for stage, seconds in times.items()}}
+                for url, times in urls[:slowest]
+            ],
+        }
+    
+    def write_summary(self, path: str, run: str = '', extra: Optional[Dict] = None) -> Dict:
+        """Write summary() to a JSON file, print a per-stage table and return the summary."""
+        summary = self.summary(run, extra=extra)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        
+        print(f"\n[TIMING] Where the {summary['wall_s']:.0f}s went:")
+        for stage, data in summary['stages'].items():
+            print(f"  {stage:<11} {data['total_s']:>10.1f}s {summary['share_of_wall'][stage]:>6.1%}  "
+                  f"n={data['count']:<6} p50={data['p50_ms']:.0f}ms p95={data['p95_ms']:.0f}ms")
+        print(f"[SAVED] Timing summary saved to: {path}")
+        return summary
+
+
+_timings = RunTimings()
+
+
+def get_timings() -> RunTimings:
+    """Return the process-wide timings of the current run."""
+    return _timings
+
+
+def span(stage: str, url: Optional[str] = None):
+    """Time a block on the process-wide timings (see RunTimings.span)."""
+    return _timings.span(stage, url)
+
+
+def record(stage: str, seconds: float, url: Optional[str] = None):
+    """Record a duration on the process-wide timings (see RunTimings.record)."""
+    _timings.record(stage, seconds, url)
+
+
+def sleep(seconds: float, stage: str = 'delay', url: Optional[str] = None):
+    """time.sleep() that is recorded as a stage."""
+    with _timings.span(stage, url):
+        time.sleep(seconds)
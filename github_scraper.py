@@ -17,6 +17,8 @@ sys.path.insert(0, os.path.join(current_dir, 'function'))
 
 from universal_search import UniversalSearch
 from utils.mongodb_client import MongoDBClient
+from utils import profiling, timing
+from models.phone import for_storage
 
 
 def fetch_proxies_from_appwrite():
@@ -150,13 +152,14 @@ def main():
         phones = gsmarena_data.get('phones', [])
         
         for phone in phones:
-            phone_dict = phone.to_dict() if hasattr(phone, 'to_dict') else phone
-            
-            # Add source field at the beginning
-            organized_phone = {
-                'source': 'GSMArena',
-                **phone_dict  # Spread all existing phone data
-            }
+            with timing.span('serialize', getattr(phone, 'url', None)):
+                phone_dict = phone.to_dict() if hasattr(phone, 'to_dict') else phone
+                
+                # Add source field at the beginning
+                organized_phone = {
+                    'source': 'GSMArena',
+                    **for_storage(phone_dict)  # Spread all existing phone data (flat specs dropped if SPEC_STORAGE=detailed)
+                }
             
             results_dict.append(organized_phone)
         
@@ -195,7 +198,8 @@ def main():
             if mongo_doc_ids:
                 json_data['mongodb_ids'] = mongo_doc_ids
             
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+            with timing.span('serialize'):
+                json.dump(json_data, f, indent=2, ensure_ascii=False)
         
         print("\n" + "=" * 60)
         print("SCRAPING COMPLETE")
@@ -231,6 +235,12 @@ def main():
             except Exception as e:
                 print(f"[MONGODB] ⚠️  Could not fetch stats: {e}")
         
+        timing.get_timings().write_summary(
+            f"data/timings_github_scrape_{timestamp}.json",
+            run='github_scraper',
+            extra={'query': search_query, 'phones_scraped': len(results_dict)}
+        )
+        
         return 0
     
     except Exception as e:
@@ -241,4 +251,6 @@ def main():
 
 
 if __name__ == '__main__':
-    sys.exit(main())
+    with profiling.session('github_scraper', profiling.requested()):
+        exit_code = main()
+    sys.exit(exit_code)
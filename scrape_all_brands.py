@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.join(current_dir, 'function'))
 
 from universal_search import UniversalSearch
 from utils.mongodb_client import MongoDBClient
+from utils import profiling
 
 
 # All major phone brands to scrape
@@ -186,4 +187,6 @@ def main():
 
 
 if __name__ == '__main__':
-    sys.exit(main())
+    with profiling.session('scrape_all_brands', profiling.requested()):
+        exit_code = main()
+    sys.exit(exit_code)
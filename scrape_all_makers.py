@@ -3,9 +3,9 @@ Scrape ALL phone brands from GSMArena makers page and their phones
 Dynamically discovers all brands from https://www.gsmarena.com/makers.php3
 """
 
+import logging
 import os
 import sys
-import time
 from datetime import datetime
 from bs4 import BeautifulSoup
 
@@ -15,13 +15,17 @@ sys.path.insert(0, os.path.join(current_dir, 'function'))
 
 from utils.browser_client import HeadlessBrowserClient
 from utils.mongodb_client import MongoDBClient
+from utils import profiling, timing
+from utils.log import Progress, get_logger, sampled
 from scrapers.gsmarena import GSMArenaScraper
 
+log = get_logger('all_makers')
+
 
 class AllBrandsScraper:
     """Scrape all brands dynamically from GSMArena."""
     
-    MAKERS_URL = "https://www.gsmarena.com/makers.php3"
+    MAKERS_URL = f"{GSMArenaScraper.BASE_URL}/makers.php3"
     
     def __init__(self):
         self.browser = HeadlessBrowserClient()
@@ -30,7 +34,7 @@ class AllBrandsScraper:
         self.mongo_client = MongoDBClient()
         # Use different collection for all makers scraping
         self.mongo_client.collection = self.mongo_client.db["phone_all_makers"]
-        print(f"[MONGODB] Using collection: phone_all_makers")
+        log.info("[MONGODB] Using collection: phone_all_makers")
     
     def get_all_brands(self):
         """
@@ -39,14 +43,15 @@ class AllBrandsScraper:
         Returns:
             List of tuples: [(brand_name, brand_url, device_count), ...]
         """
-        print(f"🔍 Fetching all brands from: {self.MAKERS_URL}")
+        log.info("🔍 Fetching all brands from: %s", self.MAKERS_URL)
         
         response = self.browser.get(self.MAKERS_URL)
         if not response:
-            print("❌ Failed to load makers page")
+            log.error("❌ Failed to load makers page")
             return []
         
-        soup = BeautifulSoup(response.text, 'lxml')
+        with timing.span('parse', self.MAKERS_URL):
+            soup = BeautifulSoup(response.text, 'lxml')
         
         # Find all brand links in the makers table
         brands = []
@@ -67,10 +72,10 @@ class AllBrandsScraper:
                 if match:
                     device_count = int(match.group(1))
                 
-                full_url = f"https://www.gsmarena.com/{brand_url}"
+                full_url = f"{GSMArenaScraper.BASE_URL}/{brand_url}"
                 brands.append((brand_name, full_url, device_count))
         
-        print(f"✅ Found {len(brands)} brands")
+        log.info("✅ Found %s brands", len(brands))
         return brands
     
     def get_phones_from_brand(self, brand_url: str, max_results: int = 0):
@@ -95,44 +100,45 @@ class AllBrandsScraper:
                 # GSMArena uses &sName=brandname.php3 format, need to add iPage
                 page_url = f"{brand_url}&iPage={page_num}"
             
-            print(f"   📄 Page {page_num}: {page_url}")
+            log.debug("   📄 Page %s: %s", page_num, page_url)
             
             response = self.browser.get(page_url)
             if not response:
-                print(f"   ❌ Failed to load page {page_num}")
+                log.warning("   ❌ Failed to load page %s", page_num)
                 break
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            with timing.span('parse', page_url):
+                soup = BeautifulSoup(response.text, 'lxml')
             
             # Find all phone links
             phone_links = soup.select('div.makers a')
             
             if not phone_links:
-                print(f"   ✅ No more phones on page {page_num}")
+                log.debug("   ✅ No more phones on page %s", page_num)
                 break
             
-            print(f"   ✅ Found {len(phone_links)} phones on page {page_num}")
+            log.debug("   ✅ Found %s phones on page %s", len(phone_links), page_num)
             
             for link in phone_links:
                 href = link.get('href')
                 if href and href.endswith('.php'):
-                    full_url = f"https://www.gsmarena.com/{href}"
+                    full_url = f"{GSMArenaScraper.BASE_URL}/{href}"
                     phone_urls.append(full_url)
                     
                     if max_results > 0 and len(phone_urls) >= max_results:
-                        print(f"   🎯 Reached max_results limit: {max_results}")
+                        log.debug("   🎯 Reached max_results limit: %s", max_results)
                         return phone_urls
             
             # Check for next page link
             next_page = soup.select_one('a.pages-next')
             if not next_page:
-                print(f"   ✅ No next page button found, ending pagination")
+                log.debug("   ✅ No next page button found, ending pagination")
                 break
             
             page_num += 1
-            time.sleep(2)
+            timing.sleep(2)
         
-        print(f"   📊 Total phones collected: {len(phone_urls)}")
+        log.info("   📊 Total phones collected: %s", len(phone_urls))
         return phone_urls
     
     def scrape_brand(self, brand_name: str, brand_url: str, device_count: int, max_results: int = 0):
@@ -148,33 +154,35 @@ class AllBrandsScraper:
         Returns:
             Number of phones saved
         """
-        print("\n" + "=" * 70)
-        print(f"BRAND: {brand_name} ({device_count} devices)")
-        print("=" * 70)
+        log.info("\n" + "=" * 70)
+        log.info("BRAND: %s (%s devices)", brand_name, device_count)
+        log.info("=" * 70)
         
         try:
             # Get all phone URLs
-            print(f"📱 Fetching phone list...")
+            log.info("📱 Fetching phone list...")
             phone_urls = self.get_phones_from_brand(brand_url, max_results)
             
             if not phone_urls:
-                print(f"⚠️  No phones found (likely rate limited)")
-                print(f"⏰ Cooling down for 120 seconds...")
-                time.sleep(120)  # Long cooldown after rate limit
+                log.warning("⚠️  No phones found (likely rate limited)")
+                log.info("⏰ Cooling down for 120 seconds...")
+                timing.sleep(120, 'backoff')  # Long cooldown after rate limit
                 return 0
             
-            print(f"📊 Found {len(phone_urls)} phones to scrape")
+            log.info("📊 Found %s phones to scrape", len(phone_urls))
             
             saved_count = 0
+            progress = Progress(log, brand_name, total=len(phone_urls))
             
             for idx, url in enumerate(phone_urls, 1):
-                print(f"\n[{idx}/{len(phone_urls)}] {url}")
+                log.debug("\n[%s/%s] %s", idx, len(phone_urls), url)
                 
                 try:
                     phone = self.scraper.scrape_phone(url)
                     
                     if phone:
-                        phone_dict = phone.to_dict() if hasattr(phone, 'to_dict') else phone
+                        with timing.span('serialize', url):
+                            phone_dict = phone.to_dict() if hasattr(phone, 'to_dict') else phone
                         
                         phone_data = {
                             'source': 'GSMArena',
@@ -191,35 +199,37 @@ class AllBrandsScraper:
                             saved_count += 1
                     
                 except Exception as e:
-                    print(f"❌ Error: {e}")
+                    sampled(log, logging.WARNING, 'all-makers-phone-error', "❌ Error: %s", e)
+                
+                progress.update(saved=saved_count)
                 
                 # Delay between phones
                 if idx < len(phone_urls):
                     import random
-                    time.sleep(random.uniform(3, 6))
+                    timing.sleep(random.uniform(3, 6))
             
-            print(f"\n✅ {brand_name}: Saved {saved_count}/{len(phone_urls)} phones")
+            log.info("\n✅ %s: Saved %s/%s phones", brand_name, saved_count, len(phone_urls))
             return saved_count
             
         except Exception as e:
-            print(f"❌ Error scraping {brand_name}: {e}")
+            log.error("❌ Error scraping %s: %s", brand_name, e)
             return 0
 
 
 def main():
-    print("=" * 70)
-    print("ALL BRANDS SCRAPER (Dynamic Discovery)")
-    print("Scraping ALL brands from GSMArena makers page")
-    print("=" * 70)
+    log.info("=" * 70)
+    log.info("ALL BRANDS SCRAPER (Dynamic Discovery)")
+    log.info("Scraping ALL brands from GSMArena makers page")
+    log.info("=" * 70)
     
     # Configuration
     max_results_per_brand = int(os.environ.get('MAX_RESULTS_PER_BRAND', 0))
     delay_between_brands = int(os.environ.get('DELAY_BETWEEN_BRANDS', 10))
     min_devices = int(os.environ.get('MIN_DEVICES', 0))  # Minimum devices to scrape brand
     
-    print(f"\n[CONFIG] Max results per brand: {max_results_per_brand if max_results_per_brand > 0 else 'All'}")
-    print(f"[CONFIG] Delay between brands: {delay_between_brands}s")
-    print(f"[CONFIG] Minimum devices filter: {min_devices if min_devices > 0 else 'None'}\n")
+    log.info("\n[CONFIG] Max results per brand: %s", max_results_per_brand if max_results_per_brand > 0 else 'All')
+    log.info("[CONFIG] Delay between brands: %ss", delay_between_brands)
+    log.info("[CONFIG] Minimum devices filter: %s\n", min_devices if min_devices > 0 else 'None')
     
     # Initialize
     scraper = AllBrandsScraper()
@@ -228,18 +238,18 @@ def main():
     brands = scraper.get_all_brands()
     
     if not brands:
-        print("❌ No brands found")
+        log.error("❌ No brands found")
         return 1
     
     # Filter by minimum devices if specified
     if min_devices > 0:
         brands = [(name, url, count) for name, url, count in brands if count >= min_devices]
-        print(f"📊 Filtered to {len(brands)} brands with {min_devices}+ devices\n")
+        log.info("📊 Filtered to %s brands with %s+ devices\n", len(brands), min_devices)
     
     # Display brands
-    print(f"📋 Brands to scrape:")
+    log.info("📋 Brands to scrape:")
     for name, url, count in brands:
-        print(f"   - {name}: {count} devices")
+        log.info("   - %s: %s devices", name, count)
     
     # Scrape all brands
     total_saved = 0
@@ -248,9 +258,9 @@ def main():
     start_time = datetime.now()
     
     for idx, (brand_name, brand_url, device_count) in enumerate(brands, 1):
-        print(f"\n{'='*70}")
-        print(f"[{idx}/{len(brands)}] Processing: {brand_name}")
-        print(f"{'='*70}")
+        log.info('\n' + '=' * 70)
+        log.info("[%s/%s] Processing: %s", idx, len(brands), brand_name)
+        log.info('=' * 70)
         
         saved = scraper.scrape_brand(brand_name, brand_url, device_count, max_results_per_brand)
         
@@ -259,35 +269,43 @@ def main():
         
         # Delay between brands
         if idx < len(brands):
-            print(f"\n⏳ Waiting {delay_between_brands}s before next brand...")
-            time.sleep(delay_between_brands)
+            log.info("\n⏳ Waiting %ss before next brand...", delay_between_brands)
+            timing.sleep(delay_between_brands)
     
     # Summary
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
     
-    print("\n" + "=" * 70)
-    print("SCRAPING COMPLETE")
-    print("=" * 70)
-    print(f"⏱️  Duration: {duration:.0f}s ({duration/60:.1f} minutes)")
-    print(f"✅ Total phones saved: {total_saved}")
-    print(f"✅ Brands processed: {len(brands)}")
+    log.info("\n" + "=" * 70)
+    log.info("SCRAPING COMPLETE")
+    log.info("=" * 70)
+    log.info("⏱️  Duration: %.0fs (%.1f minutes)", duration, duration/60)
+    log.info("✅ Total phones saved: %s", total_saved)
+    log.info("✅ Brands processed: %s", len(brands))
     
-    print(f"\n📊 Top Brands by Phones Saved:")
+    log.info("\n📊 Top Brands by Phones Saved:")
     sorted_results = sorted(results, key=lambda x: x[1], reverse=True)[:10]
     for brand, saved, total in sorted_results:
-        print(f"   - {brand}: {saved} phones (out of {total})")
+        log.info("   - %s: %s phones (out of %s)", brand, saved, total)
     
     # MongoDB stats
     try:
         stats = scraper.mongo_client.get_collection_stats()
-        print(f"\n[MONGODB] Database Stats:")
-        print(f"  - Total documents: {stats.get('total_documents', 0)}")
+        log.info("\n[MONGODB] Database Stats:")
+        log.info("  - Total documents: %s", stats.get('total_documents', 0))
     except Exception as e:
-        print(f"\n[MONGODB] ⚠️  Could not fetch stats: {e}")
+        log.warning("\n[MONGODB] ⚠️  Could not fetch stats: %s", e)
+    
+    timing.get_timings().write_summary(
+        f"data/timings_all_makers_{start_time.strftime('%Y%m%d_%H%M%S')}.json",
+        run='scrape_all_makers',
+        extra={'phones_saved': total_saved, 'brands': len(brands)}
+    )
     
     return 0
 
 
 if __name__ == '__main__':
-    sys.exit(main())
+    with profiling.session('scrape_all_makers', profiling.requested()):
+        exit_code = main()
+    sys.exit(exit_code)
@@ -3,9 +3,9 @@ Scrape phones by category from GSMArena and save to MongoDB
 Categories: Smartphones, Tablets, Smart Watches, Feature Phones, etc.
 """
 
+import logging
 import os
 import sys
-import time
 import random
 from datetime import datetime
 from typing import List
@@ -17,15 +17,19 @@ sys.path.insert(0, os.path.join(current_dir, 'function'))
 
 from utils.browser_client import HeadlessBrowserClient
 from utils.mongodb_client import MongoDBClient
+from utils import profiling, timing
+from utils.log import Progress, get_logger, sampled
 from scrapers.gsmarena import GSMArenaScraper
 
+log = get_logger('by_category')
+
 
 # GSMArena categories
 CATEGORIES = {
-    "Smartphones": "https://www.gsmarena.com/results.php3?sQuickSearch=yes&mode=allphones",
-    "Tablets": "https://www.gsmarena.com/results.php3?nTabletYes=1",
-    "Smart Watches": "https://www.gsmarena.com/results.php3?nSmartWatchesYes=1",
-    "Feature Phones": "https://www.gsmarena.com/results.php3?nFeaturePhoneYes=1"
+    "Smartphones": f"{GSMArenaScraper.BASE_URL}/results.php3?sQuickSearch=yes&mode=allphones",
+    "Tablets": f"{GSMArenaScraper.BASE_URL}/results.php3?nTabletYes=1",
+    "Smart Watches": f"{GSMArenaScraper.BASE_URL}/results.php3?nSmartWatchesYes=1",
+    "Feature Phones": f"{GSMArenaScraper.BASE_URL}/results.php3?nFeaturePhoneYes=1"
 }
 
 
@@ -38,7 +42,7 @@ class CategoryScraper:
         self.mongo_client = MongoDBClient()
         # Use different collection for category-based scraping
         self.mongo_client.collection = self.mongo_client.db["phone_category_data"]
-        print(f"[MONGODB] Using collection: phone_category_data")
+        log.info("[MONGODB] Using collection: phone_category_data")
     
     def get_phones_from_category(self, category_url: str, max_results: int = 0) -> List[str]:
         """
@@ -51,7 +55,7 @@ class CategoryScraper:
         Returns:
             List of phone URLs
         """
-        print(f"🔍 Fetching phones from category page...")
+        log.info("🔍 Fetching phones from category page...")
         
         phone_urls = []
         page_num = 1
@@ -65,45 +69,46 @@ class CategoryScraper:
                 separator = "&" if "?" in category_url else "?"
                 page_url = f"{category_url}{separator}iPage={page_num}"
             
-            print(f"📄 Loading page {page_num}...")
+            log.debug("📄 Loading page %s...", page_num)
             
             response = self.browser.get(page_url)
             if not response:
-                print(f"⚠️  Failed to load page {page_num}")
+                log.warning("⚠️  Failed to load page %s", page_num)
                 break
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            with timing.span('parse', page_url):
+                soup = BeautifulSoup(response.text, 'lxml')
             
             # Find all phone links
             phone_links = soup.select('div.makers a')
             
             if not phone_links:
-                print(f"✅ No more phones found on page {page_num}")
+                log.debug("✅ No more phones found on page %s", page_num)
                 break
             
             for link in phone_links:
                 href = link.get('href')
                 if href and href.endswith('.php'):
-                    full_url = f"https://www.gsmarena.com/{href}"
+                    full_url = f"{GSMArenaScraper.BASE_URL}/{href}"
                     phone_urls.append(full_url)
                     
                     # Check if we've reached the limit
                     if max_results > 0 and len(phone_urls) >= max_results:
-                        print(f"✅ Reached maximum of {max_results} phones")
+                        log.debug("✅ Reached maximum of %s phones", max_results)
                         return phone_urls
             
-            print(f"   Found {len(phone_links)} phones on page {page_num}")
+            log.debug("   Found %s phones on page %s", len(phone_links), page_num)
             
             # Check if there's a next page
             next_page = soup.select_one('a.pages-next')
             if not next_page:
-                print(f"✅ No more pages")
+                log.debug("✅ No more pages")
                 break
             
             page_num += 1
             
             # Delay between pages
-            time.sleep(random.uniform(2, 4))
+            timing.sleep(random.uniform(2, 4))
         
         return phone_urls
     
@@ -119,26 +124,27 @@ class CategoryScraper:
         Returns:
             Number of phones saved
         """
-        print("\n" + "=" * 70)
-        print(f"SCRAPING CATEGORY: {category_name}")
-        print("=" * 70)
+        log.info("\n" + "=" * 70)
+        log.info("SCRAPING CATEGORY: %s", category_name)
+        log.info("=" * 70)
         
         try:
             # Get all phone URLs in this category
             phone_urls = self.get_phones_from_category(category_url, max_results)
             
             if not phone_urls:
-                print(f"⚠️  No phones found in category: {category_name}")
+                log.warning("⚠️  No phones found in category: %s", category_name)
                 return 0
             
-            print(f"\n📊 Found {len(phone_urls)} phones in {category_name}")
-            print(f"🚀 Starting scraping...\n")
+            log.info("\n📊 Found %s phones in %s", len(phone_urls), category_name)
+            log.info("🚀 Starting scraping...\n")
             
             saved_count = 0
             failed_count = 0
+            progress = Progress(log, category_name, total=len(phone_urls))
             
             for idx, url in enumerate(phone_urls, 1):
-                print(f"[{idx}/{len(phone_urls)}] Scraping: {url}")
+                log.debug("[%s/%s] Scraping: %s", idx, len(phone_urls), url)
                 
                 try:
                     # Scrape phone
@@ -146,7 +152,8 @@ class CategoryScraper:
                     
                     if phone:
                         # Convert to dict and add category + source
-                        phone_dict = phone.to_dict() if hasattr(phone, 'to_dict') else phone
+                        with timing.span('serialize', url):
+                            phone_dict = phone.to_dict() if hasattr(phone, 'to_dict') else phone
                         
                         phone_data = {
                             'category': category_name,
@@ -163,57 +170,59 @@ class CategoryScraper:
                         
                         if doc_id:
                             saved_count += 1
-                            print(f"✅ Saved to MongoDB")
+                            log.debug("✅ Saved to MongoDB")
                         else:
                             failed_count += 1
-                            print(f"⚠️  Failed to save to MongoDB")
+                            sampled(log, logging.WARNING, 'category-save-failed', "⚠️  Failed to save to MongoDB")
                     else:
                         failed_count += 1
-                        print(f"⚠️  Failed to scrape phone")
+                        sampled(log, logging.WARNING, 'category-scrape-failed', "⚠️  Failed to scrape phone")
                     
                 except Exception as e:
                     failed_count += 1
-                    print(f"❌ Error scraping phone: {e}")
+                    sampled(log, logging.WARNING, 'category-phone-error', "❌ Error scraping phone: %s", e)
+                
+                progress.update(saved=saved_count, failed=failed_count)
                 
                 # Delay between phones
                 if idx < len(phone_urls):
                     delay = random.uniform(3, 6)
-                    print(f"⏳ Waiting {delay:.1f}s before next request...")
-                    time.sleep(delay)
+                    log.debug("⏳ Waiting %.1fs before next request...", delay)
+                    timing.sleep(delay)
             
-            print(f"\n✅ {category_name} Complete:")
-            print(f"   - Scraped: {saved_count}/{len(phone_urls)}")
-            print(f"   - Failed: {failed_count}/{len(phone_urls)}")
+            log.info("\n✅ %s Complete:", category_name)
+            log.info("   - Scraped: %s/%s", saved_count, len(phone_urls))
+            log.info("   - Failed: %s/%s", failed_count, len(phone_urls))
             
             return saved_count
             
         except Exception as e:
-            print(f"❌ Error scraping category {category_name}: {e}")
+            log.error("❌ Error scraping category %s: %s", category_name, e)
             import traceback
             traceback.print_exc()
             return 0
 
 
 def main():
-    print("=" * 70)
-    print("CATEGORY-BASED PHONE SCRAPER")
-    print("Scraping phones organized by category")
-    print("=" * 70)
+    log.info("=" * 70)
+    log.info("CATEGORY-BASED PHONE SCRAPER")
+    log.info("Scraping phones organized by category")
+    log.info("=" * 70)
     
     # Get configuration
     max_results_per_category = int(os.environ.get('MAX_RESULTS_PER_CATEGORY', 0))
     delay_between_categories = int(os.environ.get('DELAY_BETWEEN_CATEGORIES', 15))
     
-    print(f"\n[CONFIG] Categories to scrape: {len(CATEGORIES)}")
-    print(f"[CONFIG] Max results per category: {max_results_per_category if max_results_per_category > 0 else 'All'}")
-    print(f"[CONFIG] Delay between categories: {delay_between_categories}s")
-    print(f"[CONFIG] Categories: {', '.join(CATEGORIES.keys())}\n")
+    log.info("\n[CONFIG] Categories to scrape: %s", len(CATEGORIES))
+    log.info("[CONFIG] Max results per category: %s", max_results_per_category if max_results_per_category > 0 else 'All')
+    log.info("[CONFIG] Delay between categories: %ss", delay_between_categories)
+    log.info("[CONFIG] Categories: %s\n", ', '.join(CATEGORIES.keys()))
     
     # Initialize scraper
     try:
         scraper = CategoryScraper()
     except Exception as e:
-        print(f"❌ Failed to initialize scraper: {e}")
+        log.error("❌ Failed to initialize scraper: %s", e)
         return 1
     
     # Scrape all categories
@@ -223,7 +232,7 @@ def main():
     start_time = datetime.now()
     
     for idx, (category_name, category_url) in enumerate(CATEGORIES.items(), 1):
-        print(f"\n[{idx}/{len(CATEGORIES)}] Processing category: {category_name}")
+        log.info("\n[%s/%s] Processing category: %s", idx, len(CATEGORIES), category_name)
         
         saved = scraper.scrape_category(category_name, category_url, max_results_per_category)
         
@@ -232,34 +241,42 @@ def main():
         
         # Delay between categories (except after last one)
         if idx < len(CATEGORIES):
-            print(f"\n⏳ Waiting {delay_between_categories}s before next category...")
-            time.sleep(delay_between_categories)
+            log.info("\n⏳ Waiting %ss before next category...", delay_between_categories)
+            timing.sleep(delay_between_categories)
     
     # Summary
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
     
-    print("\n" + "=" * 70)
-    print("SCRAPING COMPLETE")
-    print("=" * 70)
-    print(f"⏱️  Duration: {duration:.0f}s ({duration/60:.1f} minutes)")
-    print(f"✅ Total phones saved: {total_saved}")
-    print(f"✅ Categories processed: {len(CATEGORIES)}")
+    log.info("\n" + "=" * 70)
+    log.info("SCRAPING COMPLETE")
+    log.info("=" * 70)
+    log.info("⏱️  Duration: %.0fs (%.1f minutes)", duration, duration/60)
+    log.info("✅ Total phones saved: %s", total_saved)
+    log.info("✅ Categories processed: %s", len(CATEGORIES))
     
-    print(f"\n📊 Breakdown by Category:")
+    log.info("\n📊 Breakdown by Category:")
     for category, count in category_results.items():
-        print(f"   - {category}: {count} phones")
+        log.info("   - %s: %s phones", category, count)
     
     # Get MongoDB stats
     try:
         stats = scraper.mongo_client.get_collection_stats()
-        print(f"\n[MONGODB] Collection: phone_category_data")
-        print(f"  - Total documents: {stats.get('total_documents', 0)}")
+        log.info("\n[MONGODB] Collection: phone_category_data")
+        log.info("  - Total documents: %s", stats.get('total_documents', 0))
     except Exception as e:
-        print(f"\n[MONGODB] ⚠️  Could not fetch stats: {e}")
+        log.warning("\n[MONGODB] ⚠️  Could not fetch stats: %s", e)
+    
+    timing.get_timings().write_summary(
+        f"data/timings_by_category_{start_time.strftime('%Y%m%d_%H%M%S')}.json",
+        run='scrape_by_category',
+        extra={'phones_saved': total_saved, 'categories': category_results}
+    )
     
     return 0
 
 
 if __name__ == '__main__':
-    sys.exit(main())
+    with profiling.session('scrape_by_category', profiling.requested()):
+        exit_code = main()
+    sys.exit(exit_code)
@@ -12,6 +12,44 @@ document.addEventListener('DOMContentLoaded', function() {
 
     let currentResults = null;
 
+    // Autocomplete from the stored catalog
+    const queryInput = document.getElementById('query');
+    const querySuggestions = document.getElementById('querySuggestions');
+    let suggestTimer = null;
+    let suggestController = null;
+
+    if (API_CONFIG.suggestions) {
+        queryInput.addEventListener('input', function() {
+            clearTimeout(suggestTimer);
+            const text = queryInput.value.trim();
+            if (text.length < 2) {
+                querySuggestions.innerHTML = '';
+                return;
+            }
+            suggestTimer = setTimeout(() => fetchSuggestions(text), 120);
+        });
+    }
+
+    function fetchSuggestions(text) {
+        // Only the latest keystroke matters
+        if (suggestController) suggestController.abort();
+        suggestController = new AbortController();
+
+        fetch(`${API_CONFIG.functionUrl}/suggest?q=${encodeURIComponent(text)}&limit=8`, {
+            signal: suggestController.signal
+        })
+            .then(response => response.ok ? response.json() : { suggestions: [] })
+            .then(data => {
+                querySuggestions.innerHTML = '';
+                data.suggestions.forEach(suggestion => {
+                    const option = document.createElement('option');
+                    option.value = suggestion.name;
+                    querySuggestions.appendChild(option);
+                });
+            })
+            .catch(() => {});
+    }
+
     // Handle form submission
     searchForm.addEventListener('submit', function(e) {
         e.preventDefault();
@@ -68,6 +106,11 @@ document.addEventListener('DOMContentLoaded', function() {
         searchBtn.disabled = true;
         searchBtn.innerHTML = '<span class="loading"></span> Searching...';
 
+        if (API_CONFIG.streaming && window.EventSource) {
+            startStreamingSearch(query, mode, maxResults, sites);
+            return;
+        }
+
         // Reset progress
         progressBar.style.width = '30%';
         progressText.textContent = 'Sending request to Appwrite Function...';
@@ -127,7 +170,93 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    function finishSearch() {
+        progressBar.style.width = '100%';
+        progressText.textContent = 'Complete!';
+
+        setTimeout(() => {
+            progressContainer.style.display = 'none';
+            searchBtn.disabled = false;
+            searchBtn.innerHTML = '<i class="fas fa-search"></i> Search Phones';
+        }, 500);
+    }
+
+    function startStreamingSearch(query, mode, maxResults, sites) {
+        const params = new URLSearchParams({
+            query: query,
+            mode: mode,
+            max_results: parseInt(maxResults),
+            sites: sites.join(',')
+        });
+
+        // Results accumulate in the same shape the non-streaming API returns
+        const results = mode === 'detailed'
+            ? { query: query, total_result: 0, result: [] }
+            : { query: query, total_results: 0, phones: [] };
+        currentResults = results;
+
+        progressBar.style.width = '5%';
+        progressText.textContent = 'Connecting to search stream...';
+
+        const source = new EventSource(`${API_CONFIG.functionUrl}/search/stream?${params}`);
+        let sitesDone = 0;
+
+        source.addEventListener('progress', event => {
+            const data = JSON.parse(event.data);
+            if (data.stage === 'site') {
+                progressText.textContent = `Searching ${data.site} (${data.index}/${data.total_sites})...`;
+            } else {
+                progressText.textContent = 'Starting browser...';
+            }
+        });
+
+        source.addEventListener('phone', event => {
+            const data = JSON.parse(event.data);
+            if (mode === 'detailed') {
+                results.result.push(data.phone);
+                results.total_result = results.result.length;
+                progressText.textContent = `Found ${results.total_result} phone${results.total_result !== 1 ? 's' : ''} so far...`;
+            } else {
+                results.phones.push(data.phone);
+                results.total_results = results.phones.length;
+                progressText.textContent = `Found ${results.total_results} phone${results.total_results !== 1 ? 's' : ''} so far...`;
+            }
+            renderResults(results, mode);
+        });
+
+        source.addEventListener('site_done', event => {
+            sitesDone++;
+            progressBar.style.width = `${Math.round(5 + 90 * sitesDone / sites.length)}%`;
+        });
+
+        source.addEventListener('done', () => {
+            source.close();
+            renderResults(results, mode);
+            finishSearch();
+        });
+
+        source.addEventListener('error', event => {
+            source.close();
+            // Server-sent error events carry a message; connection errors do not
+            if (event.data) {
+                const data = JSON.parse(event.data);
+                alert('Search failed: ' + data.message);
+            } else if (!results.phones?.length && !results.result?.length) {
+                alert('Search failed: connection to the search stream was lost');
+            }
+            renderResults(results, mode);
+            finishSearch();
+        });
+    }
+
     function displayResults(results, mode) {
+        renderResults(results, mode);
+
+        // Scroll to results
+        resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }
+
+    function renderResults(results, mode) {
         resultsContainer.style.display = 'block';
 
         let html = '';
@@ -139,9 +268,6 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         resultsContent.innerHTML = html;
-        
-        // Scroll to results
-        resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
     }
 
     function displayBasicResults(results) {
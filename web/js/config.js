@@ -3,6 +3,12 @@
 const API_CONFIG = {
     // Local Flask server
     functionUrl: 'http://localhost:5000/api',
+
+    // Stream results as they are scraped (local Flask server only)
+    streaming: true,
+
+    // Suggest known phone names while typing (local Flask server only)
+    suggestions: true,
     
     // Uncomment below for Appwrite deployment
     // functionUrl: 'https://69246267000d261cd469.fra.appwrite.run'
@@ -3,17 +3,27 @@ Flask Web App for Universal Phone Scraper - Local Version
 Run this locally to avoid cloud platform IP blocks
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+import io
+import json
 import sys
 import os
+import time
+from datetime import datetime
 
 # Add current directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(current_dir, 'function'))
 
-from universal_search import UniversalSearch
-from format_results import format_detailed_results
+from format_results import (
+    format_detailed_results, format_detailed_phone, format_basic_results, format_basic_phone, iter_detailed_chunks
+)
+from search_jobs import SearchJobManager
+from catalog import get_catalog
+from utils.scraper_pool import PoolBusy, get_scraper_pool
+from utils.result_cache import ResultCache, make_cache_key
+from utils import metrics
 
 # Flask app with custom template and static folders
 app = Flask(__name__, 
@@ -21,14 +31,55 @@ app = Flask(__name__,
             static_url_path='')
 CORS(app)  # Enable CORS for all routes
 
+# Warm scrapers shared by all requests (each worker keeps its own browser)
+scraper_pool = get_scraper_pool(
+    size=int(os.environ.get('SCRAPER_POOL_SIZE', 2)),
+    max_queued=int(os.environ.get('SCRAPER_POOL_MAX_QUEUED', 50))
+)
+
+# Formatted /api/search responses, keyed by normalized (query, sites, mode, max_results)
+result_cache = ResultCache(
+    ttl=int(os.environ.get('RESULT_CACHE_TTL', 900)),
+    stale_ttl=int(os.environ.get('RESULT_CACHE_STALE_TTL', 3600)),
+    max_entries=int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('RESULT_CACHE_MAX_MB', 64)) * 1024 * 1024
+)
+
+# Background searches run on the same pool
+job_manager = SearchJobManager(scraper_pool, ttl=int(os.environ.get('SEARCH_JOB_TTL', 3600)))
+
+# Site keys accepted as metric labels (anything else would grow the label set unbounded)
+METRIC_SITES = ('gsmarena', '91mobiles', 'kimovil')
+
 @app.route('/')
 def home():
     """Serve the main page"""
     return send_from_directory('web', 'index.html')
 
+def _run_search(query: str, mode: str, max_results: int, sites: list) -> dict:
+    """Scrape on a pooled searcher and format the response data."""
+    results = scraper_pool.run(
+        lambda searcher: searcher.search_all(
+            query=query,
+            max_results_per_site=max_results,
+            sites=sites
+        )
+    )
+    
+    return _format_results(results, mode)
+
+
+def _format_results(results: dict, mode: str) -> dict:
+    """Format search_all()-shaped results for the requested mode."""
+    if mode == 'detailed':
+        return format_detailed_results(results)
+    return format_basic_results(results)
+
+
 @app.route('/api/search', methods=['POST'])
 def search():
     """Handle phone search requests"""
+    started = time.perf_counter()
     try:
         data = request.get_json()
         
@@ -37,6 +88,7 @@ def search():
         mode = data.get('mode', 'basic')
         max_results = int(data.get('max_results', 999))  # High default to get all
         sites = data.get('sites', ['gsmarena'])  # Default to GSMArena only
+        fresh = str(data.get('fresh', False)).lower() in ('1', 'true', 'yes')
         
         # Validate query
         if not query:
@@ -52,61 +104,42 @@ def search():
                 'message': 'max_results must be between 1 and 20'
             }), 400
         
-        print(f"[SEARCH] Query: {query}, Mode: {mode}, Sites: {sites}")
-        
-        # Perform search
-        searcher = UniversalSearch()
-        detailed = (mode == 'detailed')
+        print(f"[SEARCH] Query: {query}, Mode: {mode}, Sites: {sites}, Fresh: {fresh}")
         
-        if detailed:
-            # For detailed mode, search all and format
-            results = searcher.search_all(
-                query=query,
-                max_results_per_site=max_results,
-                sites=sites
-            )
-        else:
-            # For basic mode, use search_all and flatten results
-            results = searcher.search_all(
-                query=query,
-                max_results_per_site=max_results,
-                sites=sites
-            )
+        # Answer from the stored catalog unless a fresh scrape was requested
+        if not fresh:
+            catalog = get_catalog()
+            results = catalog.search_results(query, sites=sites, max_results=max_results) if catalog and catalog.ready else None
+            if results:
+                print(f"[RESULTS] Served {results['total_found']} phones from catalog")
+                _observe_search(started, sites, mode, 'catalog')
+                return jsonify({
+                    'success': True,
+                    'origin': 'catalog',
+                    'data': _format_results(results, mode)
+                })
         
-        print(f"[RESULTS] Search completed")
+        # Serve from cache; misses (and stale refreshes) run on a warm pooled scraper
+        cache_key = make_cache_key(query, sites, mode, max_results)
+        if fresh:
+            result_cache.invalidate(cache_key)
+        formatted_results, cache_status = result_cache.get_or_compute(
+            cache_key,
+            lambda: _run_search(query, mode, max_results, sites),
+            # Empty results usually mean a blocked or failed scrape - don't keep them
+            cacheable=lambda data: bool(data.get('phones') or data.get('result'))
+        )
         
-        # Format response
-        if detailed:
-            formatted_results = format_detailed_results(results)
-        else:
-            # Flatten results from all scrapers
-            all_phones = []
-            if isinstance(results, dict) and 'scrapers' in results:
-                for site, site_results in results['scrapers'].items():
-                    if site_results.get('success') and site_results.get('phones'):
-                        all_phones.extend(site_results['phones'])
-            
-            formatted_results = {
-                'query': query,
-                'total_results': len(all_phones),
-                'phones': [
-                    {
-                        'name': f"{phone.brand} {phone.model}",
-                        'brand': phone.brand,
-                        'price': phone.price,
-                        'rating': phone.rating,
-                        'url': phone.url,
-                        'image_url': phone.thumbnail or (phone.images[0] if phone.images else None),
-                        'source': phone.source
-                    }
-                    for phone in all_phones
-                ]
-            }
+        print(f"[RESULTS] Search completed (cache: {cache_status})")
+        _observe_search(started, sites, mode, cache_status)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
+            'origin': 'live',
             'data': formatted_results
         })
+        response.headers['X-Cache'] = cache_status.upper()
+        return response
     
     except ValueError as e:
         return jsonify({
@@ -114,6 +147,12 @@ def search():
             'message': str(e)
         }), 400
     
+    except PoolBusy as e:
+        return jsonify({
+            'error': 'Service Unavailable',
+            'message': str(e)
+        }), 503
+    
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         import traceback
@@ -123,14 +162,457 @@ def search():
             'message': f'Search failed: {str(e)}'
         }), 500
 
+def _observe_search(started: float, sites: list, mode: str, origin: str):
+    """Record /api/search latency (origin: 'catalog' or the result cache status)."""
+    metrics.SEARCH_SECONDS.observe(
+        time.perf_counter() - started,
+        sites=','.join(site for site in METRIC_SITES if site in sites) or 'none',
+        mode=mode if mode in ('basic', 'detailed') else 'other',
+        origin=origin
+    )
+
+@app.route('/api/filter', methods=['POST'])
+def filter_phones():
+    """
+    Filter the stored catalog by typed specs and return facet counts.
+    
+    Body: {"filters": {"price_inr": {"max": 20000}, "ram_gb": {"min": 8},
+                       "battery_mah": {"min": 5000}, "brand": ["samsung", "xiaomi"]},
+           "sort": "price_inr", "descending": false, "limit": 20, "offset": 0}
+    """
+    try:
+        data = request.get_json() or {}
+        limit = int(data.get('limit', 20))
+        offset = int(data.get('offset', 0))
+        if limit < 1 or limit > 100 or offset < 0:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'limit must be between 1 and 100 and offset non-negative'
+            }), 400
+        
+        catalog = get_catalog()
+        if not catalog or not catalog.ready:
+            return jsonify({
+                'error': 'Service Unavailable',
+                'message': 'Phone catalog is not loaded'
+            }), 503
+        
+        result = catalog.facets().filter(
+            filters=data.get('filters') or {},
+            sort=data.get('sort'),
+            descending=bool(data.get('descending', False)),
+            limit=limit,
+            offset=offset
+        )
+        
+        return jsonify({
+            'success': True,
+            'total': result['total'],
+            'phones': [
+                {**format_basic_phone(phone), 'parsed_specs': parsed}
+                for phone, parsed in zip(result['phones'], result['parsed'])
+            ],
+            'facets': result['facets'],
+            'ranges': result['ranges']
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+
+
+@app.route('/api/similar', methods=['GET'])
+def similar_phones():
+    """
+    Find catalog phones with specs closest to a given phone.
+    
+    Query parameters: url (phone URL from the catalog), k (default 10, max 50)
+    """
+    url = request.args.get('url', '').strip()
+    try:
+        k = min(max(int(request.args.get('k', 10)), 1), 50)
+    except ValueError:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'k must be an integer'
+        }), 400
+    
+    if not url:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'url parameter is required'
+        }), 400
+    
+    catalog = get_catalog()
+    if not catalog or not catalog.ready:
+        return jsonify({
+            'error': 'Service Unavailable',
+            'message': 'Phone catalog is not loaded'
+        }), 503
+    
+    index = catalog.similarity()
+    try:
+        neighbours = index.similar(url, k=k)
+    except KeyError:
+        return jsonify({
+            'error': 'Not Found',
+            'message': 'Phone is not in the catalog'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'url': url,
+        'phones': [
+            {**format_basic_phone(phone), 'distance': distance, 'parsed_specs': index.parsed_for(phone)}
+            for phone, distance in neighbours
+        ]
+    })
+
+
+@app.route('/api/compare', methods=['POST'])
+def compare_phones():
+    """
+    Compare many catalog phones at once.
+    
+    Body: {"urls": [...], "format": "json" | "csv" | "parquet"}
+    """
+    data = request.get_json() or {}
+    urls = data.get('urls') or []
+    export_format = data.get('format', 'json')
+    
+    if not isinstance(urls, list) or not urls or len(urls) > 500:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'urls must be a list of 1 to 500 phone URLs'
+        }), 400
+    if export_format not in ('json', 'csv', 'parquet'):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'format must be json, csv or parquet'
+        }), 400
+    
+    catalog = get_catalog()
+    if not catalog or not catalog.ready:
+        return jsonify({
+            'error': 'Service Unavailable',
+            'message': 'Phone catalog is not loaded'
+        }), 503
+    
+    matrix, missing = catalog.compare(urls)
+    
+    if export_format == 'csv':
+        return Response(matrix.to_csv(), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=phone_comparison.csv'})
+    
+    if export_format == 'parquet':
+        buffer = io.BytesIO()
+        try:
+            matrix.to_parquet(buffer)
+        except ImportError as e:
+            return jsonify({
+                'error': 'Not Implemented',
+                'message': str(e)
+            }), 501
+        return Response(buffer.getvalue(), mimetype='application/vnd.apache.parquet',
+                        headers={'Content-Disposition': 'attachment; filename=phone_comparison.parquet'})
+    
+    return jsonify({
+        'success': True,
+        'missing': missing,
+        **matrix.to_dict()
+    })
+
+
+@app.route('/api/export', methods=['GET'])
+def export_catalog():
+    """
+    Download the stored catalog in detailed format, streamed phone by phone.
+    
+    Query parameters: format ("ndjson" or "json", default "ndjson") and
+    sites (comma separated, default all).
+    """
+    export_format = request.args.get('format', 'ndjson')
+    sites = [s for s in request.args.get('sites', '').split(',') if s] or None
+    
+    if export_format not in ('json', 'ndjson'):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'format must be json or ndjson'
+        }), 400
+    
+    catalog = get_catalog()
+    if not catalog or not catalog.ready:
+        return jsonify({
+            'error': 'Service Unavailable',
+            'message': 'Phone catalog is not loaded'
+        }), 503
+    
+    phones = catalog.phones(sites)
+    header = {
+        'total_result': len(phones),
+        'query': None,
+        'timestamp': datetime.now().isoformat()
+    }
+    chunks = iter_detailed_chunks(
+        ((phone, phone.get('source') or '') for phone in phones),
+        header, format=export_format, indent=None
+    )
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'application/json'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=phones.{export_format}'}
+    )
+
+
+@app.route('/api/suggest', methods=['GET'])
+def suggest():
+    """
+    Autocomplete phone names from the stored catalog.
+    
+    Query parameters: q (typed text), limit (default 8, max 20)
+    """
+    query = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', 8)), 1), 20)
+    except ValueError:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'limit must be an integer'
+        }), 400
+    
+    catalog = get_catalog()
+    suggestions = catalog.suggest(query, limit=limit) if query and catalog and catalog.ready else []
+    
+    response = jsonify({
+        'query': query,
+        'suggestions': suggestions
+    })
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+def _sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/api/search/stream', methods=['GET'])
+def search_stream():
+    """
+    Stream phone search results as Server-Sent Events.
+    
+    Query parameters mirror /api/search: query, mode, max_results and sites
+    (comma separated). Emits 'progress', 'phone', 'site_done', 'done' and
+    'error' events; each phone is pushed as soon as it has been scraped.
+    """
+    query = request.args.get('query', '').strip()
+    mode = request.args.get('mode', 'basic')
+    sites = [s for s in request.args.get('sites', 'gsmarena').split(',') if s]
+    
+    try:
+        max_results = int(request.args.get('max_results', 5))
+    except ValueError:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'max_results must be an integer'
+        }), 400
+    
+    # Validate query
+    if not query:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Query parameter is required'
+        }), 400
+    
+    # Validate max_results
+    if max_results < 1 or max_results > 20:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'max_results must be between 1 and 20'
+        }), 400
+    
+    print(f"[STREAM] Query: {query}, Mode: {mode}, Sites: {sites}")
+    detailed = (mode == 'detailed')
+    
+    try:
+        events = scraper_pool.iterate(
+            lambda searcher: searcher.iter_search(query=query, max_results_per_site=max_results, sites=sites)
+        )
+    except PoolBusy as e:
+        return jsonify({
+            'error': 'Service Unavailable',
+            'message': str(e)
+        }), 503
+    
+    def generate():
+        # Sent before a scraper is free so the client sees activity immediately
+        yield _sse('progress', {'stage': 'starting', 'query': query, 'sites': sites})
+        try:
+            for event in events:
+                kind = event['event']
+                if kind == 'site_start':
+                    yield _sse('progress', {
+                        'stage': 'site',
+                        'site': event['site'],
+                        'index': event['index'],
+                        'total_sites': event['total_sites']
+                    })
+                elif kind == 'phone':
+                    phone = event['phone']
+                    payload = format_detailed_phone(phone, event['site']) if detailed else format_basic_phone(phone)
+                    yield _sse('phone', {'site': event['site'], 'phone': payload})
+                elif kind == 'site_done':
+                    yield _sse('site_done', {k: v for k, v in event.items() if k != 'event'})
+                elif kind == 'done':
+                    yield _sse('done', {k: v for k, v in event.items() if k != 'event'})
+        except Exception as e:
+            print(f"[ERROR] {str(e)}")
+            yield _sse('error', {'message': f'Search failed: {str(e)}'})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering (nginx)
+        }
+    )
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Enqueue a search and return its job id immediately."""
+    data = request.get_json() or {}
+    
+    query = data.get('query', '').strip()
+    mode = data.get('mode', 'basic')
+    sites = data.get('sites', ['gsmarena'])
+    
+    try:
+        max_results = int(data.get('max_results', 5))
+    except (TypeError, ValueError):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'max_results must be an integer'
+        }), 400
+    
+    # Validate query
+    if not query:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Query parameter is required'
+        }), 400
+    
+    # Validate max_results
+    if max_results < 1 or max_results > 20:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'max_results must be between 1 and 20'
+        }), 400
+    
+    try:
+        job = job_manager.submit(query, sites, mode=mode, max_results=max_results)
+    except PoolBusy as e:
+        return jsonify({
+            'error': 'Service Unavailable',
+            'message': str(e)
+        }), 503
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f"/api/jobs/{job.id}"
+        }
+    }), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Return a job's status, progress and the phones scraped so far."""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'error': 'Not Found',
+            'message': f'Job {job_id} not found or expired'
+        }), 404
+    
+    state = job_manager.snapshot(job)
+    detailed = (state['mode'] == 'detailed')
+    state['phones'] = [
+        format_detailed_phone(phone, site) if detailed else format_basic_phone(phone)
+        for site, phone in state['phones']
+    ]
+    state['total_results'] = len(state['phones'])
+    
+    return jsonify({
+        'success': True,
+        'data': state
+    })
+
+def _catalog_stats() -> dict:
+    """Report whether the stored catalog is available and how many phones it holds."""
+    catalog = get_catalog()
+    if not catalog:
+        return {'enabled': False}
+    return {'enabled': True, 'ready': catalog.ready, 'phones': len(catalog)}
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({
         'status': 'ok',
-        'message': 'Universal Phone Scraper API is running locally'
+        'message': 'Universal Phone Scraper API is running locally',
+        'pool': scraper_pool.stats(),
+        'cache': result_cache.stats(),
+        'catalog': _catalog_stats(),
+        'jobs': job_manager.stats()
     })
 
+def _service_metrics():
+    """Gauges and counters read from the pool, result cache, job manager and catalog at scrape time."""
+    pool = scraper_pool.stats()
+    cache = result_cache.stats()
+    jobs = job_manager.stats()
+    catalog = get_catalog()
+    
+    families = [
+        metrics.gauge('scraper_pool_size', 'Warm scraper workers', pool['size']),
+        metrics.gauge('scraper_pool_busy', 'Workers running a scrape', pool['busy']),
+        metrics.gauge('scraper_pool_queued', 'Scrapes waiting for a worker', pool['queued']),
+        metrics.gauge('scraper_pool_utilization', 'Busy workers / pool size',
+                      pool['busy'] / pool['size'] if pool['size'] else 0),
+        metrics.gauge('scrapes_in_flight', 'Scrapes running or queued on the pool', pool['busy'] + pool['queued']),
+        metrics.gauge('search_jobs_running', 'Background search jobs running', jobs['running']),
+        metrics.gauge('search_jobs_queued', 'Background search jobs queued', jobs['queued']),
+        metrics.gauge('result_cache_hit_ratio', '(hit + stale) / lookups since start', cache['hit_ratio']),
+        metrics.gauge('result_cache_entries', 'Cached search results', cache['entries']),
+        metrics.gauge('result_cache_bytes', 'Approximate size of cached results', cache['bytes']),
+        ('result_cache_lookups_total', 'counter', 'Result cache lookups by outcome', [
+            f'result_cache_lookups_total{{status="{status}"}} {cache[status]}'
+            for status in ('hit', 'stale', 'miss', 'coalesced')
+        ]),
+        ('scraper_pool_restarts_total', 'counter', 'Workers restarted after a browser failure', [
+            f"scraper_pool_restarts_total {pool['restarts']}"
+        ]),
+    ]
+    if catalog:
+        families.append(metrics.gauge('catalog_phones', 'Phones in the stored catalog', len(catalog)))
+    return families
+
+
+metrics.REGISTRY.add_collector(_service_metrics)
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
 if __name__ == '__main__':
     print("""
 ╔══════════════════════════════════════════════════════════╗
@@ -142,7 +624,15 @@ if __name__ == '__main__':
 [*] Server starting on http://localhost:5000
 [*] Open http://localhost:5000 in your browser
 [*] API endpoint: http://localhost:5000/api/search
+[*] Streaming:    http://localhost:5000/api/search/stream
+[*] Jobs:         http://localhost:5000/api/jobs
 [*] Press Ctrl+C to stop
     """)
     
+    # Launch the pooled browsers and load the catalog in the serving process only
+    # (not the reloader parent)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        scraper_pool.start()
+        get_catalog()
+    
     app.run(host='0.0.0.0', port=5000, debug=True)